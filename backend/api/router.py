@@ -14,6 +14,14 @@ from backend.api.schemas import (
     CreateInteractionRequest,
 )
 from backend.api.utils import generate_response
+from src.tools.utils.embeddings.chunk_store import get_chunk_embedding_stores
+from src.tools.utils.http import get_http_client_stats
+from src.tools.utils.rate_limit import get_jina_endpoint_stats
+from src.tools.utils.turn_context import get_turn_dedupe_stats
+from src.tools.web.scraper.cache import get_page_cache
+from src.tools.web.scraper.pool import get_crawler_pool
+from src.tools.web.scraper.scraper import get_scrape_stats
+from src.tools.web.search.cache import get_search_result_cache
 
 
 api_service = APIService()
@@ -117,3 +125,32 @@ async def delete_chat(
 #     return ConversationHistory(
 #         messages=messages,
 #     )
+
+
+@router.get("/metrics/http")
+async def get_http_metrics(user_id: UUID = Depends(get_current_user_id)):
+    """Connection pool usage per upstream and rate limiting, retries and
+    latency histograms per Jina endpoint."""
+    return {
+        "clients": get_http_client_stats(),
+        "jina_endpoints": get_jina_endpoint_stats(),
+    }
+
+
+@router.get("/metrics/web")
+async def get_web_metrics(user_id: UUID = Depends(get_current_user_id)):
+    """Hit rates of the search, scraped-page and chunk embedding caches,
+    browser pool usage, pages dropped by the scrape deadline and retrieval
+    work shared between subgraphs within a turn."""
+    page_cache = get_page_cache()
+    chunk_stores = get_chunk_embedding_stores()
+    return {
+        "search_cache": get_search_result_cache().stats(),
+        "page_cache": page_cache.stats() if page_cache is not None else None,
+        "chunk_embeddings": (
+            chunk_stores.stats() if chunk_stores is not None else None
+        ),
+        "crawler_pool": get_crawler_pool().stats(),
+        "scrape": get_scrape_stats(),
+        "turn_dedupe": get_turn_dedupe_stats(),
+    }
@@ -1,12 +1,16 @@
 import binascii
 from typing import AsyncIterable
 import os
+from src.tools.utils.turn_context import turn_retrieval_context
 
 
 async def generate_response(query: str, thread_id: str, graph) -> AsyncIterable[str]:
-    async for data in graph.astream(
-        {"user_input": query, "messageId": binascii.hexlify(os.urandom(7)).decode()},
-        {"configurable": {"thread_id": thread_id}},
-        stream_mode="custom",
-    ):
-        yield data
+    message_id = binascii.hexlify(os.urandom(7)).decode()
+    # Subgraphs running in this turn share searches, scrapes and embeddings
+    with turn_retrieval_context(message_id):
+        async for data in graph.astream(
+            {"user_input": query, "messageId": message_id},
+            {"configurable": {"thread_id": thread_id}},
+            stream_mode="custom",
+        ):
+            yield data
@@ -7,6 +7,7 @@ class Settings(BaseSettings):
     ASYNC_POSTGRES_DB_URL: str = Field(..., env="ASYNC_POSTGRES_DB_URL")
     REDIS_HOST: str = Field(..., env="REDIS_HOST")
     REDIS_PORT: int = Field(..., env="REDIS_PORT")
+    WARMUP_RESOURCES: bool = Field(True, env="WARMUP_RESOURCES")
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
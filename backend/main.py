@@ -1,7 +1,10 @@
 import os
+import asyncio
+import threading
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+from backend.config import Config
 from backend.database import init_db
 from backend.redis import close_redis
 from backend.auth.config import oauth_config
@@ -12,10 +15,41 @@ from starlette.middleware.cors import CORSMiddleware
 from psycopg_pool import AsyncConnectionPool
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 from src.graph.builder import create_main_graph
+from src.tools.utils.resource_manager import get_resource_manager
+from src.tools.utils.http import http_client_manager, close_http_clients
+from src.tools.web.scraper.pool import get_crawler_pool
+
+
+def _log_warmup_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Resource warmup failed: {task.exception()!r}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    resource_manager = get_resource_manager()
+    warmup_task = None
+    warmup_stop = threading.Event()
+    if Config.WARMUP_RESOURCES:
+        # Load models in the background so startup is not blocked on them
+        warmup_task = asyncio.create_task(
+            asyncio.to_thread(resource_manager.warmup, stop_event=warmup_stop)
+        )
+        warmup_task.add_done_callback(_log_warmup_failure)
+    app.state.warmup_task = warmup_task
+    app.state.resource_manager = resource_manager
+    # Pooled Jina/SearXNG clients are created on first use and closed on shutdown
+    app.state.http_clients = http_client_manager
+    # Long-lived headless browsers shared by every web search
+    crawler_pool = get_crawler_pool()
+    if crawler_pool.size > 0:
+        try:
+            await crawler_pool.start()
+        except Exception as e:
+            # Scraping falls back to a browser per call; the rest of the API is fine
+            print(f"Error starting crawler pool, launching browsers per crawl: {e}")
+    app.state.crawler_pool = crawler_pool
+
     await init_db()
     pool = AsyncConnectionPool(
         conninfo=os.getenv("POSTGRES_DB_URL"),
@@ -36,6 +70,16 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    if warmup_task is not None and not warmup_task.done():
+        # A model already loading finishes in its thread; nothing after it starts
+        warmup_stop.set()
+        warmup_task.cancel()
+        try:
+            await warmup_task
+        except asyncio.CancelledError:
+            pass
+    await crawler_pool.close()
+    await close_http_clients()
     await close_redis()
     await pool.close()
 
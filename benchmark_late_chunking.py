@@ -0,0 +1,215 @@
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import List
+import numpy as np
+import torch
+from transformers import AutoModel, AutoTokenizer
+from src.tools.utils.embeddings.dense import init_dense_model
+from src.tools.utils.embeddings.late_chunking import batch_late_chunking
+
+
+def legacy_late_chunking(
+    chunks: List[str], model: AutoModel, tokenizer: AutoTokenizer, separator: str = " "
+) -> np.ndarray:
+    """The previous one-document, per-chunk tokenizing implementation."""
+    embed_text = "Passage: " + f"{separator}".join(chunks)
+    tokenization = tokenizer([embed_text], return_tensors="pt").to(model.device)
+    with torch.no_grad():
+        with torch.autocast(device_type=model.device.type, dtype=torch.bfloat16):
+            hidden_states = model.get_last_hidden_states(
+                **tokenization, task_label="retrieval"
+            )
+
+    start_idx = len(tokenizer("Passage:")["input_ids"])
+    chunk_embeddings = []
+    for chunk in chunks:
+        end_idx = start_idx + len(tokenizer(f"{separator}" + chunk)["input_ids"])
+        temp = hidden_states[:, start_idx:end_idx, :]
+        attention_mask = tokenization["attention_mask"][:, start_idx:end_idx]
+        pooled_output = torch.sum(
+            temp * attention_mask.unsqueeze(-1), dim=1
+        ) / torch.sum(attention_mask, dim=1, keepdim=True)
+        embedding = (
+            torch.nn.functional.normalize(pooled_output, p=2, dim=1)
+            .cpu()
+            .float()
+            .numpy()
+        )
+        chunk_embeddings.append(embedding[0])
+        start_idx = end_idx
+
+    return np.array(chunk_embeddings)
+
+
+def legacy_long_late_chunking(
+    chunks: List[str],
+    model: AutoModel,
+    tokenizer: AutoTokenizer,
+    separator: str = "\n\n",
+    max_tokens: int = 32768,
+    overlap_size: int = 1024,
+) -> np.ndarray:
+    """The previous windowing, re-tokenizing every window's text."""
+    text = f"{separator}".join(chunks)
+    if len(tokenizer("Passage: " + text)["input_ids"]) < max_tokens:
+        return legacy_late_chunking(chunks, model, tokenizer, separator)
+
+    final_embeddings = []
+    chunks_token_length = [len(tokenizer(chunk)["input_ids"]) for chunk in chunks]
+    i = 0
+    while i < len(chunks):
+        num_tokens = len(tokenizer("Passage:")["input_ids"])
+        j = 1
+        if i == 0:
+            temp_chunks = []
+        else:
+            while (num_tokens + chunks_token_length[i - j]) < overlap_size:
+                num_tokens += chunks_token_length[i - j]
+                j += 1
+            temp_chunks = chunks[i - j + 1 : i]
+
+        while (i < len(chunks)) and (
+            num_tokens + chunks_token_length[i]
+        ) < max_tokens:
+            temp_chunks.append(chunks[i])
+            num_tokens += chunks_token_length[i]
+            i += 1
+
+        temp_embeddings = legacy_late_chunking(temp_chunks, model, tokenizer, separator)
+        final_embeddings.append(temp_embeddings[j - 1 :, :])
+
+    return np.concatenate(final_embeddings, axis=0)
+
+
+def load_documents(root_dir: str, max_docs: int) -> List[List[str]]:
+    """Chunk contents of up to `max_docs` chunks.json files under `root_dir`."""
+    documents = []
+    for chunks_path in sorted(Path(root_dir).rglob("chunks.json")):
+        with open(chunks_path, "r") as f:
+            chunks = [chunk["content"] for chunk in json.load(f)]
+        if chunks:
+            documents.append(chunks)
+        if len(documents) >= max_docs:
+            break
+    return documents
+
+
+def compare(name: str, expected: List[np.ndarray], actual: List[np.ndarray]) -> float:
+    """Print the largest element difference and lowest cosine similarity."""
+    max_diff, min_cosine = 0.0, 1.0
+    for old, new in zip(expected, actual):
+        assert old.shape == new.shape, f"{name}: shape {new.shape} != {old.shape}"
+        max_diff = max(max_diff, float(np.abs(old - new).max()))
+        min_cosine = min(min_cosine, float(np.sum(old * new, axis=1).min()))
+    print(f"{name}: max abs diff {max_diff:.2e}, min cosine {min_cosine:.6f}")
+    return min_cosine
+
+
+def main(
+    root_dir: str,
+    max_docs: int = 32,
+    max_tokens: int = 8192,
+    overlap_size: int = 512,
+    max_batch_tokens: int = 16384,
+    max_batch_size: int = 16,
+    min_cosine: float = 0.999,
+    model_name: str = "jinaai/jina-embeddings-v4",
+):
+    model, tokenizer = init_dense_model(model_name)
+    documents = load_documents(root_dir, max_docs)
+    num_chunks = sum(len(chunks) for chunks in documents)
+    print(f"{len(documents)} documents, {num_chunks} chunks")
+
+    start = time.perf_counter()
+    legacy = [
+        legacy_long_late_chunking(
+            chunks,
+            model,
+            tokenizer,
+            max_tokens=max_tokens,
+            overlap_size=overlap_size,
+        )
+        for chunks in documents
+    ]
+    legacy_seconds = time.perf_counter() - start
+
+    unbatched = [
+        batch_late_chunking(
+            [chunks],
+            model,
+            tokenizer,
+            max_tokens=max_tokens,
+            overlap_size=overlap_size,
+            max_batch_tokens=max_tokens,
+            max_batch_size=1,
+        )[0]
+        for chunks in documents
+    ]
+
+    start = time.perf_counter()
+    batched = batch_late_chunking(
+        documents,
+        model,
+        tokenizer,
+        max_tokens=max_tokens,
+        overlap_size=overlap_size,
+        max_batch_tokens=max(max_batch_tokens, max_tokens),
+        max_batch_size=max_batch_size,
+    )
+    batched_seconds = time.perf_counter() - start
+
+    # Short documents embedded alone are expected to match bit for bit
+    short = [
+        i
+        for i, chunks in enumerate(documents)
+        if len(tokenizer("Passage: " + "\n\n".join(chunks))["input_ids"]) < max_tokens
+    ]
+    exact = all(np.array_equal(legacy[i], unbatched[i]) for i in short)
+    print(f"{len(short)} short documents unbatched: {'exact' if exact else 'DIFFER'}")
+    lowest = min(
+        compare("unbatched", legacy, unbatched),
+        compare("batched", legacy, batched),
+    )
+
+    print(
+        f"legacy {legacy_seconds:.2f}s, batched {batched_seconds:.2f}s "
+        f"({legacy_seconds / batched_seconds:.1f}x, "
+        f"{num_chunks / batched_seconds:.1f} chunks/sec)"
+    )
+    if not exact or lowest < min_cosine:
+        raise SystemExit("Late chunking differs from the legacy implementation.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check batched late chunking against the legacy implementation "
+        "and compare throughput."
+    )
+    parser.add_argument(
+        "root_dir", type=str, help="Root directory containing chunks.json files."
+    )
+    parser.add_argument("--max-docs", type=int, default=32)
+    parser.add_argument("--max-tokens", type=int, default=8192)
+    parser.add_argument("--overlap-size", type=int, default=512)
+    parser.add_argument("--max-batch-tokens", type=int, default=16384)
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument(
+        "--min-cosine",
+        type=float,
+        default=0.999,
+        help="Lowest accepted cosine similarity to the legacy embeddings.",
+    )
+    parser.add_argument("--model", type=str, default="jinaai/jina-embeddings-v4")
+    args = parser.parse_args()
+    main(
+        args.root_dir,
+        args.max_docs,
+        args.max_tokens,
+        args.overlap_size,
+        args.max_batch_tokens,
+        args.max_batch_size,
+        args.min_cosine,
+        args.model,
+    )
@@ -0,0 +1,183 @@
+import json
+import time
+import argparse
+import asyncio
+from statistics import mean, median
+from typing import Dict, List
+import numpy as np
+from src.tools.utils.reranker import RERANKER_BACKENDS, get_reranker
+from src.tools.web.search import SearXNGSearch
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def ranks_of(results: dict, n: int) -> np.ndarray:
+    """Rank position of every document (0 = best); unscored ones rank last."""
+    ranks = np.full(n, n, dtype=np.float64)
+    for rank, result in enumerate(results["results"]):
+        ranks[result["index"]] = rank
+    return ranks
+
+
+def agreement(reference: dict, candidate: dict, n: int, k: int) -> dict:
+    """Spearman correlation, top-1 match and top-k overlap of two rankings."""
+    ref_ranks = ranks_of(reference, n)
+    cand_ranks = ranks_of(candidate, n)
+    if n > 1 and ref_ranks.std() > 0 and cand_ranks.std() > 0:
+        spearman = float(np.corrcoef(ref_ranks, cand_ranks)[0, 1])
+    else:
+        spearman = 1.0
+    ref_top = [r["index"] for r in reference["results"][:k]]
+    cand_top = [r["index"] for r in candidate["results"][:k]]
+    return {
+        "spearman": spearman,
+        "top1_match": bool(ref_top[:1] == cand_top[:1]),
+        "topk_overlap": len(set(ref_top) & set(cand_top)) / max(len(ref_top), 1),
+    }
+
+
+async def collect_documents(queries: List[str], max_results: int) -> List[dict]:
+    """Search each query once and build the same "title content" documents
+    that URLRanker reranks."""
+    searcher = SearXNGSearch()
+    responses = await asyncio.gather(
+        *(searcher.search(query=q, max_results=max_results) for q in queries)
+    )
+    cases = []
+    for query, response in zip(queries, responses):
+        documents = list(
+            dict.fromkeys(
+                f"{r.title} {r.content}".strip() for r in response.results
+            )
+        )
+        if documents:
+            cases.append({"query": query, "documents": documents})
+    return cases
+
+
+async def main(
+    queries_path: str,
+    backends: List[str],
+    max_results: int = 20,
+    top_k: int = 5,
+    repeats: int = 3,
+    output_path: str = "reranker_benchmark.json",
+):
+    """Compare reranker backends on latency and on how well their rankings
+    agree with the first backend's."""
+    with open(queries_path, "r") as f:
+        data = json.load(f)
+    queries = [item["query"] if isinstance(item, dict) else item for item in data]
+    cases = await collect_documents(list(dict.fromkeys(queries)), max_results)
+    print(f"Collected documents for {len(cases)} queries.")
+    if not cases:
+        print("No search results to rerank.")
+        return
+
+    rankings: Dict[str, List[dict]] = {}
+    report = []
+    for backend in backends:
+        reranker = get_reranker(backend)
+        # Untimed first call so model loading doesn't count as latency
+        await reranker.rerank(cases[0]["query"], cases[0]["documents"])
+        latencies = []
+        for repeat in range(repeats):
+            for case in cases:
+                t0 = time.perf_counter()
+                result = await reranker.rerank(case["query"], case["documents"])
+                latencies.append(time.perf_counter() - t0)
+                if repeat == 0:
+                    rankings.setdefault(backend, []).append(result)
+        report.append(
+            {
+                "backend": backend,
+                "queries": len(cases),
+                "latency_ms_p50": median(latencies) * 1000,
+                "latency_ms_p95": percentile(latencies, 0.95) * 1000,
+            }
+        )
+
+    reference = backends[0]
+    for entry in report[1:]:
+        scores = [
+            agreement(ref, cand, len(case["documents"]), top_k)
+            for case, ref, cand in zip(
+                cases, rankings[reference], rankings[entry["backend"]]
+            )
+        ]
+        entry[f"spearman_vs_{reference}"] = mean(s["spearman"] for s in scores)
+        entry[f"top1_match_vs_{reference}"] = mean(s["top1_match"] for s in scores)
+        entry[f"top{top_k}_overlap_vs_{reference}"] = mean(
+            s["topk_overlap"] for s in scores
+        )
+
+    for entry in report:
+        print(
+            f"{entry['backend']}: "
+            + ", ".join(
+                f"{k}={v:.3f}" for k, v in entry.items() if isinstance(v, float)
+            )
+        )
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Benchmark results written to {output_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark reranker backends for latency and ranking agreement."
+    )
+    parser.add_argument(
+        "--queries",
+        type=str,
+        default="query_groundtruth_index.json",
+        help="JSON list of queries, or items with a 'query' field (e.g. the generate_evaluate_dataset.py index).",
+    )
+    parser.add_argument(
+        "--backends",
+        type=str,
+        nargs="+",
+        default=list(RERANKER_BACKENDS),
+        choices=RERANKER_BACKENDS,
+        help="Backends to compare; agreement is measured against the first one.",
+    )
+    parser.add_argument(
+        "--max-results",
+        type=int,
+        default=20,
+        help="SearXNG results reranked per query.",
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=5,
+        help="Cut-off for the top-k overlap metric.",
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=3,
+        help="Timing repetitions per backend.",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="reranker_benchmark.json",
+        help="Where to write the results.",
+    )
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.queries,
+            args.backends,
+            args.max_results,
+            args.top_k,
+            args.repeats,
+            args.output,
+        )
+    )
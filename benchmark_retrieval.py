@@ -0,0 +1,214 @@
+import json
+import time
+import argparse
+import asyncio
+from dataclasses import asdict, replace
+from pathlib import Path
+from statistics import mean, median
+from typing import Dict, List
+from src.tools.rag.config import RetrievalConfig, get_retrieval_config
+from src.tools.rag.retrieve import embed_queries, retrieve_batch
+from src.tools.utils.resource_manager import get_resource_manager
+
+# Candidate settings compared against each collection's current config
+DEFAULT_GRID: Dict[str, dict] = {
+    "current": {},
+    "rrf": {"fusion": "rrf"},
+    "prefetch_50": {"dense_limit": 50, "sparse_limit": 50},
+    "ef_64": {"hnsw_ef": 64},
+    "ef_256": {"hnsw_ef": 256},
+}
+
+# Fields the metrics need, whatever the config projects
+REQUIRED_PAYLOAD_FIELDS = ["content", "metadata.source"]
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def score_points(item: dict, points) -> dict:
+    """Document recall (source file matches), reciprocal rank and whether a
+    retrieved chunk contains the reference context."""
+    reference = normalize(item.get("reference_context", ""))
+    doc_rank = None
+    context_hit = False
+    for rank, point in enumerate(points, start=1):
+        payload = point.payload or {}
+        source = payload.get("metadata", {}).get("source", "")
+        if doc_rank is None and Path(source).stem == item["filename"]:
+            doc_rank = rank
+        if reference and reference in normalize(payload.get("content", "")):
+            context_hit = True
+    return {
+        "doc_hit": doc_rank is not None,
+        "reciprocal_rank": 1 / doc_rank if doc_rank else 0.0,
+        "context_hit": context_hit,
+    }
+
+
+async def benchmark_config(
+    name: str,
+    config: RetrievalConfig,
+    collection_name: str,
+    items: List[dict],
+    batch_size: int,
+    repeats: int,
+) -> dict:
+    if config.payload_fields is not None:
+        config = replace(
+            config,
+            payload_fields=sorted(
+                set(config.payload_fields) | set(REQUIRED_PAYLOAD_FIELDS)
+            ),
+        )
+
+    latencies = []
+    scores = []
+    for repeat in range(repeats):
+        for start in range(0, len(items), batch_size):
+            batch = items[start : start + batch_size]
+            t0 = time.perf_counter()
+            results = await retrieve_batch(
+                [item["query"] for item in batch], collection_name, config=config
+            )
+            latencies.append((time.perf_counter() - t0) / len(batch))
+            if repeat == 0:
+                scores.extend(
+                    score_points(item, result.points)
+                    for item, result in zip(batch, results)
+                )
+
+    return {
+        "name": name,
+        "collection": collection_name,
+        "config": asdict(config),
+        "queries": len(items),
+        f"recall@{config.limit}": mean(s["doc_hit"] for s in scores),
+        "mrr": mean(s["reciprocal_rank"] for s in scores),
+        f"context_hit@{config.limit}": mean(s["context_hit"] for s in scores),
+        "latency_ms_per_query_p50": median(latencies) * 1000,
+        "latency_ms_per_query_p95": percentile(latencies, 0.95) * 1000,
+    }
+
+
+async def main(
+    index_path: str,
+    configs_path: str | None = None,
+    collections: List[str] | None = None,
+    batch_size: int = 8,
+    repeats: int = 3,
+    output_path: str = "retrieval_benchmark.json",
+):
+    """Compare retrieval configs on the query/groundtruth index written by
+    generate_evaluate_dataset.py (items with aspect, filename, query,
+    groundtruth and reference_context; aspect is the collection name)."""
+    with open(index_path, "r") as f:
+        index = json.load(f)
+    grid = DEFAULT_GRID
+    if configs_path:
+        with open(configs_path, "r") as f:
+            grid = json.load(f)
+
+    by_collection: Dict[str, List[dict]] = {}
+    for item in index:
+        by_collection.setdefault(item["aspect"], []).append(item)
+    if collections:
+        by_collection = {c: by_collection.get(c, []) for c in collections}
+
+    resource_manager = get_resource_manager()
+    resource_manager.initialize_models()
+    resource_manager.initialize_client()
+
+    # Embed every query up front so the timings measure search, not the encoders
+    await embed_queries(
+        [item["query"] for item in index],
+        resource_manager.dense_model,
+        resource_manager.sparse_model,
+    )
+
+    results = []
+    for collection_name, items in by_collection.items():
+        if not items:
+            print(f"No queries for collection {collection_name}, skipping.")
+            continue
+        base = get_retrieval_config(collection_name)
+        for name, overrides in grid.items():
+            config = RetrievalConfig.from_dict({**asdict(base), **overrides})
+            result = await benchmark_config(
+                name, config, collection_name, items, batch_size, repeats
+            )
+            results.append(result)
+            print(
+                f"[{collection_name}] {name}: "
+                + ", ".join(
+                    f"{k}={v:.3f}"
+                    for k, v in result.items()
+                    if isinstance(v, float)
+                )
+            )
+
+    with open(output_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results written to {output_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark retrieval configs for latency and recall@k."
+    )
+    parser.add_argument(
+        "--index",
+        type=str,
+        default="query_groundtruth_index.json",
+        help="Query/groundtruth index produced by generate_evaluate_dataset.py.",
+    )
+    parser.add_argument(
+        "--configs",
+        type=str,
+        default=None,
+        help='JSON file of {"name": {config overrides}} to compare (default: a built-in grid).',
+    )
+    parser.add_argument(
+        "--collections",
+        type=str,
+        nargs="*",
+        default=None,
+        help="Collections to benchmark (default: every aspect in the index).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=8,
+        help="Queries per retrieve_batch call, like one retrieval loop of a subgraph.",
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=3,
+        help="Timing repetitions per config.",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="retrieval_benchmark.json",
+        help="Where to write the results.",
+    )
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.index,
+            args.configs,
+            args.collections,
+            args.batch_size,
+            args.repeats,
+            args.output,
+        )
+    )
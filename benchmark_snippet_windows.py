@@ -0,0 +1,112 @@
+import time
+import argparse
+from typing import List
+import numpy as np
+from src.tools.web.scraper.selector import SemanticSnippetSelector
+
+
+def legacy_windowed_indexes(
+    similarities: np.ndarray, window_size: int = 1, top_k: int = 3
+) -> List[tuple[int, int]]:
+    """The previous argsort + set based window selection, for comparison."""
+    sorted_indexes = np.argsort(similarities)[::-1]
+    length = len(sorted_indexes)
+    top_k_sorted_indexes = [
+        i for i in sorted_indexes[:top_k] if np.isfinite(similarities[i])
+    ]
+    selected_chunks = set()
+    for center_idx in top_k_sorted_indexes:
+        start_idx = max(0, center_idx - window_size)
+        end_idx = min(center_idx + window_size + 1, length)
+        selected_chunks.update(range(start_idx, end_idx))
+
+    selected_chunks = sorted(list(selected_chunks))
+    windows = []
+    start = selected_chunks[0]
+    prev = start
+    for curr in selected_chunks[1:]:
+        if curr != prev + 1:
+            windows.append((start, prev + 1))
+            start = curr
+        prev = curr
+    windows.append((start, prev + 1))
+    return windows
+
+
+def legacy_scores(query_embeddings: np.ndarray, chunk_embeddings: np.ndarray):
+    """One dot product per query, as select_snippets used to run."""
+    return [np.dot(q, chunk_embeddings.T) for q in query_embeddings]
+
+
+def time_it(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main(
+    num_chunks: int = 400,
+    num_queries: int = 8,
+    dim: int = 1024,
+    window_size: int = 1,
+    top_k: int = 5,
+    repeats: int = 200,
+):
+    rng = np.random.default_rng(0)
+    selector = SemanticSnippetSelector.__new__(SemanticSnippetSelector)
+    chunks = rng.standard_normal((num_chunks, dim)).astype(np.float32)
+    queries = rng.standard_normal((num_queries, dim)).astype(np.float32)
+    normalized_chunks = selector._normalize(chunks)
+    normalized_queries = selector._normalize(queries)
+
+    similarities = normalized_queries @ normalized_chunks.T
+    for row in similarities:
+        assert [
+            tuple(map(int, w))
+            for w in legacy_windowed_indexes(row, window_size, top_k)
+        ] == selector._get_windowed_indexes(row, window_size, top_k)
+    print("Vectorized windows match the legacy selection.")
+
+    row = similarities[0]
+    legacy_windows = time_it(
+        lambda: legacy_windowed_indexes(row, window_size, top_k), repeats
+    )
+    windows = time_it(
+        lambda: selector._get_windowed_indexes(row, window_size, top_k), repeats
+    )
+    legacy_matmul = time_it(
+        lambda: legacy_scores(normalized_queries, normalized_chunks), repeats
+    )
+    matmul = time_it(lambda: normalized_queries @ normalized_chunks.T, repeats)
+
+    print(f"{num_chunks} chunks, {num_queries} queries, dim {dim}")
+    print(
+        f"windows: legacy {legacy_windows * 1e6:.1f}us, vectorized "
+        f"{windows * 1e6:.1f}us ({legacy_windows / windows:.1f}x)"
+    )
+    print(
+        f"scoring: per-query {legacy_matmul * 1e6:.1f}us, single product "
+        f"{matmul * 1e6:.1f}us ({legacy_matmul / matmul:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Microbenchmark snippet window selection and scoring."
+    )
+    parser.add_argument("--num-chunks", type=int, default=400)
+    parser.add_argument("--num-queries", type=int, default=8)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--window-size", type=int, default=1)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+    main(
+        args.num_chunks,
+        args.num_queries,
+        args.dim,
+        args.window_size,
+        args.top_k,
+        args.repeats,
+    )
@@ -1,63 +1,60 @@
-import os
-import json
 import argparse
 import asyncio
-from langchain_core.documents import Document
-from src.tools.rag.utils import upload_points_per_doc, create_vector_store
+import numpy as np
+from src.tools.rag.ingestion import IngestionConfig, run_ingestion
 
 from src.tools.utils.resource_manager import get_resource_manager
 
 
-async def process_category(
-    category_path, category_name, client, model, tokenizer, sparse_model
+async def main(
+    root_dir,
+    batch_size=128,
+    max_concurrency=4,
+    manifest_dir=None,
+    rebuild=False,
+    docs_per_batch=8,
+    float16=False,
+    reader_concurrency=4,
+    embed_workers=1,
+    writer_concurrency=2,
+    queue_size=16,
 ):
-    await create_vector_store(client, category_name)
-    for doc_folder in os.listdir(category_path):
-        doc_path = os.path.join(category_path, doc_folder)
-        if not os.path.isdir(doc_path):
-            continue
-        chunks_path = os.path.join(doc_path, "chunks.json")
-        if not os.path.exists(chunks_path):
-            print(f"No chunks.json in {doc_path}, skipping.")
-            continue
-        with open(chunks_path, "r") as f:
-            chunks_data = json.load(f)
-        chunks = [
-            Document(page_content=chunk["content"], metadata=chunk.get("metadata", {}))
-            for chunk in chunks_data
-        ]
-        print(
-            f"Uploading {len(chunks)} chunks from {chunks_path} to collection {category_name}"
-        )
-        await upload_points_per_doc(
-            chunks=chunks,
-            client=client,
-            collection_name=category_name,
-            model=model,
-            tokenizer=tokenizer,
-            sparse_model=sparse_model,
-        )
-
-
-async def main(root_dir):
     resource_manager = get_resource_manager()
     resource_manager.initialize_models()
     resource_manager.initialize_client()
 
-    client = resource_manager.qdrant_client
-    tokenizer = resource_manager.tokenizer
-    sparse_model = resource_manager.sparse_model
-    model = resource_manager.dense_model
+    config = IngestionConfig(
+        reader_concurrency=reader_concurrency,
+        embed_workers=embed_workers,
+        writer_concurrency=writer_concurrency,
+        queue_size=queue_size,
+        docs_per_batch=docs_per_batch,
+        batch_size=batch_size,
+        max_concurrency=max_concurrency,
+        embedding_dtype=np.float16 if float16 else np.float32,
+        rebuild=rebuild,
+    )
+    report = await run_ingestion(
+        root_dir,
+        client=resource_manager.qdrant_client,
+        model=resource_manager.dense_model,
+        tokenizer=resource_manager.tokenizer,
+        sparse_model=resource_manager.sparse_model,
+        manifest_dir=manifest_dir,
+        config=config,
+    )
 
-    for category in os.listdir(root_dir):
-        category_path = os.path.join(root_dir, category)
-        if not os.path.isdir(category_path):
-            continue
-        print(f"Processing category: {category}")
-        await process_category(
-            category_path, category, client, model, tokenizer, sparse_model
-        )
-    print("All done!")
+    for stage in report.stages.values():
+        print(stage)
+    total_stats = report.upload
+    elapsed = report.seconds
+    print(
+        f"All done! Uploaded {total_stats.points} points "
+        f"({total_stats.skipped_points} unchanged, {total_stats.deleted_points} deleted, "
+        f"{total_stats.failed_points} failed, {total_stats.retried_batches} retried batches) "
+        f"in {elapsed:.2f}s ({total_stats.points / elapsed if elapsed else 0:.1f} points/sec overall, "
+        f"{total_stats.points_per_sec:.1f} points/sec upsert throughput)"
+    )
 
 
 if __name__ == "__main__":
@@ -67,5 +64,77 @@ if __name__ == "__main__":
     parser.add_argument(
         "root_dir", type=str, help="Root directory containing category subfolders."
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=128,
+        help="Number of points per upsert request.",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of upsert batches in flight at once per document.",
+    )
+    parser.add_argument(
+        "--manifest-dir",
+        type=str,
+        default=None,
+        help="Directory for the per-collection index manifests (default: <root_dir>/.index_manifest).",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Ignore the manifests and re-index every document.",
+    )
+    parser.add_argument(
+        "--docs-per-batch",
+        type=int,
+        default=8,
+        help="Number of documents embedded together by the batched late-chunking embedder.",
+    )
+    parser.add_argument(
+        "--float16",
+        action="store_true",
+        help="Keep dense embeddings as float16 before upload to halve their memory.",
+    )
+    parser.add_argument(
+        "--reader-concurrency",
+        type=int,
+        default=4,
+        help="Number of concurrent chunks.json readers.",
+    )
+    parser.add_argument(
+        "--embed-workers",
+        type=int,
+        default=1,
+        help="Number of embedding worker threads.",
+    )
+    parser.add_argument(
+        "--writer-concurrency",
+        type=int,
+        default=2,
+        help="Number of documents upserted to Qdrant at the same time.",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=16,
+        help="Capacity of each queue between stages, in documents.",
+    )
     args = parser.parse_args()
-    asyncio.run(main(args.root_dir))
+    asyncio.run(
+        main(
+            args.root_dir,
+            args.batch_size,
+            args.max_concurrency,
+            args.manifest_dir,
+            args.rebuild,
+            args.docs_per_batch,
+            args.float16,
+            args.reader_concurrency,
+            args.embed_workers,
+            args.writer_concurrency,
+            args.queue_size,
+        )
+    )
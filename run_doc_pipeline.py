@@ -33,15 +33,51 @@ def main():
             "  all: Run all steps in order"
         ),
     )
+    parser.add_argument(
+        "--num_workers",
+        type=int,
+        default=1,
+        help="Number of PDF parsing processes, each loading its own layout model",
+    )
+    parser.add_argument(
+        "--pdf_timeout",
+        type=float,
+        default=None,
+        help="Per-PDF parsing timeout in seconds (only with --num_workers > 1)",
+    )
+    parser.add_argument(
+        "--image_format",
+        type=str,
+        choices=["png", "webp", "jpeg"],
+        default="png",
+        help="Format of the saved page, table and picture images",
+    )
+    parser.add_argument(
+        "--image_quality",
+        type=int,
+        default=90,
+        help="WebP/JPEG quality of the saved images",
+    )
+    parser.add_argument(
+        "--skip_page_images",
+        action="store_true",
+        help="Do not save full page images (table and picture crops are still saved)",
+    )
     args = parser.parse_args()
 
     pipeline = DocumentExtractionPipeline(
-        input_root=Path(args.input_dir), output_root=Path(args.output_dir)
+        input_root=Path(args.input_dir),
+        output_root=Path(args.output_dir),
+        parser_options={
+            "image_format": args.image_format,
+            "image_quality": args.image_quality,
+            "save_page_images": not args.skip_page_images,
+        },
     )
 
     if args.step in ("parse-pdfs", "all"):
         print("[CLI] Parsing PDFs and extracting assets...")
-        pipeline.process_pdfs()
+        pipeline.process_pdfs(num_workers=args.num_workers, timeout=args.pdf_timeout)
     if args.step in ("generate-metadata", "all"):
         print("[CLI] Generating metadata asynchronously...")
         asyncio.run(pipeline.batch_generate_metadata())
@@ -1,5 +1,4 @@
 import json
-import asyncio
 import logging
 from typing import Literal
 from pydantic_ai import Agent, RunContext
@@ -282,19 +281,11 @@ async def retriever(
             )
             + "\n"
         )
-        scrape_task = asyncio.create_task(
-            web_search_pipeline.scrape_unique_urls(per_query_top_results)
-        )
-        embedding_task = asyncio.create_task(
-            web_search_pipeline.get_query_embeddings_for_queries(search_queries)
-        )
-
-        url_to_content, query_embeddings = await asyncio.gather(
-            scrape_task, embedding_task
-        )
-
-        web_results = await web_search_pipeline.extract_relevant_snippets_for_queries(
-            search_queries, per_query_top_results, url_to_content, query_embeddings
+        # Pages are embedded as they are scraped; stragglers past the deadline are dropped
+        web_results = (
+            await web_search_pipeline.scrape_and_extract_snippets_for_queries(
+                search_queries, per_query_top_results
+            )
         )
 
         # logger.info(f"Web Results: {web_results}")
@@ -22,6 +22,12 @@ class DocumentPipelineConfig:
     page_break_placeholder: str = "<!-- PAGE BREAK -->"
     image_description_prompt: str = IMAGE_DESCRIPTION_PROMPT
     use_remote_services: bool = True
+    # Multimodal assets: "png", "webp" or "jpeg" (quality applies to the last two)
+    asset_image_format: str = "png"
+    asset_image_quality: int = 90
+    save_page_images: bool = True
+    asset_writer_workers: int = 4
+    asset_writer_max_pending: int = 32
 
 
 document_pipeline_config = DocumentPipelineConfig()
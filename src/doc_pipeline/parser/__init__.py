@@ -1,3 +1,4 @@
 from src.doc_pipeline.parser.pdf_parser import PdfParser
+from src.doc_pipeline.parser.asset_writer import AssetWriter
 
-__all__ = ["PdfParser"]
+__all__ = ["PdfParser", "AssetWriter"]
@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+from PIL import Image
+
+IMAGE_FORMATS = {"png": "PNG", "webp": "WEBP", "jpeg": "JPEG"}
+IMAGE_EXTENSIONS = {"png": "png", "webp": "webp", "jpeg": "jpg"}
+
+
+@dataclass
+class AssetRecord:
+    kind: str  # "page", "table" or "picture"
+    path: str  # relative to the document's output dir
+    width: int
+    height: int
+    bytes: int
+    page_no: Optional[int] = None
+
+
+class AssetBatch:
+    """The assets of one document; `wait()` blocks until all are on disk and
+    writes `assets.json` next to them."""
+
+    def __init__(self, output_dir: Path, image_format: str):
+        self.output_dir = output_dir
+        self.image_format = image_format
+        self._futures: List[Future] = []
+
+    def wait(self) -> Dict:
+        # Raises the first write error, if any
+        records: List[AssetRecord] = [future.result() for future in self._futures]
+        manifest = {
+            "format": self.image_format,
+            "pages": [asdict(r) for r in records if r.kind == "page"],
+            "tables": [asdict(r) for r in records if r.kind == "table"],
+            "pictures": [asdict(r) for r in records if r.kind == "picture"],
+        }
+        with open(self.output_dir / "assets.json", "w") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+    def cancel(self):
+        """Drop the writes that have not started and wait for the running ones,
+        so nothing lands in `output_dir` after the document is abandoned."""
+        for future in self._futures:
+            future.cancel()
+        wait(self._futures)
+
+
+class AssetWriter:
+    """Encodes and saves images on a background thread pool.
+
+    At most `max_pending` images are queued at once; `submit` blocks beyond
+    that so rendered crops cannot pile up in memory faster than they are saved.
+    PIL releases the GIL while encoding, so the threads run in parallel.
+    """
+
+    def __init__(
+        self,
+        image_format: str = "png",
+        quality: int = 90,
+        max_workers: int = 4,
+        max_pending: int = 32,
+    ):
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(
+                f"Unsupported image format {image_format!r}, "
+                f"expected one of {list(IMAGE_FORMATS)}"
+            )
+        self.image_format = image_format
+        self.quality = quality
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="asset-writer"
+        )
+        self._pending = threading.BoundedSemaphore(max_pending)
+
+    def new_batch(self, output_dir: Path) -> AssetBatch:
+        return AssetBatch(output_dir, self.image_format)
+
+    def filename(self, stem: str) -> str:
+        return f"{stem}.{IMAGE_EXTENSIONS[self.image_format]}"
+
+    def submit(
+        self,
+        batch: AssetBatch,
+        image: Image.Image,
+        rel_path: str,
+        kind: str,
+        page_no: Optional[int] = None,
+    ):
+        self._pending.acquire()
+        try:
+            future = self._executor.submit(
+                self._write, image, batch.output_dir, rel_path, kind, page_no
+            )
+        except BaseException:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        batch._futures.append(future)
+
+    def _write(
+        self,
+        image: Image.Image,
+        output_dir: Path,
+        rel_path: str,
+        kind: str,
+        page_no: Optional[int],
+    ) -> AssetRecord:
+        path = output_dir / rel_path
+        params = {}
+        if self.image_format == "jpeg":
+            # JPEG has no alpha channel
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            params = {"quality": self.quality, "optimize": True}
+        elif self.image_format == "webp":
+            params = {"quality": self.quality, "method": 4}
+        with path.open("wb") as f:
+            image.save(f, IMAGE_FORMATS[self.image_format], **params)
+        return AssetRecord(
+            kind=kind,
+            path=rel_path,
+            width=image.width,
+            height=image.height,
+            bytes=os.path.getsize(path),
+            page_no=page_no,
+        )
+
+    def close(self, cancel_pending: bool = False):
+        """Wait for queued writes (or drop them with `cancel_pending`) and stop
+        the threads."""
+        self._executor.shutdown(wait=True, cancel_futures=cancel_pending)
@@ -12,10 +12,23 @@ from docling.datamodel.pipeline_options import (
 )
 from docling_core.types.doc import PictureItem, TableItem
 from src.doc_pipeline.config import document_pipeline_config
+from src.doc_pipeline.parser.asset_writer import AssetBatch, AssetWriter
 
 
 class PdfParser:
-    def __init__(self):
+    def __init__(
+        self,
+        image_format: str = document_pipeline_config.asset_image_format,
+        image_quality: int = document_pipeline_config.asset_image_quality,
+        save_page_images: bool = document_pipeline_config.save_page_images,
+    ):
+        self.save_page_images = save_page_images
+        self.asset_writer = AssetWriter(
+            image_format=image_format,
+            quality=image_quality,
+            max_workers=document_pipeline_config.asset_writer_workers,
+            max_pending=document_pipeline_config.asset_writer_max_pending,
+        )
         self.parser = DocumentConverter(
             format_options={
                 InputFormat.PDF: PdfFormatOption(
@@ -24,6 +37,16 @@ class PdfParser:
             }
         )
 
+    def __enter__(self) -> "PdfParser":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self, cancel_pending: bool = False):
+        """Stop the background asset writer."""
+        self.asset_writer.close(cancel_pending=cancel_pending)
+
     def _get_picture_description_options(
         self, model: str, prompt: str, use_api: bool = True
     ) -> PictureDescriptionApiOptions | PictureDescriptionVlmOptions:
@@ -72,35 +95,53 @@ class PdfParser:
             doc = document
         doc.save_as_json(output_path)
 
-    def save_multimodal_assets_to_folders(self, doc: DoclingDocument, output_dir: Path):
+    def save_multimodal_assets_to_folders(
+        self, doc: DoclingDocument, output_dir: Path, wait: bool = True
+    ) -> AssetBatch:
         """
         Save page images, tables, and pictures into 'pages', 'tables', and 'images' subfolders under output_dir.
+        Images are encoded by the background asset writer; with wait=False the caller must call
+        `wait()` on the returned batch, which also writes the assets.json manifest.
         """
         (output_dir / "images").mkdir(exist_ok=True)
         (output_dir / "tables").mkdir(exist_ok=True)
-        (output_dir / "pages").mkdir(exist_ok=True)
+        if self.save_page_images:
+            (output_dir / "pages").mkdir(exist_ok=True)
 
+        writer = self.asset_writer
+        batch = writer.new_batch(output_dir)
         table_counter = 0
         picture_counter = 0
         # Save page images
-        for page_no, page in doc.pages.items():
-            page_no = page.page_no
-            page_image_filename = output_dir / "pages" / f"page_{page_no}.png"
-            with page_image_filename.open("wb") as f:
-                page.image.pil_image.save(f, "PNG")
+        if self.save_page_images:
+            for page in doc.pages.values():
+                writer.submit(
+                    batch,
+                    page.image.pil_image,
+                    f"pages/{writer.filename(f'page_{page.page_no}')}",
+                    "page",
+                    page_no=page.page_no,
+                )
         # Save tables and pictures
         for element, _ in doc.iterate_items():
             if isinstance(element, TableItem):
                 table_counter += 1
-                element_image_filename = (
-                    output_dir / "tables" / f"table_{table_counter}.png"
+                writer.submit(
+                    batch,
+                    element.get_image(doc),
+                    f"tables/{writer.filename(f'table_{table_counter}')}",
+                    "table",
+                    page_no=element.prov[0].page_no if element.prov else None,
                 )
-                with element_image_filename.open("wb") as f:
-                    element.get_image(doc).save(f, "PNG")
             if isinstance(element, PictureItem):
                 picture_counter += 1
-                element_image_filename = (
-                    output_dir / "images" / f"picture_{picture_counter}.png"
+                writer.submit(
+                    batch,
+                    element.get_image(doc),
+                    f"images/{writer.filename(f'picture_{picture_counter}')}",
+                    "picture",
+                    page_no=element.prov[0].page_no if element.prov else None,
                 )
-                with element_image_filename.open("wb") as f:
-                    element.get_image(doc).save(f, "PNG")
+        if wait:
+            batch.wait()
+        return batch
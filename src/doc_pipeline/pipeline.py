@@ -1,7 +1,14 @@
 import os
 import json
+import atexit
+import time
+import signal
 import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, asdict
 from pathlib import Path
+from typing import List, Optional, Tuple
 from src.doc_pipeline.parser.pdf_parser import PdfParser
 from src.doc_pipeline.llms import MetadataExtractor, DocumentMetadata
 from src.doc_pipeline.utils import get_first_page_content
@@ -11,16 +18,118 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+@dataclass
+class PdfParseResult:
+    pdf_path: str
+    status: str  # "done", "skipped", "failed" or "timeout"
+    seconds: float = 0.0
+    pages: int = 0
+    error: Optional[str] = None
+
+
+class PdfParseTimeout(BaseException):
+    # BaseException so Docling's own `except Exception` handlers don't swallow it
+    pass
+
+
+# Per-process pipeline used by the parse workers, each with its own converter
+_worker_pipeline: Optional["DocumentExtractionPipeline"] = None
+
+
+def _init_parse_worker(input_root: str, output_root: str, parser_options: dict):
+    global _worker_pipeline
+    if _worker_pipeline is None:
+        # Stop the asset writer's threads when the pool shuts the worker down
+        atexit.register(_close_parse_worker)
+    _worker_pipeline = DocumentExtractionPipeline(
+        input_root, output_root, parser_options=parser_options
+    )
+    # Load the layout model once per worker rather than on its first PDF
+    _worker_pipeline.parser
+
+
+def _close_parse_worker():
+    if _worker_pipeline is not None:
+        _worker_pipeline.close()
+
+
+def _recycle_parse_worker():
+    """Give the worker a fresh pipeline after a timeout.
+
+    The alarm lands wherever the converter happened to be, possibly half-way
+    through updating its own state, so it is not reused. Writes still queued
+    for the abandoned PDF are dropped and running ones drained first.
+    """
+    old_pipeline = _worker_pipeline
+    old_pipeline.close(cancel_pending=True)
+    _init_parse_worker(
+        str(old_pipeline.input_root),
+        str(old_pipeline.output_root),
+        old_pipeline.parser_options,
+    )
+
+
+def _raise_parse_timeout(signum, frame):
+    raise PdfParseTimeout()
+
+
+def _parse_pdf_in_worker(
+    pdf_path: Path, rel_path: Path, timeout: Optional[float]
+) -> PdfParseResult:
+    # Tasks run on the worker's main thread, so SIGALRM can interrupt a stuck
+    # parse. Python only handles the signal between bytecodes, so a call stuck
+    # in native code is interrupted once it returns to Python.
+    use_alarm = timeout is not None and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_parse_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return _worker_pipeline.process_pdf(pdf_path, rel_path)
+    except PdfParseTimeout:
+        _recycle_parse_worker()
+        return PdfParseResult(
+            str(pdf_path), "timeout", error=f"exceeded {timeout:.0f}s"
+        )
+    except Exception as e:
+        return PdfParseResult(str(pdf_path), "failed", error=repr(e))
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
 class DocumentExtractionPipeline:
     def __init__(
         self,
         input_root: str = "./database",
         output_root: str = "./extracted_data",
+        parser_options: Optional[dict] = None,
     ):
+        """parser_options: keyword arguments for PdfParser (image_format,
+        image_quality, save_page_images)."""
         self.input_root = Path(input_root)
         self.output_root = Path(output_root)
-        self.parser = PdfParser()
-        self.metadata_extractor = MetadataExtractor()
+        self.parser_options = parser_options or {}
+        self._parser: Optional[PdfParser] = None
+        self._metadata_extractor: Optional[MetadataExtractor] = None
+
+    @property
+    def parser(self) -> PdfParser:
+        # Built on first use so process-pool mode never loads it in the parent
+        if self._parser is None:
+            self._parser = PdfParser(**self.parser_options)
+        return self._parser
+
+    def close(self, cancel_pending: bool = False):
+        """Stop the parser's asset writer; a later parse builds a new parser."""
+        if self._parser is not None:
+            self._parser.close(cancel_pending=cancel_pending)
+            self._parser = None
+
+    @property
+    def metadata_extractor(self) -> MetadataExtractor:
+        if self._metadata_extractor is None:
+            self._metadata_extractor = MetadataExtractor()
+        return self._metadata_extractor
 
     def chunk_document(self, dir_path: Path):
         """
@@ -37,7 +146,7 @@ class DocumentExtractionPipeline:
         save_chunks(chunks, str(output_path))
         return len(chunks)
 
-    def process_pdf(self, pdf_path: Path, rel_path: Path):
+    def process_pdf(self, pdf_path: Path, rel_path: Path) -> PdfParseResult:
         """
         Process a single PDF: parse, save document.json, images, tables, pages, and chunks.json (placeholder).
         rel_path: relative path from input_root to the PDF (e.g., harms/file_name.pdf)
@@ -48,31 +157,142 @@ class DocumentExtractionPipeline:
         doc_json_path = output_dir / "document.json"
         if doc_json_path.exists():
             print(f"[SKIP] File already processed: {pdf_path}")
-            return
+            return PdfParseResult(str(pdf_path), "skipped")
 
+        start = time.perf_counter()
         print(f"[START] Processing file: {pdf_path} (relative: {rel_path})")
         # 1. Parse PDF
         print("\t[1/3] Parsing PDF ...")
         doc = self.parser.convert_document(str(pdf_path))
 
-        # 2. Save document as JSON
-        print(f"\t[2/3] Saving JSON to: {doc_json_path}")
-        self.parser.save_to_json(doc, str(doc_json_path))
+        assets = None
+        try:
+            # 2. Queue images, tables, and page images on the background asset writer
+            print(f"\t[2/3] Saving multimodal assets to: {output_dir}")
+            assets = self.parser.save_multimodal_assets_to_folders(
+                doc, output_dir, wait=False
+            )
 
-        # 3. Save images, tables, and page images using the new method
-        print(f"\t[3/3] Saving multimodal assets to: {output_dir}")
-        self.parser.save_multimodal_assets_to_folders(doc, output_dir)
+            # 3. Save document as JSON while the assets are being encoded
+            print(f"\t[3/3] Saving JSON to: {doc_json_path}")
+            self.parser.save_to_json(doc, str(doc_json_path))
+            assets.wait()
+        except BaseException:
+            if assets is not None:
+                assets.cancel()
+            # document.json marks the PDF as done, so drop it if assets are missing
+            doc_json_path.unlink(missing_ok=True)
+            raise
         print(f"[DONE] Finished processing: {pdf_path}\n")
+        return PdfParseResult(
+            str(pdf_path),
+            "done",
+            seconds=time.perf_counter() - start,
+            pages=len(doc.pages),
+        )
 
-    def process_pdfs(self):
-        """Process all PDFs: parse, save document.json, images, tables, pages."""
+    def find_pdfs(self) -> List[Tuple[Path, Path]]:
+        """(pdf_path, path relative to input_root) for every PDF under input_root."""
+        pdfs = []
         for dirpath, _, filenames in os.walk(self.input_root):
             for filename in filenames:
                 if filename.lower().endswith(".pdf"):
                     pdf_path = Path(dirpath) / filename
-                    rel_path = pdf_path.relative_to(self.input_root)
+                    pdfs.append((pdf_path, pdf_path.relative_to(self.input_root)))
+        return pdfs
+
+    def process_pdfs(self, num_workers: int = 1, timeout: Optional[float] = None):
+        """Process all PDFs: parse, save document.json, images, tables, pages.
+
+        With `num_workers > 1` PDFs are parsed in a process pool where every
+        worker holds its own DocumentConverter. `timeout` (seconds, process-pool
+        mode on platforms with SIGALRM) abandons a PDF that takes too long.
+        Already processed PDFs are skipped either way.
+        """
+        pdfs = self.find_pdfs()
+        start = time.perf_counter()
+        results: List[PdfParseResult] = []
+
+        if num_workers <= 1:
+            try:
+                for pdf_path, rel_path in pdfs:
                     print(f"\n{'=' * 60}\n")
-                    self.process_pdf(pdf_path, rel_path)
+                    try:
+                        results.append(self.process_pdf(pdf_path, rel_path))
+                    except Exception as e:
+                        print(f"[ERROR] Failed to process {pdf_path}: {e}")
+                        results.append(
+                            PdfParseResult(str(pdf_path), "failed", error=repr(e))
+                        )
+            finally:
+                self.close()
+        else:
+            # spawn: forking a parent that has imported torch is not safe
+            with ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_parse_worker,
+                initargs=(
+                    str(self.input_root),
+                    str(self.output_root),
+                    self.parser_options,
+                ),
+            ) as executor:
+                futures = {
+                    executor.submit(
+                        _parse_pdf_in_worker, pdf_path, rel_path, timeout
+                    ): pdf_path
+                    for pdf_path, rel_path in pdfs
+                }
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # e.g. a worker killed by the OS; the pool is broken after this
+                        result = PdfParseResult(
+                            str(futures[future]), "failed", error=repr(e)
+                        )
+                    results.append(result)
+                    message = (
+                        f"[{len(results)}/{len(pdfs)}] "
+                        f"{result.status.upper()}: {result.pdf_path}"
+                    )
+                    if result.error:
+                        message += f" ({result.error})"
+                    print(message)
+
+        self._write_parse_summary(results, time.perf_counter() - start, num_workers)
+        return results
+
+    def _write_parse_summary(
+        self, results: List[PdfParseResult], elapsed: float, num_workers: int
+    ):
+        counts = {
+            status: sum(r.status == status for r in results)
+            for status in ("done", "skipped", "failed", "timeout")
+        }
+        pages = sum(r.pages for r in results)
+        summary = {
+            "num_workers": num_workers,
+            "total_files": len(results),
+            **counts,
+            "pages": pages,
+            "seconds": round(elapsed, 2),
+            "files_per_minute": (
+                round(counts["done"] / elapsed * 60, 2) if elapsed else 0.0
+            ),
+            "pages_per_second": round(pages / elapsed, 2) if elapsed else 0.0,
+            "results": [asdict(r) for r in results],
+        }
+        self.output_root.mkdir(parents=True, exist_ok=True)
+        with open(self.output_root / "parse_summary.json", "w") as f:
+            json.dump(summary, f, indent=2)
+        print(
+            f"[INFO] Parsed {counts['done']} PDFs ({pages} pages), skipped {counts['skipped']}, "
+            f"failed {counts['failed']}, timed out {counts['timeout']} in {elapsed:.1f}s "
+            f"({summary['files_per_minute']} files/min, {summary['pages_per_second']} pages/sec) "
+            f"with {num_workers} worker(s)"
+        )
 
     async def generate_metadata(self, doc_json_path, output_dir: Path):
         print(f"[INFO] Generating metadata for: {doc_json_path} ...")
@@ -0,0 +1,86 @@
+import os
+import json
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Literal, Optional
+from qdrant_client import models
+
+
+@dataclass
+class RetrievalConfig:
+    # Candidates taken from each index before fusion
+    dense_limit: int = 20
+    sparse_limit: int = 20
+    fusion: Literal["dbsf", "rrf"] = "dbsf"
+    # Points returned per query after fusion
+    limit: int = 5
+    # Fused points scoring below this are dropped (None keeps everything)
+    score_threshold: Optional[float] = None
+    # Payload keys to return; None returns the whole payload. When projected,
+    # document-level metadata (title, summary, description) is filled in from
+    # the source metadata cache instead of being sent with every chunk.
+    payload_fields: Optional[List[str]] = field(
+        default_factory=lambda: ["content", "metadata.source"]
+    )
+    # HNSW search breadth for the dense prefetch; None uses the collection default
+    hnsw_ef: Optional[int] = None
+
+    def __post_init__(self):
+        if self.fusion not in ("dbsf", "rrf"):
+            raise ValueError(
+                f"Unknown fusion method {self.fusion!r}, expected 'dbsf' or 'rrf'"
+            )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RetrievalConfig":
+        names = {f.name for f in fields(cls)}
+        unknown = set(data) - names
+        if unknown:
+            raise ValueError(f"Unknown retrieval config fields: {sorted(unknown)}")
+        return cls(**data)
+
+    def fusion_query(self) -> models.FusionQuery:
+        fusion = models.Fusion.RRF if self.fusion == "rrf" else models.Fusion.DBSF
+        return models.FusionQuery(fusion=fusion)
+
+    def search_params(self) -> Optional[models.SearchParams]:
+        if self.hnsw_ef is None:
+            return None
+        return models.SearchParams(hnsw_ef=self.hnsw_ef)
+
+    def with_payload(self) -> bool | List[str]:
+        return True if self.payload_fields is None else list(self.payload_fields)
+
+
+DEFAULT_RETRIEVAL_CONFIGS: Dict[str, RetrievalConfig] = {
+    "harms": RetrievalConfig(),
+    "factors": RetrievalConfig(),
+    "suggestions": RetrievalConfig(),
+}
+
+_retrieval_configs: Dict[str, RetrievalConfig] | None = None
+
+
+def load_retrieval_configs(path: str) -> Dict[str, RetrievalConfig]:
+    """Read {collection_name: {field: value}} overrides on top of the defaults."""
+    with open(path, "r") as f:
+        overrides = json.load(f)
+    configs = dict(DEFAULT_RETRIEVAL_CONFIGS)
+    for collection_name, data in overrides.items():
+        configs[collection_name] = RetrievalConfig.from_dict(data)
+    return configs
+
+
+def get_retrieval_config(collection_name: str) -> RetrievalConfig:
+    """Retrieval settings for a collection.
+
+    Defaults live in DEFAULT_RETRIEVAL_CONFIGS; RETRIEVAL_CONFIG_PATH may point to
+    a JSON file of per-collection overrides (e.g. the best configs found by
+    benchmark_retrieval.py).
+    """
+    global _retrieval_configs
+    if _retrieval_configs is None:
+        path = os.getenv("RETRIEVAL_CONFIG_PATH")
+        _retrieval_configs = (
+            load_retrieval_configs(path) if path else dict(DEFAULT_RETRIEVAL_CONFIGS)
+        )
+    return _retrieval_configs.get(collection_name) or RetrievalConfig()
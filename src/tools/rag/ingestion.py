@@ -0,0 +1,411 @@
+import os
+import json
+import time
+import asyncio
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+import numpy as np
+from transformers import AutoTokenizer, AutoModel
+from qdrant_client import AsyncQdrantClient
+from fastembed import SparseEmbedding, SparseTextEmbedding
+from langchain_core.documents import Document
+from src.tools.utils.embeddings import (
+    get_batch_passage_embeddings,
+    get_sparse_embeddings,
+)
+from src.tools.rag.manifest import IndexManifest
+from src.tools.rag.utils import (
+    UploadStats,
+    build_points,
+    create_vector_store,
+    delete_points,
+    get_point_ids,
+    sync_manifest,
+    upsert_points_in_batches,
+)
+
+# Marks the end of a stage's input; one is queued per downstream worker
+_DONE = object()
+
+
+@dataclass
+class IngestionConfig:
+    # Number of concurrent chunks.json readers
+    reader_concurrency: int = 4
+    # Number of embedding workers, each running in its own pool thread
+    embed_workers: int = 1
+    # Number of documents upserted at the same time
+    writer_concurrency: int = 2
+    # Capacity of each inter-stage queue, in documents
+    queue_size: int = 16
+    # Documents embedded together by the batched late-chunking embedder
+    docs_per_batch: int = 8
+    # Points per upsert request and upsert batches in flight per document
+    batch_size: int = 128
+    max_concurrency: int = 4
+    embedding_dtype: np.dtype = np.float32
+    rebuild: bool = False
+
+
+@dataclass
+class StageMetrics:
+    name: str
+    items: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    # Peak depth of the queue this stage feeds (unused by the writer)
+    max_queue_depth: int = 0
+
+    @property
+    def items_per_sec(self) -> float:
+        return self.items / self.busy_seconds if self.busy_seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.items} docs, {self.errors} errors, "
+            f"{self.busy_seconds:.2f}s busy ({self.items_per_sec:.1f} docs/sec), "
+            f"max queue depth {self.max_queue_depth}"
+        )
+
+
+@dataclass
+class IngestionReport:
+    upload: UploadStats = field(default_factory=UploadStats)
+    stages: Dict[str, StageMetrics] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+@dataclass
+class _SourceDocument:
+    collection_name: str
+    source: str
+    chunks: List[Document]
+
+
+@dataclass
+class _EmbeddedDocument:
+    document: _SourceDocument
+    point_ids: List[str]
+    dense_embeddings: np.ndarray
+    sparse_embeddings: List[SparseEmbedding]
+
+
+def load_chunks(chunks_path: Path) -> List[Document]:
+    with open(chunks_path, "r") as f:
+        chunks_data = json.load(f)
+    return [
+        Document(page_content=chunk["content"], metadata=chunk.get("metadata", {}))
+        for chunk in chunks_data
+    ]
+
+
+class IngestionPipeline:
+    """Streaming chunks.json -> embed -> Qdrant ingestion.
+
+    Three asyncio stages connected by bounded queues, so reading, embedding
+    and network I/O overlap while a slow stage applies backpressure upstream:
+
+    - readers load `chunks.json` files off the event loop,
+    - embedders batch up to `docs_per_batch` changed documents and run the
+      dense and sparse models in a thread pool,
+    - writers upsert every point of a changed document (late chunking makes
+      all of its vectors depend on each chunk), delete stale ones and update
+      the manifest.
+
+    Every category directory under the root maps to one collection, and each
+    collection's `IndexManifest` makes re-runs incremental.
+    """
+
+    def __init__(
+        self,
+        client: AsyncQdrantClient,
+        model: AutoModel,
+        tokenizer: AutoTokenizer,
+        sparse_model: SparseTextEmbedding,
+        manifest_dir: str | Path,
+        config: IngestionConfig | None = None,
+    ):
+        self.client = client
+        self.model = model
+        self.tokenizer = tokenizer
+        self.sparse_model = sparse_model
+        self.manifest_dir = Path(manifest_dir)
+        self.config = config or IngestionConfig()
+
+    @staticmethod
+    def discover(root_dir: str | Path) -> Dict[str, List[Path]]:
+        """Map each category folder under `root_dir` to its document folders."""
+        categories = {}
+        for category in sorted(os.listdir(root_dir)):
+            category_path = Path(root_dir) / category
+            if category.startswith(".") or not category_path.is_dir():
+                continue
+            categories[category] = [
+                path for path in sorted(category_path.iterdir()) if path.is_dir()
+            ]
+        return categories
+
+    async def run(self, root_dir: str | Path) -> IngestionReport:
+        config = self.config
+        report = IngestionReport(
+            stages={
+                name: StageMetrics(name) for name in ("reader", "embedder", "writer")
+            }
+        )
+        start = time.perf_counter()
+
+        categories = self.discover(root_dir)
+        manifests: Dict[str, IndexManifest] = {}
+        for category in categories:
+            created = await create_vector_store(self.client, category)
+            manifests[category] = IndexManifest(self.manifest_dir, category)
+            if created or config.rebuild:
+                # A fresh collection holds none of the points the manifest remembers
+                manifests[category].reset()
+
+        paths: asyncio.Queue = asyncio.Queue()
+        for category, doc_paths in categories.items():
+            for doc_path in doc_paths:
+                paths.put_nowait((category, doc_path))
+        for _ in range(config.reader_concurrency):
+            paths.put_nowait(_DONE)
+        documents: asyncio.Queue = asyncio.Queue(maxsize=config.queue_size)
+        embedded: asyncio.Queue = asyncio.Queue(maxsize=config.queue_size)
+        seen_sources: Dict[str, Set[str]] = {category: set() for category in categories}
+
+        executor = ThreadPoolExecutor(
+            max_workers=config.embed_workers, thread_name_prefix="ingest-embed"
+        )
+        tasks: List[asyncio.Task] = []
+        try:
+            readers = [
+                asyncio.create_task(
+                    self._reader(paths, documents, seen_sources, report.stages["reader"])
+                )
+                for _ in range(config.reader_concurrency)
+            ]
+            embedders = [
+                asyncio.create_task(
+                    self._embedder(documents, embedded, manifests, executor, report)
+                )
+                for _ in range(config.embed_workers)
+            ]
+            writers = [
+                asyncio.create_task(self._writer(embedded, manifests, report))
+                for _ in range(config.writer_concurrency)
+            ]
+
+            tasks = readers + embedders + writers
+
+            await asyncio.gather(*readers)
+            for _ in embedders:
+                await documents.put(_DONE)
+            await asyncio.gather(*embedders)
+            for _ in writers:
+                await embedded.put(_DONE)
+            await asyncio.gather(*writers)
+        finally:
+            # Only has work to do if a stage raised and the pipeline is unwinding
+            for task in tasks:
+                task.cancel()
+            executor.shutdown(wait=False)
+
+        if report.stages["reader"].errors:
+            # An unreadable document would look deleted, so keep its points
+            print("Skipping stale document removal because some documents failed to load.")
+            manifests = {}
+        # Remove points of documents that no longer exist on disk
+        for category, manifest in manifests.items():
+            for source in manifest.sources:
+                if source not in seen_sources[category]:
+                    print(f"Removing stale document {source} from {category}")
+                    report.upload.deleted_points += await delete_points(
+                        self.client, category, manifest.get_point_ids(source)
+                    )
+                    manifest.remove_source(source)
+
+        report.seconds = time.perf_counter() - start
+        return report
+
+    async def _reader(
+        self,
+        paths: asyncio.Queue,
+        documents: asyncio.Queue,
+        seen_sources: Dict[str, Set[str]],
+        metrics: StageMetrics,
+    ):
+        while True:
+            item = paths.get_nowait()
+            if item is _DONE:
+                return
+            category, doc_path = item
+            chunks_path = doc_path / "chunks.json"
+            if not chunks_path.exists():
+                print(f"No chunks.json in {doc_path}, skipping.")
+                continue
+
+            busy_start = time.perf_counter()
+            try:
+                chunks = await asyncio.to_thread(load_chunks, chunks_path)
+            except Exception as e:
+                print(f"Error reading {chunks_path}: {e}")
+                metrics.errors += 1
+                continue
+            source = (
+                chunks[0].metadata.get("source", str(doc_path))
+                if chunks
+                else str(doc_path)
+            )
+            for i, chunk in enumerate(chunks):
+                chunk.metadata.setdefault("source", source)
+                chunk.metadata["chunk_no"] = i
+            seen_sources[category].add(source)
+            metrics.items += 1
+            metrics.busy_seconds += time.perf_counter() - busy_start
+
+            await documents.put(_SourceDocument(category, source, chunks))
+            metrics.max_queue_depth = max(metrics.max_queue_depth, documents.qsize())
+
+    def _embed(self, batch: List[Tuple[_SourceDocument, List[str]]]):
+        """Runs in the embedding pool: dense and sparse embed whole documents
+        (late chunking needs the full context)."""
+        dense = get_batch_passage_embeddings(
+            [[chunk.page_content for chunk in doc.chunks] for doc, _ in batch],
+            self.model,
+            self.tokenizer,
+            max_tokens=8192,
+            overlap_size=1024,
+            output_dtype=self.config.embedding_dtype,
+        )
+        results = []
+        for (doc, point_ids), dense_embeddings in zip(batch, dense):
+            sparse_embeddings = get_sparse_embeddings(
+                [chunk.page_content for chunk in doc.chunks], self.sparse_model
+            )
+            results.append(
+                _EmbeddedDocument(doc, point_ids, dense_embeddings, sparse_embeddings)
+            )
+        return results
+
+    async def _embedder(
+        self,
+        documents: asyncio.Queue,
+        embedded: asyncio.Queue,
+        manifests: Dict[str, IndexManifest],
+        executor: ThreadPoolExecutor,
+        report: IngestionReport,
+    ):
+        metrics = report.stages["embedder"]
+        loop = asyncio.get_running_loop()
+        done = False
+        while not done:
+            # Block for one document, then take whatever else is already queued,
+            # stopping at this worker's end marker
+            items = []
+            while not done and len(items) < self.config.docs_per_batch:
+                if items and documents.empty():
+                    break
+                item = await documents.get()
+                if item is _DONE:
+                    done = True
+                else:
+                    items.append(item)
+
+            batch = []
+            for doc in items:
+                point_ids = get_point_ids(doc.chunks)
+                indexed_ids = manifests[doc.collection_name].get_point_ids(doc.source)
+                # Removed chunks change the document too: its points must be
+                # re-embedded and the stale ones deleted by the writer
+                if set(point_ids) != indexed_ids:
+                    batch.append((doc, point_ids))
+                else:
+                    report.upload.skipped_points += len(doc.chunks)
+            if not batch:
+                continue
+
+            busy_start = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(executor, self._embed, batch)
+            except Exception as e:
+                print(f"Error embedding {[doc.source for doc, _ in batch]}: {e}")
+                metrics.errors += len(batch)
+                continue
+            metrics.items += len(results)
+            metrics.busy_seconds += time.perf_counter() - busy_start
+
+            for result in results:
+                await embedded.put(result)
+                metrics.max_queue_depth = max(metrics.max_queue_depth, embedded.qsize())
+
+    async def _writer(
+        self,
+        embedded: asyncio.Queue,
+        manifests: Dict[str, IndexManifest],
+        report: IngestionReport,
+    ):
+        metrics = report.stages["writer"]
+        while True:
+            item = await embedded.get()
+            if item is _DONE:
+                return
+            doc = item.document
+            manifest = manifests[doc.collection_name]
+            indexed_ids = manifest.get_point_ids(doc.source)
+
+            busy_start = time.perf_counter()
+            stats = await upsert_points_in_batches(
+                self.client,
+                doc.collection_name,
+                build_points(
+                    doc.chunks,
+                    item.point_ids,
+                    list(range(len(doc.chunks))),
+                    item.dense_embeddings,
+                    item.sparse_embeddings,
+                ),
+                batch_size=self.config.batch_size,
+                max_concurrency=self.config.max_concurrency,
+            )
+            try:
+                stats = await sync_manifest(
+                    self.client,
+                    doc.collection_name,
+                    manifest,
+                    doc.source,
+                    doc.chunks,
+                    indexed_ids,
+                    stats,
+                )
+            except Exception as e:
+                print(f"Error removing stale points of {doc.source}: {e}")
+            metrics.busy_seconds += time.perf_counter() - busy_start
+            if stats.failed_points:
+                metrics.errors += 1
+            else:
+                metrics.items += 1
+            print(
+                f"Indexed {doc.source} into {doc.collection_name}: {stats.points} points "
+                f"({stats.deleted_points} deleted, {stats.failed_points} failed)"
+            )
+            report.upload.merge(stats)
+
+
+async def run_ingestion(
+    root_dir: str | Path,
+    client: AsyncQdrantClient,
+    model: AutoModel,
+    tokenizer: AutoTokenizer,
+    sparse_model: SparseTextEmbedding,
+    manifest_dir: str | Path | None = None,
+    config: IngestionConfig | None = None,
+) -> IngestionReport:
+    """Index every `<root_dir>/<category>/<document>/chunks.json` into the
+    `<category>` collection. Manifests default to `<root_dir>/.index_manifest`."""
+    manifest_dir = manifest_dir or Path(root_dir) / ".index_manifest"
+    pipeline = IngestionPipeline(
+        client, model, tokenizer, sparse_model, manifest_dir, config
+    )
+    return await pipeline.run(root_dir)
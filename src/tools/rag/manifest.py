@@ -0,0 +1,46 @@
+import os
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+
+
+class IndexManifest:
+    """Local record of which point ids have been indexed per source for one collection.
+
+    Stored as `<manifest_dir>/<collection_name>.json` mapping source -> point ids,
+    and rewritten atomically after every update so an interrupted run can resume.
+    """
+
+    def __init__(self, manifest_dir: str | Path, collection_name: str):
+        self.path = Path(manifest_dir) / f"{collection_name}.json"
+        self.collection_name = collection_name
+        self._sources: Dict[str, List[str]] = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._sources = json.load(f)
+
+    @property
+    def sources(self) -> List[str]:
+        return list(self._sources.keys())
+
+    def get_point_ids(self, source: str) -> Set[str]:
+        return set(self._sources.get(source, []))
+
+    def set_point_ids(self, source: str, point_ids: Iterable[str]):
+        self._sources[source] = list(point_ids)
+        self.save()
+
+    def remove_source(self, source: str):
+        if self._sources.pop(source, None) is not None:
+            self.save()
+
+    def reset(self):
+        self._sources = {}
+        self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._sources, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
@@ -6,7 +6,59 @@ from src.tools.utils.embeddings import (
     get_query_embeddings,
     get_sparse_embeddings,
 )
+from src.tools.utils.embeddings.cache import (
+    CachedQueryEmbedding,
+    QueryEmbeddingCache,
+    get_query_embedding_cache,
+)
 from src.tools.utils.resource_manager import get_resource_manager
+from src.tools.utils.turn_context import get_turn_context
+from src.tools.rag.config import RetrievalConfig, get_retrieval_config
+from src.tools.rag.source_metadata import (
+    SourceMetadataCache,
+    get_source_metadata_cache,
+)
+
+
+def get_model_id(model: AutoModel, sparse_model: SparseTextEmbedding) -> str:
+    dense_id = getattr(model, "name_or_path", None) or type(model).__name__
+    sparse_id = getattr(sparse_model, "model_name", None) or type(sparse_model).__name__
+    return f"{dense_id}|{sparse_id}"
+
+
+async def embed_queries(
+    queries: List[str],
+    model: AutoModel,
+    sparse_model: SparseTextEmbedding,
+    cache: QueryEmbeddingCache | None = None,
+) -> List[CachedQueryEmbedding]:
+    """Dense + sparse query embeddings, only running the models for cache misses."""
+    cache = cache or get_query_embedding_cache()
+    model_id = get_model_id(model, sparse_model)
+    embeddings = await cache.get_many(queries, model_id)
+
+    missing_queries = list(
+        dict.fromkeys(q for q, e in zip(queries, embeddings) if e is None)
+    )
+    if missing_queries:
+        dense_vectors = get_query_embeddings(missing_queries, model)
+        sparse_vectors = get_sparse_embeddings(missing_queries, sparse_model)
+        computed = [
+            CachedQueryEmbedding(
+                dense=dense_vectors[i].tolist(),
+                sparse_indices=sparse_vectors[i].indices.tolist(),
+                sparse_values=sparse_vectors[i].values.tolist(),
+            )
+            for i in range(len(missing_queries))
+        ]
+        await cache.set_many(missing_queries, model_id, computed)
+
+        computed_map = dict(zip(missing_queries, computed))
+        embeddings = [
+            e if e is not None else computed_map[q] for q, e in zip(queries, embeddings)
+        ]
+
+    return embeddings
 
 
 async def retrieve_batch(
@@ -15,7 +67,17 @@ async def retrieve_batch(
     client: AsyncQdrantClient | None = None,
     model: AutoModel | None = None,
     sparse_model: SparseTextEmbedding | None = None,
+    config: RetrievalConfig | None = None,
 ):
+    """Hybrid dense + sparse search for each query in one batch request.
+
+    `config` defaults to the collection's `get_retrieval_config`. With a
+    projected payload, each point's metadata is completed from the source
+    metadata cache so callers still see title, summary and description.
+    Within a chat turn, a query already run (by any subgraph) against the same
+    collection and config is not searched again.
+    """
+    config = config or get_retrieval_config(collection_name)
     manager = get_resource_manager()
     if client is None:
         manager.initialize_client()
@@ -26,8 +88,36 @@ async def retrieve_batch(
         model = manager.dense_model
         sparse_model = manager.sparse_model
 
-    query_dense_vectors = get_query_embeddings(queries, model)
-    query_sparse_vectors = get_sparse_embeddings(queries, sparse_model)
+    turn = get_turn_context()
+    if turn is None:
+        return await _query_batch(
+            queries, collection_name, client, model, sparse_model, config
+        )
+
+    async def compute(keys):
+        return await _query_batch(
+            [query for _, _, query in keys],
+            collection_name,
+            client,
+            model,
+            sparse_model,
+            config,
+        )
+
+    return await turn.get_or_compute_many(
+        "rag", [(collection_name, repr(config), query) for query in queries], compute
+    )
+
+
+async def _query_batch(
+    queries: List[str],
+    collection_name: str,
+    client: AsyncQdrantClient,
+    model: AutoModel,
+    sparse_model: SparseTextEmbedding,
+    config: RetrievalConfig,
+) -> List[models.QueryResponse]:
+    query_embeddings = await embed_queries(queries, model, sparse_model)
 
     requests = []
 
@@ -35,22 +125,24 @@ async def retrieve_batch(
         request = models.QueryRequest(
             prefetch=[
                 models.Prefetch(
-                    query=query_dense_vectors[i],
+                    query=query_embeddings[i].dense,
                     using="dense",
-                    limit=20,
+                    limit=config.dense_limit,
+                    params=config.search_params(),
                 ),
                 models.Prefetch(
                     query=models.SparseVector(
-                        indices=query_sparse_vectors[i].indices.tolist(),
-                        values=query_sparse_vectors[i].values.tolist(),
+                        indices=query_embeddings[i].sparse_indices,
+                        values=query_embeddings[i].sparse_values,
                     ),
                     using="sparse",
-                    limit=20,
+                    limit=config.sparse_limit,
                 ),
             ],
-            query=models.FusionQuery(fusion=models.Fusion.DBSF),
-            with_payload=True,
-            limit=5,
+            query=config.fusion_query(),
+            with_payload=config.with_payload(),
+            score_threshold=config.score_threshold,
+            limit=config.limit,
         )
 
         requests.append(request)
@@ -58,5 +150,30 @@ async def retrieve_batch(
     search_results = await client.query_batch_points(
         collection_name=collection_name, requests=requests
     )
+    if config.payload_fields is not None:
+        await attach_source_metadata(search_results, collection_name, client)
 
     return search_results
+
+
+async def attach_source_metadata(
+    search_results: List[models.QueryResponse],
+    collection_name: str,
+    client: AsyncQdrantClient,
+    cache: SourceMetadataCache | None = None,
+):
+    cache = cache or get_source_metadata_cache()
+    points = [
+        point
+        for result in search_results
+        for point in result.points
+        if point.payload and "source" in point.payload.get("metadata", {})
+    ]
+    if not points:
+        return
+    sources = {point.payload["metadata"]["source"] for point in points}
+    source_metadata = await cache.get_many(client, collection_name, sources)
+    for point in points:
+        metadata = point.payload["metadata"]
+        for name, value in source_metadata[metadata["source"]].items():
+            metadata.setdefault(name, value)
@@ -0,0 +1,92 @@
+import os
+import time
+import asyncio
+from typing import Dict, Iterable, List, Tuple
+from qdrant_client import AsyncQdrantClient, models
+
+# Document-level fields repeated on every chunk's metadata
+DOCUMENT_FIELDS = ("title", "summary", "description")
+
+
+class SourceMetadataCache:
+    """Per-collection map of source -> document-level metadata.
+
+    Retrieval only asks Qdrant for chunk-level payload fields; the title,
+    summary and description of a source are read from one of its points the
+    first time the source is retrieved, filtering on the keyword index
+    `create_vector_store` puts on metadata.source. Entries expire after
+    `ttl_seconds` so re-ingested documents are picked up without a restart.
+    """
+
+    def __init__(self, ttl_seconds: float = 600):
+        self.ttl_seconds = ttl_seconds
+        self._metadata: Dict[str, Dict[str, Tuple[float, dict]]] = {}
+
+    @staticmethod
+    def _payload_fields() -> List[str]:
+        return [f"metadata.{name}" for name in DOCUMENT_FIELDS]
+
+    async def _fetch(
+        self, client: AsyncQdrantClient, collection_name: str, source: str
+    ) -> dict:
+        points, _ = await client.scroll(
+            collection_name=collection_name,
+            scroll_filter=models.Filter(
+                must=[
+                    models.FieldCondition(
+                        key="metadata.source", match=models.MatchValue(value=source)
+                    )
+                ]
+            ),
+            limit=1,
+            with_payload=self._payload_fields(),
+            with_vectors=False,
+        )
+        # Unknown sources get empty fields too, so they are not fetched every time
+        metadata = (points[0].payload or {}).get("metadata", {}) if points else {}
+        return {name: metadata.get(name, "") for name in DOCUMENT_FIELDS}
+
+    async def get_many(
+        self, client: AsyncQdrantClient, collection_name: str, sources: Iterable[str]
+    ) -> Dict[str, dict]:
+        sources = list(sources)
+        known = self._metadata.setdefault(collection_name, {})
+        now = time.monotonic()
+        missing = [
+            source
+            for source in dict.fromkeys(sources)
+            if source not in known or known[source][0] < now
+        ]
+        if missing:
+            fetched = await asyncio.gather(
+                *(self._fetch(client, collection_name, source) for source in missing)
+            )
+            expires_at = time.monotonic() + self.ttl_seconds
+            for source, metadata in zip(missing, fetched):
+                known[source] = (expires_at, metadata)
+        return {source: known[source][1] for source in sources}
+
+    def invalidate_sources(self, collection_name: str, sources: Iterable[str]):
+        known = self._metadata.get(collection_name, {})
+        for source in sources:
+            known.pop(source, None)
+
+    def invalidate(self, collection_name: str | None = None):
+        if collection_name is None:
+            self._metadata.clear()
+        else:
+            self._metadata.pop(collection_name, None)
+
+
+_source_metadata_cache: SourceMetadataCache | None = None
+
+
+def get_source_metadata_cache() -> SourceMetadataCache:
+    """Process-wide source metadata cache; entries live SOURCE_METADATA_TTL
+    seconds."""
+    global _source_metadata_cache
+    if _source_metadata_cache is None:
+        _source_metadata_cache = SourceMetadataCache(
+            ttl_seconds=float(os.getenv("SOURCE_METADATA_TTL", 600))
+        )
+    return _source_metadata_cache
@@ -1,63 +1,186 @@
-from typing import List
-import torch
-from transformers import AutoTokenizer, AutoModel
+import time
+import uuid
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Set
+import numpy as np
 from qdrant_client import AsyncQdrantClient, models
-from fastembed import SparseTextEmbedding
-from src.tools.utils.embeddings import (
-    get_passage_embeddings,
-    get_sparse_embeddings,
-)
+from fastembed import SparseEmbedding
 from langchain_core.documents import Document
-import uuid
+from src.tools.rag.manifest import IndexManifest
 
 
-async def upload_points_per_doc(
-    chunks: List[Document],
-    client: AsyncQdrantClient,
-    collection_name: str,
-    model: AutoModel,
-    tokenizer: AutoTokenizer,
-    sparse_model: SparseTextEmbedding,
-):
-    text_contents = [chunk.page_content for chunk in chunks]
-    dense_embeddings = get_passage_embeddings(
-        text_contents,
-        model,
-        tokenizer,
-        max_tokens=8192,
-        overlap_size=1024,
-    )
-    sparse_embeddings = get_sparse_embeddings(text_contents, sparse_model)
+@dataclass
+class UploadStats:
+    points: int = 0
+    skipped_points: int = 0
+    deleted_points: int = 0
+    failed_points: int = 0
+    batches: int = 0
+    retried_batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def points_per_sec(self) -> float:
+        return self.points / self.seconds if self.seconds > 0 else 0.0
+
+    def merge(self, other: "UploadStats") -> "UploadStats":
+        self.points += other.points
+        self.skipped_points += other.skipped_points
+        self.deleted_points += other.deleted_points
+        self.failed_points += other.failed_points
+        self.batches += other.batches
+        self.retried_batches += other.retried_batches
+        self.seconds += other.seconds
+        return self
+
 
-    for i in range(len(chunks)):
-        metadata = chunks[i].metadata
-        metadata["chunk_no"] = i
+def point_id_for_chunk(source: str, chunk_no: int, content: str) -> str:
+    """Content-addressed point id, so re-indexing an unchanged chunk is a no-op."""
+    digest = hashlib.sha256(f"{source}\x00{chunk_no}\x00{content}".encode("utf-8"))
+    return str(uuid.UUID(bytes=digest.digest()[:16]))
 
+
+def get_point_ids(chunks: List[Document]) -> List[str]:
+    return [
+        point_id_for_chunk(chunk.metadata.get("source", ""), i, chunk.page_content)
+        for i, chunk in enumerate(chunks)
+    ]
+
+
+def _batched(points: Iterable[models.PointStruct], batch_size: int):
+    batch = []
+    for point in points:
+        batch.append(point)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def build_points(
+    chunks: List[Document],
+    point_ids: List[str],
+    indexes: List[int],
+    dense_embeddings: np.ndarray,
+    sparse_embeddings: List[SparseEmbedding],
+) -> Iterator[models.PointStruct]:
+    """Lazily build the points for `chunks[i]` for each i in `indexes`.
+
+    `sparse_embeddings` is aligned with `indexes`, `dense_embeddings` with `chunks`.
+    """
+    for i, sparse_embedding in zip(indexes, sparse_embeddings):
         sparse_vector = models.SparseVector(
-            indices=sparse_embeddings[i].indices.tolist(),
-            values=sparse_embeddings[i].values.tolist(),
+            indices=sparse_embedding.indices.tolist(),
+            values=sparse_embedding.values.tolist(),
         )
         dense_vector = dense_embeddings[i].tolist()
 
+        yield models.PointStruct(
+            id=point_ids[i],
+            vector={"dense": dense_vector, "sparse": sparse_vector},
+            payload={
+                "content": chunks[i].page_content,
+                "metadata": chunks[i].metadata,
+            },
+        )
+
+
+async def upsert_points_in_batches(
+    client: AsyncQdrantClient,
+    collection_name: str,
+    points: Iterable[models.PointStruct],
+    batch_size: int = 128,
+    max_concurrency: int = 4,
+    wait: bool = False,
+    max_retries: int = 3,
+) -> UploadStats:
+    """Upsert points in batches with up to `max_concurrency` batches in flight.
+
+    `wait=False` lets Qdrant acknowledge a batch before it is indexed, which is
+    fine for bulk ingestion where nothing reads the points back immediately.
+    A failed batch is retried on its own with exponential backoff.
+    """
+    stats = UploadStats()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    start = time.perf_counter()
+
+    async def upload_batch(batch_no: int, batch: List[models.PointStruct]):
         try:
-            await client.upsert(
-                collection_name=collection_name,
-                points=[
-                    models.PointStruct(
-                        id=str(uuid.uuid4()),
-                        vector={"dense": dense_vector, "sparse": sparse_vector},
-                        payload={
-                            "content": chunks[i].page_content,
-                            "metadata": metadata,
-                        },
+            for attempt in range(max_retries + 1):
+                try:
+                    await client.upsert(
+                        collection_name=collection_name, points=batch, wait=wait
                     )
-                ],
-            )
-        except Exception as e:
-            print(f"Error uploading point {i}: {e}")
+                    stats.points += len(batch)
+                    return
+                except Exception as e:
+                    if attempt == max_retries:
+                        print(
+                            f"Error uploading batch {batch_no} ({len(batch)} points) "
+                            f"after {max_retries} retries: {e}"
+                        )
+                        stats.failed_points += len(batch)
+                        return
+                    stats.retried_batches += 1
+                    await asyncio.sleep(2**attempt)
+        finally:
+            semaphore.release()
+
+    # Acquire before building the next batch so at most `max_concurrency`
+    # batches are materialized at any time
+    tasks = []
+    for batch_no, batch in enumerate(_batched(points, batch_size)):
+        await semaphore.acquire()
+        stats.batches += 1
+        tasks.append(asyncio.create_task(upload_batch(batch_no, batch)))
+    await asyncio.gather(*tasks)
+
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+async def delete_points(
+    client: AsyncQdrantClient, collection_name: str, point_ids: Iterable[str]
+) -> int:
+    point_ids = list(point_ids)
+    if not point_ids:
+        return 0
+    await client.delete(
+        collection_name=collection_name,
+        points_selector=models.PointIdsList(points=point_ids),
+        wait=False,
+    )
+    return len(point_ids)
 
 
-async def create_vector_store(client: AsyncQdrantClient, collection_name: str):
+async def sync_manifest(
+    client: AsyncQdrantClient,
+    collection_name: str,
+    manifest: IndexManifest,
+    source: str,
+    chunks: List[Document],
+    indexed_ids: Set[str],
+    stats: UploadStats,
+) -> UploadStats:
+    """After a document's upsert, delete its stale points and record its ids."""
+    if stats.failed_points:
+        # Keep the old manifest entry so the next run retries this document
+        return stats
+
+    current_ids = get_point_ids(chunks)
+    stale_ids = indexed_ids - set(current_ids)
+    stats.deleted_points = await delete_points(client, collection_name, stale_ids)
+    manifest.set_point_ids(source, current_ids)
+    return stats
+
+
+async def create_vector_store(client: AsyncQdrantClient, collection_name: str) -> bool:
+    """Create the collection if missing, with a keyword index on metadata.source
+    (the source metadata cache filters on it). Returns True if it was created."""
+    created = False
     if not await client.collection_exists(collection_name=collection_name):
         await client.create_collection(
             collection_name,
@@ -67,5 +190,13 @@ async def create_vector_store(client: AsyncQdrantClient, collection_name: str):
             sparse_vectors_config={"sparse": models.SparseVectorParams()},
         )
         print(f"Collection {collection_name} created successfully.")
+        created = True
     else:
         print(f"Collection {collection_name} already exists.")
+    # Idempotent, so collections created before the index existed get it too
+    await client.create_payload_index(
+        collection_name,
+        field_name="metadata.source",
+        field_schema=models.PayloadSchemaType.KEYWORD,
+    )
+    return created
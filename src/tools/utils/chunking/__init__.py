@@ -2,6 +2,7 @@ from src.tools.utils.chunking.markdown import (
     split_document_by_headers,
     jina_length_function,
 )
+from src.tools.utils.chunking.length import TokenLengthCounter, batch_lengths
 
 
 __all__ = [
@@ -9,4 +10,6 @@ __all__ = [
     "split_document_by_perplexity",
     "initialize_perplexity_model",
     "jina_length_function",
+    "TokenLengthCounter",
+    "batch_lengths",
 ]
@@ -0,0 +1,139 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Iterable, List
+
+
+class TokenLengthCounter:
+    """Token counts with a lazily loaded tokenizer and an LRU cache of segments.
+
+    Counts match `len(tokenizer(text)["input_ids"])` (special tokens included),
+    but go straight to the Rust fast tokenizer, without truncation or padding,
+    and never build Python id lists. `lengths` tokenizes all cache misses in one
+    batched call. Text splitters ask for the length of the same pieces many
+    times while merging, so most calls are cache hits.
+
+    The cache keeps at most `cache_size` texts and `max_cache_chars` characters
+    in total; texts longer than `max_text_chars` (whole pages rather than
+    pieces being merged) are counted but not cached.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "jinaai/jina-embeddings-v3",
+        cache_size: int = 65536,
+        max_cache_chars: int = 16_000_000,
+        max_text_chars: int = 8192,
+    ):
+        self.model_name = model_name
+        self.cache_size = cache_size
+        self.max_cache_chars = max_cache_chars
+        self.max_text_chars = max_text_chars
+        self._cache_chars = 0
+        self._tokenizer = None
+        self._backend = None
+        self._load_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._cache: OrderedDict[str, int] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        with self._load_lock:
+            if self._tokenizer is not None:
+                return
+            from transformers import AutoTokenizer
+
+            tokenizer = AutoTokenizer.from_pretrained(
+                self.model_name, trust_remote_code=True
+            )
+            backend = getattr(tokenizer, "backend_tokenizer", None)
+            if backend is not None:
+                from tokenizers import Tokenizer
+
+                # Private copy, so disabling truncation can't affect `tokenizer`
+                backend = Tokenizer.from_str(backend.to_str())
+                backend.no_truncation()
+                backend.no_padding()
+            self._backend = backend
+            self._tokenizer = tokenizer
+
+    @property
+    def tokenizer(self):
+        if self._tokenizer is None:
+            self._load()
+        return self._tokenizer
+
+    def _count(self, texts: List[str]) -> List[int]:
+        if self._tokenizer is None:
+            self._load()
+        if self._backend is not None:
+            return [
+                len(encoding)
+                for encoding in self._backend.encode_batch(
+                    texts, add_special_tokens=True
+                )
+            ]
+        # Slow (pure Python) tokenizer: no batch API worth using
+        return [len(self._tokenizer(text)["input_ids"]) for text in texts]
+
+    def lengths(self, texts: Iterable[str]) -> List[int]:
+        texts = list(texts)
+        results: List[int | None] = [None] * len(texts)
+        missing: dict[str, List[int]] = {}
+        with self._cache_lock:
+            for i, text in enumerate(texts):
+                length = self._cache.get(text)
+                if length is None:
+                    missing.setdefault(text, []).append(i)
+                else:
+                    self._cache.move_to_end(text)
+                    results[i] = length
+            self.hits += len(texts) - sum(len(v) for v in missing.values())
+            self.misses += sum(len(v) for v in missing.values())
+
+        if missing:
+            unique = list(missing)
+            counts = self._count(unique)
+            with self._cache_lock:
+                for text, length in zip(unique, counts):
+                    for i in missing[text]:
+                        results[i] = length
+                    if len(text) <= self.max_text_chars and text not in self._cache:
+                        self._cache[text] = length
+                        self._cache_chars += len(text)
+                while self._cache and (
+                    len(self._cache) > self.cache_size
+                    or self._cache_chars > self.max_cache_chars
+                ):
+                    text, _ = self._cache.popitem(last=False)
+                    self._cache_chars -= len(text)
+        return results
+
+    def __call__(self, text: str) -> int:
+        return self.lengths([text])[0]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "chars": self._cache_chars,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def batch_lengths(texts: Iterable[str], length_function) -> List[int]:
+    """Lengths of `texts`, in one batched call when `length_function` supports it."""
+    if isinstance(length_function, TokenLengthCounter):
+        return length_function.lengths(texts)
+    return [length_function(text) for text in texts]
+
+
+# Compute number of tokens with the text -> use jina embedding v3 tokenizer
+jina_length_function = TokenLengthCounter(
+    "jinaai/jina-embeddings-v3",
+    cache_size=int(os.getenv("TOKEN_LENGTH_CACHE_SIZE", 65536)),
+    max_cache_chars=int(os.getenv("TOKEN_LENGTH_CACHE_MAX_CHARS", 16_000_000)),
+)
@@ -6,16 +6,7 @@ from langchain_text_splitters import (
     MarkdownTextSplitter,
 )
 
-from transformers import AutoTokenizer
-
-tokenizer = AutoTokenizer.from_pretrained(
-    "jinaai/jina-embeddings-v3", trust_remote_code=True
-)
-
-
-# Compute number of tokens with the text -> use jina embedding v3 tokenizer
-def jina_length_function(text: str, tokenizer=tokenizer) -> int:
-    return len(tokenizer(text)["input_ids"])
+from src.tools.utils.chunking.length import jina_length_function
 
 
 def split_document_by_headers(
@@ -2,19 +2,43 @@ from src.tools.utils.embeddings.api import (
     get_api_passage_embeddings,
     get_api_query_embeddings,
 )
+from src.tools.utils.embeddings.backend import (
+    EmbeddingBackend,
+    CachedEmbeddingBackend,
+    JinaApiEmbeddingBackend,
+    LocalEmbeddingBackend,
+    DenseModelEmbeddingBackend,
+    get_embedding_backend,
+)
+from src.tools.utils.embeddings.chunk_store import (
+    ChunkEmbeddingStore,
+    get_chunk_embedding_stores,
+)
 from src.tools.utils.embeddings.sparse import init_sparse_model, get_sparse_embeddings
 from src.tools.utils.embeddings.dense import (
     init_dense_model,
+    resolve_device,
     get_query_embeddings,
     get_passage_embeddings,
+    get_batch_passage_embeddings,
 )
 
 __all__ = [
     "init_sparse_model",
     "init_dense_model",
+    "resolve_device",
     "get_sparse_embeddings",
     "get_query_embeddings",
     "get_passage_embeddings",
+    "get_batch_passage_embeddings",
     "get_api_query_embeddings",
     "get_api_passage_embeddings",
+    "EmbeddingBackend",
+    "CachedEmbeddingBackend",
+    "JinaApiEmbeddingBackend",
+    "LocalEmbeddingBackend",
+    "DenseModelEmbeddingBackend",
+    "get_embedding_backend",
+    "ChunkEmbeddingStore",
+    "get_chunk_embedding_stores",
 ]
@@ -1,8 +1,8 @@
 import os
-import httpx
 import numpy as np
 from typing import List
 from dotenv import load_dotenv
+from src.tools.utils.rate_limit import get_jina_api_client
 
 load_dotenv()
 
@@ -19,14 +19,16 @@ async def get_api_query_embeddings(text: List[str]) -> np.ndarray:
         "input": text,
     }
     try:
-        async with httpx.AsyncClient() as client:
-            data = await client.post(base_url, headers=headers, json=data)
-            data = data.json()
-            embeddings = np.array(
-                [data["data"][i]["embedding"] for i in range(len(data["data"]))]
-            )
-
-            return embeddings
+        response = await get_jina_api_client().post(
+            "embeddings", base_url, headers=headers, json=data
+        )
+        response.raise_for_status()
+        data = response.json()
+        embeddings = np.array(
+            [data["data"][i]["embedding"] for i in range(len(data["data"]))]
+        )
+
+        return embeddings
     except Exception as e:
         print(f"Error in get_api_query_embeddings: {e}")
         return None
@@ -45,10 +47,12 @@ async def get_api_passage_embeddings(chunks: List[str]) -> np.ndarray:
         "input": chunks,
     }
 
-    async with httpx.AsyncClient() as client:
-        data = await client.post(base_url, headers=headers, json=data)
-        data = data.json()
-        embeddings = np.array(
-            [data["data"][i]["embedding"] for i in range(len(data["data"]))]
-        )
-        return embeddings
+    response = await get_jina_api_client().post(
+        "embeddings", base_url, headers=headers, json=data
+    )
+    response.raise_for_status()
+    data = response.json()
+    embeddings = np.array(
+        [data["data"][i]["embedding"] for i in range(len(data["data"]))]
+    )
+    return embeddings
@@ -0,0 +1,309 @@
+import os
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+import numpy as np
+from src.tools.utils.embeddings.api import (
+    get_api_passage_embeddings,
+    get_api_query_embeddings,
+)
+from src.tools.utils.embeddings.chunk_store import (
+    ChunkEmbeddingStores,
+    chunk_keys,
+    get_chunk_embedding_stores,
+)
+
+EMBEDDING_BACKENDS = ("api", "local", "dense")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class EmbeddingBackend(ABC):
+    """Query and late-chunked passage embeddings for the web snippet selector.
+
+    Query and passage vectors must come from the same backend: they are
+    compared with a plain dot product, so both are L2-normalized.
+    """
+
+    name: str = "base"
+    # Identifies the vectors' space, e.g. for keying cached embeddings
+    model_id: str = "base"
+    # Whether a chunk's vector depends on the other chunks embedded with it
+    late_chunking: bool = True
+
+    @abstractmethod
+    async def embed_queries(self, queries: List[str]) -> np.ndarray: ...
+
+    @abstractmethod
+    async def embed_passages(self, chunks: List[str]) -> np.ndarray:
+        """One embedding per chunk, late-chunked over the whole list."""
+
+
+class JinaApiEmbeddingBackend(EmbeddingBackend):
+    """jina-embeddings-v3 through the Jina embeddings API."""
+
+    name = "api"
+    model_id = "jina-embeddings-v3"
+
+    async def embed_queries(self, queries: List[str]) -> np.ndarray:
+        embeddings = await get_api_query_embeddings(queries)
+        if embeddings is None:
+            # get_api_query_embeddings has already logged the cause
+            raise RuntimeError("Jina API query embedding request failed")
+        return embeddings
+
+    async def embed_passages(self, chunks: List[str]) -> np.ndarray:
+        return await get_api_passage_embeddings(chunks)
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """A small embedding model on CPU (fastembed/ONNX Runtime).
+
+    The model is loaded on first use and runs in a small thread pool so the
+    event loop is not blocked. Chunks are embedded independently rather than
+    late-chunked, so each chunk's vector can be cached on its own.
+    """
+
+    name = "local"
+    late_chunking = False
+
+    def __init__(
+        self,
+        model_name: str = "BAAI/bge-small-en-v1.5",
+        batch_size: int = 32,
+        max_workers: int = 2,
+        threads: int | None = None,
+    ):
+        self.model_name = model_name
+        self.model_id = model_name
+        self.batch_size = batch_size
+        self.threads = threads
+        self._model = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="web-embeddings"
+        )
+
+    def _get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from fastembed import TextEmbedding
+
+                    self._model = TextEmbedding(
+                        model_name=self.model_name, threads=self.threads
+                    )
+                    print(f"Initialized local embedding model {self.model_name}.")
+        return self._model
+
+    def _encode(self, texts: List[str], query: bool) -> np.ndarray:
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        model = self._get_model()
+        if query:
+            vectors = model.query_embed(texts, batch_size=self.batch_size)
+        else:
+            vectors = model.passage_embed(texts, batch_size=self.batch_size)
+        return _normalize(np.stack(list(vectors)).astype(np.float32))
+
+    async def embed_queries(self, queries: List[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._encode, queries, True)
+
+    async def embed_passages(self, chunks: List[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._encode, chunks, False)
+
+
+class DenseModelEmbeddingBackend(EmbeddingBackend):
+    """The in-process dense model RAG retrieval already loads (jina-v4).
+
+    Forward passes run on one worker thread so the event loop stays free.
+    `embed_passages` calls that arrive within `batch_window` seconds of each
+    other (e.g. every page scraped for one request, selected concurrently) are
+    embedded together by `batch_late_chunking`, sharing forward passes. On CPU
+    this model is far slower than `LocalEmbeddingBackend`; it is meant for
+    deployments that already run it on a GPU.
+    """
+
+    name = "dense"
+    model_id = "jinaai/jina-embeddings-v4"
+
+    def __init__(
+        self,
+        batch_window: float = 0.01,
+        max_tokens: int = 8192,
+        max_batch_tokens: int = 16384,
+        max_batch_size: int = 16,
+    ):
+        self.batch_window = batch_window
+        self.max_tokens = max_tokens
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="web-embeddings"
+        )
+        self._pending: List[Tuple[List[str], asyncio.Future]] = []
+        self._flush_task: asyncio.Task | None = None
+
+    @staticmethod
+    def _models():
+        from src.tools.utils.resource_manager import get_resource_manager
+
+        manager = get_resource_manager()
+        return manager.dense_model, manager.tokenizer
+
+    def _encode_queries(self, queries: List[str]) -> np.ndarray:
+        from src.tools.utils.embeddings.dense import get_query_embeddings
+
+        model, _ = self._models()
+        vectors = get_query_embeddings(queries, model)
+        vectors = np.stack(
+            [np.asarray(v.detach().float().cpu(), dtype=np.float32) for v in vectors]
+        )
+        return _normalize(vectors)
+
+    def _encode_passages(self, documents: List[List[str]]) -> List[np.ndarray]:
+        from src.tools.utils.embeddings.dense import get_batch_passage_embeddings
+
+        model, tokenizer = self._models()
+        return get_batch_passage_embeddings(
+            documents,
+            model,
+            tokenizer,
+            max_tokens=self.max_tokens,
+            max_batch_tokens=self.max_batch_tokens,
+            max_batch_size=self.max_batch_size,
+        )
+
+    async def embed_queries(self, queries: List[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._encode_queries, queries)
+
+    async def embed_passages(self, chunks: List[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((chunks, future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush())
+        return await future
+
+    async def _flush(self):
+        await asyncio.sleep(self.batch_window)
+        pending, self._pending = self._pending, []
+        # Calls arriving while this batch runs start the next batch
+        self._flush_task = None
+        if not pending:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            outputs = await loop.run_in_executor(
+                self._executor, self._encode_passages, [c for c, _ in pending]
+            )
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), output in zip(pending, outputs):
+            if not future.done():
+                future.set_result(output)
+
+
+class CachedEmbeddingBackend(EmbeddingBackend):
+    """Wraps a backend with the on-disk chunk embedding store.
+
+    A late-chunked vector depends on every chunk embedded with it, so such a
+    page is only served from the store when all of its chunks hit; otherwise
+    the whole page is embedded again and stored. Backends that embed chunks
+    independently only embed the chunks that missed. Query embeddings are not
+    stored here.
+    """
+
+    def __init__(self, backend: EmbeddingBackend, stores: ChunkEmbeddingStores):
+        self.backend = backend
+        self.name = backend.name
+        self.model_id = backend.model_id
+        self.late_chunking = backend.late_chunking
+        task = (
+            "retrieval.passage+late_chunking"
+            if backend.late_chunking
+            else "retrieval.passage"
+        )
+        self.store = stores.get(backend.model_id, task)
+
+    async def embed_queries(self, queries: List[str]) -> np.ndarray:
+        return await self.backend.embed_queries(queries)
+
+    async def embed_passages(self, chunks: List[str]) -> np.ndarray:
+        if not chunks:
+            return await self.backend.embed_passages(chunks)
+        keys = chunk_keys(chunks, self.late_chunking)
+        try:
+            cached = await asyncio.to_thread(self.store.get_many, keys)
+        except Exception as e:
+            print(f"Error reading chunk embeddings: {e}")
+            cached = {}
+        if len(cached) == len(set(keys)):
+            return np.stack([cached[key] for key in keys])
+
+        if self.late_chunking:
+            new_keys = keys
+            vectors = await self.backend.embed_passages(chunks)
+        else:
+            missing = {
+                key: chunk for key, chunk in zip(keys, chunks) if key not in cached
+            }
+            new_keys = list(missing)
+            vectors = await self.backend.embed_passages(list(missing.values()))
+        try:
+            await asyncio.to_thread(self.store.put_many, new_keys, vectors)
+        except Exception as e:
+            print(f"Error writing chunk embeddings: {e}")
+        if self.late_chunking:
+            return vectors
+        cached.update(zip(new_keys, vectors))
+        return np.stack([cached[key] for key in keys])
+
+
+_embedding_backends: Dict[str, EmbeddingBackend] = {}
+
+
+def get_embedding_backend(backend: str | None = None) -> EmbeddingBackend:
+    """Shared web embedding backend, "api", "local" or "dense" (default
+    WEB_EMBEDDING_BACKEND, api). The local model and batch size are
+    WEB_EMBEDDING_LOCAL_MODEL and WEB_EMBEDDING_LOCAL_BATCH_SIZE; the dense
+    backend's batching window is WEB_EMBEDDING_BATCH_WINDOW_MS. Passage
+    embeddings go through the chunk embedding store unless
+    WEB_EMBEDDING_CACHE=false."""
+    backend = (backend or os.getenv("WEB_EMBEDDING_BACKEND", "api")).lower()
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(
+            f"Unknown embedding backend {backend!r}, expected one of {EMBEDDING_BACKENDS}"
+        )
+    if backend not in _embedding_backends:
+        if backend == "local":
+            _embedding_backends[backend] = LocalEmbeddingBackend(
+                model_name=os.getenv(
+                    "WEB_EMBEDDING_LOCAL_MODEL", "BAAI/bge-small-en-v1.5"
+                ),
+                batch_size=int(os.getenv("WEB_EMBEDDING_LOCAL_BATCH_SIZE", 32)),
+            )
+        elif backend == "dense":
+            _embedding_backends[backend] = DenseModelEmbeddingBackend(
+                batch_window=float(os.getenv("WEB_EMBEDDING_BATCH_WINDOW_MS", 10))
+                / 1000
+            )
+        else:
+            _embedding_backends[backend] = JinaApiEmbeddingBackend()
+        stores = get_chunk_embedding_stores()
+        if stores is not None:
+            _embedding_backends[backend] = CachedEmbeddingBackend(
+                _embedding_backends[backend], stores
+            )
+    return _embedding_backends[backend]
@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class CachedQueryEmbedding:
+    dense: List[float]
+    sparse_indices: List[int]
+    sparse_values: List[float]
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "dense": self.dense,
+                "sparse_indices": self.sparse_indices,
+                "sparse_values": self.sparse_values,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "CachedQueryEmbedding":
+        data = json.loads(raw)
+        return cls(
+            dense=data["dense"],
+            sparse_indices=data["sparse_indices"],
+            sparse_values=data["sparse_values"],
+        )
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so trivially different sub-queries share a cache entry."""
+    return " ".join(query.split())
+
+
+class QueryEmbeddingCache:
+    """Bounded, thread-safe LRU + TTL cache of dense and sparse query embeddings.
+
+    Entries are keyed on (model_id, normalized query). An optional async Redis
+    client is used as a shared second level, so entries survive restarts and are
+    shared across workers.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 4096,
+        ttl_seconds: float = 3600,
+        redis_client=None,
+        redis_prefix: str = "query_embedding:",
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.redis_client = redis_client
+        self.redis_prefix = redis_prefix
+        self._entries: OrderedDict[Tuple[str, str], Tuple[float, CachedQueryEmbedding]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+
+    def _redis_key(self, key: Tuple[str, str]) -> str:
+        return f"{self.redis_prefix}{key[0]}:{key[1]}"
+
+    def _get_local(self, key: Tuple[str, str]) -> Optional[CachedQueryEmbedding]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set_local(self, key: Tuple[str, str], value: CachedQueryEmbedding):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def get_many(
+        self, queries: List[str], model_id: str
+    ) -> List[Optional[CachedQueryEmbedding]]:
+        """Look up each query, returning None for misses (same order as queries)."""
+        keys = [(model_id, normalize_query(q)) for q in queries]
+        results = [self._get_local(key) for key in keys]
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing and self.redis_client is not None:
+            try:
+                raw_values = await self.redis_client.mget(
+                    [self._redis_key(keys[i]) for i in missing]
+                )
+                for i, raw in zip(missing, raw_values):
+                    if raw is None:
+                        continue
+                    value = CachedQueryEmbedding.from_json(raw)
+                    self._set_local(keys[i], value)
+                    results[i] = value
+                    self.redis_hits += 1
+            except Exception as e:
+                print(f"Error reading query embeddings from Redis: {e}")
+
+        with self._lock:
+            for result in results:
+                if result is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+
+        return results
+
+    async def set_many(
+        self,
+        queries: List[str],
+        model_id: str,
+        values: List[CachedQueryEmbedding],
+    ):
+        keys = [(model_id, normalize_query(q)) for q in queries]
+        for key, value in zip(keys, values):
+            self._set_local(key, value)
+
+        if self.redis_client is not None:
+            try:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for key, value in zip(keys, values):
+                        pipe.set(
+                            self._redis_key(key),
+                            value.to_json(),
+                            ex=max(int(self.ttl_seconds), 1),
+                        )
+                    await pipe.execute()
+            except Exception as e:
+                print(f"Error writing query embeddings to Redis: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "redis_hits": self.redis_hits,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+_query_embedding_cache: QueryEmbeddingCache | None = None
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Get the process-wide query embedding cache.
+
+    Sizing comes from QUERY_EMBEDDING_CACHE_SIZE / QUERY_EMBEDDING_CACHE_TTL, and
+    QUERY_EMBEDDING_CACHE_REDIS=true backs it with `backend.redis.redis_client`.
+    """
+    global _query_embedding_cache
+    if _query_embedding_cache is None:
+        redis_client = None
+        if os.getenv("QUERY_EMBEDDING_CACHE_REDIS", "false").lower() == "true":
+            from backend.redis import redis_client
+
+        _query_embedding_cache = QueryEmbeddingCache(
+            max_size=int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", 4096)),
+            ttl_seconds=float(os.getenv("QUERY_EMBEDDING_CACHE_TTL", 3600)),
+            redis_client=redis_client,
+        )
+    return _query_embedding_cache
@@ -0,0 +1,273 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, List
+import numpy as np
+
+ABANDONED_RESERVATION_SECONDS = 60
+
+
+def chunk_keys(chunks: List[str], late_chunking: bool = True) -> List[str]:
+    """sha256 key per chunk of one embedding batch.
+
+    Without late chunking the key is the hash of the chunk text alone. A
+    late-chunked vector depends on the whole page it was embedded with, so
+    then the key also covers a hash of the page's chunks: such stores only hit
+    when the same page content is embedded again, and hold one vector per
+    chunk of every distinct page.
+    """
+    if not late_chunking:
+        return [hashlib.sha256(chunk.encode("utf-8")).hexdigest() for chunk in chunks]
+    context = hashlib.sha256("\0".join(chunks).encode("utf-8")).hexdigest()
+    return [
+        hashlib.sha256(f"{context}\0{chunk}".encode("utf-8")).hexdigest()
+        for chunk in chunks
+    ]
+
+
+class ChunkEmbeddingStore:
+    """On-disk store of chunk embeddings for one (model, task).
+
+    Vectors live in a memory-mapped float16 file with `max_vectors` fixed slots
+    (`max_vectors * dim * 2` bytes, e.g. 400 MB for 200000 1024-d vectors);
+    a SQLite index maps each key to its slot and last access time. When the
+    store is full the least recently used tenth of the slots is freed.
+
+    Several processes (e.g. API workers) may share a store: slots are reserved
+    in a `BEGIN IMMEDIATE` transaction, committed before the vectors are
+    written, and only marked ready afterwards, so no two writers get the same
+    slot and readers never see a half-written vector.
+    """
+
+    def __init__(self, directory: str, max_vectors: int = 200000):
+        self.directory = directory
+        self.max_vectors = max_vectors
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._vectors: np.memmap | None = None
+        self.dim: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _open(self, dim: int | None = None) -> bool:
+        """Open the index and, once the dimension is known, the vector file."""
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(
+                os.path.join(self.directory, "index.sqlite3"), check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks (key TEXT PRIMARY KEY, "
+                "slot INTEGER UNIQUE NOT NULL, last_access REAL NOT NULL, "
+                "ready INTEGER NOT NULL DEFAULT 1)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(chunks)")}
+            if "ready" not in columns:
+                # Index created before slots were reserved ahead of the write
+                conn.execute(
+                    "ALTER TABLE chunks ADD COLUMN ready INTEGER NOT NULL DEFAULT 1"
+                )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value)"
+            )
+            conn.commit()
+            self._conn = conn
+            row = conn.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+            if row is not None:
+                self.dim = int(row[0])
+
+        if self._vectors is None:
+            if self.dim is None:
+                if dim is None:
+                    return False
+                # Another process may have recorded the dimension first
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO meta VALUES ('dim', ?)", (dim,)
+                )
+                self._conn.commit()
+                self.dim = int(
+                    self._conn.execute(
+                        "SELECT value FROM meta WHERE name = 'dim'"
+                    ).fetchone()[0]
+                )
+            path = os.path.join(self.directory, "vectors.f16")
+            shape = (self.max_vectors, self.dim)
+            if os.path.exists(path) and os.path.getsize(path) == np.prod(shape) * 2:
+                self._vectors = np.memmap(
+                    path, dtype=np.float16, mode="r+", shape=shape
+                )
+            else:
+                if os.path.exists(path):
+                    # Capacity changed: the old slots are meaningless
+                    self._conn.execute("DELETE FROM chunks")
+                    self._conn.commit()
+                self._vectors = np.memmap(
+                    path, dtype=np.float16, mode="w+", shape=shape
+                )
+        return True
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        with self._lock:
+            if not self._open():
+                self.misses += len(keys)
+                return {}
+            placeholders = ",".join("?" * len(keys))
+            rows = self._conn.execute(
+                f"SELECT key, slot FROM chunks WHERE ready = 1 AND key IN "
+                f"({placeholders})",
+                keys,
+            ).fetchall()
+            found = {
+                key: np.asarray(self._vectors[slot], dtype=np.float32)
+                for key, slot in rows
+            }
+            if found:
+                self._conn.executemany(
+                    "UPDATE chunks SET last_access = ? WHERE key = ?",
+                    [(time.time(), key) for key in found],
+                )
+                self._conn.commit()
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+            return found
+
+    def _free_slots(self, needed: int) -> List[int]:
+        next_slot = self._conn.execute(
+            "SELECT COALESCE(MAX(slot) + 1, 0) FROM chunks"
+        ).fetchone()[0]
+        if next_slot + needed <= self.max_vectors:
+            # Common case while the store fills up: no scan needed
+            return list(range(next_slot, next_slot + needed))
+        used = {
+            slot for (slot,) in self._conn.execute("SELECT slot FROM chunks").fetchall()
+        }
+        free = [slot for slot in range(self.max_vectors) if slot not in used]
+        if len(free) >= needed:
+            return free[:needed]
+        evict = max(needed - len(free), self.max_vectors // 10)
+        victims = self._conn.execute(
+            # Slots still being written by another process are not evicted
+            "SELECT key, slot FROM chunks WHERE ready = 1 "
+            "ORDER BY last_access LIMIT ?",
+            (evict,),
+        ).fetchall()
+        self._conn.executemany(
+            "DELETE FROM chunks WHERE key = ?", [(key,) for key, _ in victims]
+        )
+        self.evictions += len(victims)
+        free.extend(slot for _, slot in victims)
+        return free[:needed]
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        vectors = np.asarray(vectors)
+        with self._lock:
+            self._open(dim=vectors.shape[1])
+            if vectors.shape[1] != self.dim:
+                print(
+                    f"Chunk embedding store {self.directory} holds {self.dim}-d "
+                    f"vectors, not caching {vectors.shape[1]}-d ones."
+                )
+                return
+            placeholders = ",".join("?" * len(keys))
+            # Holds the write lock from the slot lookup to the reservation
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                # Reservations of a writer that died before marking them ready
+                self._conn.execute(
+                    "DELETE FROM chunks WHERE ready = 0 AND last_access < ?",
+                    (now - ABANDONED_RESERVATION_SECONDS,),
+                )
+                existing = {
+                    key
+                    for (key,) in self._conn.execute(
+                        f"SELECT key FROM chunks WHERE key IN ({placeholders})", keys
+                    ).fetchall()
+                }
+                new = {key: i for i, key in enumerate(keys) if key not in existing}
+                new = list(new.items())[: self.max_vectors]
+                if not new:
+                    self._conn.rollback()
+                    return
+                slots = self._free_slots(len(new))
+                self._conn.executemany(
+                    "INSERT INTO chunks (key, slot, last_access, ready) "
+                    "VALUES (?, ?, ?, 0)",
+                    [(key, slot, now) for (key, _), slot in zip(new, slots)],
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            for (key, i), slot in zip(new, slots):
+                self._vectors[slot] = vectors[i]
+            self._vectors.flush()
+            self._conn.executemany(
+                "UPDATE chunks SET ready = 1 WHERE key = ? AND slot = ?",
+                [(key, slot) for (key, _), slot in zip(new, slots)],
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            size = (
+                self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+                if self._conn is not None
+                else 0
+            )
+        total = self.hits + self.misses
+        return {
+            "vectors": size,
+            "capacity": self.max_vectors,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class ChunkEmbeddingStores:
+    """One `ChunkEmbeddingStore` per (model, task) under a root directory."""
+
+    def __init__(self, root: str, max_vectors: int = 200000):
+        self.root = root
+        self.max_vectors = max_vectors
+        self._stores: Dict[str, ChunkEmbeddingStore] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_id: str, task: str) -> ChunkEmbeddingStore:
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{model_id}__{task}")
+        with self._lock:
+            if name not in self._stores:
+                self._stores[name] = ChunkEmbeddingStore(
+                    os.path.join(self.root, name), self.max_vectors
+                )
+            return self._stores[name]
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            stores = dict(self._stores)
+        return {name: store.stats() for name, store in stores.items()}
+
+
+_chunk_embedding_stores: ChunkEmbeddingStores | None = None
+
+
+def get_chunk_embedding_stores() -> ChunkEmbeddingStores | None:
+    """Process-wide chunk embedding stores, or None when
+    WEB_EMBEDDING_CACHE=false. Configured by WEB_EMBEDDING_CACHE_DIR and
+    WEB_EMBEDDING_CACHE_MAX_VECTORS (per model and task)."""
+    global _chunk_embedding_stores
+    if os.getenv("WEB_EMBEDDING_CACHE", "true").lower() != "true":
+        return None
+    if _chunk_embedding_stores is None:
+        _chunk_embedding_stores = ChunkEmbeddingStores(
+            os.getenv("WEB_EMBEDDING_CACHE_DIR", ".cache/chunk_embeddings"),
+            max_vectors=int(os.getenv("WEB_EMBEDDING_CACHE_MAX_VECTORS", 200000)),
+        )
+    return _chunk_embedding_stores
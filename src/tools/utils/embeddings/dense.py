@@ -1,16 +1,34 @@
+import os
 import torch
 from typing import List
 from transformers import AutoTokenizer, AutoModel
-from src.tools.utils.embeddings.late_chunking import long_late_chunking
+import numpy as np
+from src.tools.utils.embeddings.late_chunking import (
+    long_late_chunking,
+    batch_late_chunking,
+)
+
+
+def resolve_device(device: str | None = None) -> str:
+    """Pick the torch device: explicit arg, then DENSE_MODEL_DEVICE, then cuda/mps/cpu."""
+    device = device or os.getenv("DENSE_MODEL_DEVICE")
+    if device:
+        return device
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
 
 
 def init_dense_model(
-    model_name: str = "jinaai/jina-embeddings-v4", device="mps"
+    model_name: str = "jinaai/jina-embeddings-v4", device: str | None = None
 ) -> AutoModel:
+    device = resolve_device(device)
     tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
     model = AutoModel.from_pretrained(model_name, trust_remote_code=True).to(device)
     model.eval()
-    print("Initialized dense model.")
+    print(f"Initialized dense model on {device}.")
 
     return model, tokenizer
 
@@ -25,7 +43,36 @@ def get_passage_embeddings(
     tokenizer: AutoTokenizer,
     max_tokens: int = 8192,
     overlap_size: int = 512,
-) -> torch.Tensor:
+    output_dtype: np.dtype = np.float32,
+) -> np.ndarray:
     return long_late_chunking(
-        chunks, model, tokenizer, max_tokens=max_tokens, overlap_size=overlap_size
+        chunks,
+        model,
+        tokenizer,
+        max_tokens=max_tokens,
+        overlap_size=overlap_size,
+        output_dtype=output_dtype,
+    )
+
+
+def get_batch_passage_embeddings(
+    documents: List[List[str]],
+    model: AutoModel,
+    tokenizer: AutoTokenizer,
+    max_tokens: int = 8192,
+    overlap_size: int = 512,
+    max_batch_tokens: int = 16384,
+    max_batch_size: int = 16,
+    output_dtype: np.dtype = np.float32,
+) -> List[np.ndarray]:
+    """Late-chunking embeddings for several documents, sharing forward passes."""
+    return batch_late_chunking(
+        documents,
+        model,
+        tokenizer,
+        max_tokens=max_tokens,
+        overlap_size=overlap_size,
+        max_batch_tokens=max(max_batch_tokens, max_tokens),
+        max_batch_size=max_batch_size,
+        output_dtype=output_dtype,
     )
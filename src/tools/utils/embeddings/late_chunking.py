@@ -1,88 +1,317 @@
-from typing import List
+from dataclasses import dataclass
+from typing import List, Tuple
 import torch
 import numpy as np
 from transformers import AutoModel, AutoTokenizer
 
+PASSAGE_PREFIX = "Passage:"
 
-# Jina embeddings v4 version
-def late_chunking(
-    chunks: List[str], model: AutoModel, tokenizer: AutoTokenizer, separator: str = " "
-) -> np.array:
-    embed_text = "Passage: " + f"{separator}".join(chunks)
-    tokenization = tokenizer([embed_text], return_tensors="pt").to(model.device)
+
+@dataclass
+class EncodedPassage:
+    """A tokenized late-chunking input and the token span pooled into each chunk.
+
+    The spans follow the original per-chunk implementation: the first chunk
+    starts after the tokens of "Passage:" (special tokens included) and chunk k
+    spans as many tokens as `separator + chunk` has when tokenized on its own.
+    `token_bounds` holds where each chunk's text actually starts and ends in
+    `input_ids`, which is what windows are sliced by.
+    """
+
+    chunks: List[str]
+    input_ids: List[int]
+    # (num_chunks, 2) start and end token positions
+    spans: np.ndarray
+    token_bounds: np.ndarray
+    prefix_tokens: int
+    # Special tokens the tokenizer appends (e.g. EOS)
+    suffix_tokens: int = 0
+
+    @property
+    def num_tokens(self) -> int:
+        return len(self.input_ids)
+
+    def window(self, first: int, last: int) -> "EncodedPassage":
+        """Chunks [first, last) behind the prompt prefix, sliced from this
+        encoding rather than tokenized again."""
+        start, end = self.token_bounds[first, 0], self.token_bounds[last - 1, 1]
+        text_prefix = int(self.token_bounds[0, 0])
+        input_ids = (
+            self.input_ids[:text_prefix]
+            + self.input_ids[start:end]
+            + self.input_ids[self.num_tokens - self.suffix_tokens :]
+        )
+        return EncodedPassage(
+            chunks=self.chunks[first:last],
+            input_ids=input_ids,
+            spans=self.spans[first:last] - self.spans[first, 0] + self.prefix_tokens,
+            token_bounds=self.token_bounds[first:last] - start + text_prefix,
+            prefix_tokens=self.prefix_tokens,
+            suffix_tokens=self.suffix_tokens,
+        )
+
+
+def encode_passage(
+    chunks: List[str], tokenizer: AutoTokenizer, separator: str = " "
+) -> EncodedPassage:
+    """Tokenize "Passage: " + separator.join(chunks) once, plus one batched call
+    for the per-chunk span lengths."""
+    text = PASSAGE_PREFIX + " "
+    char_bounds = []
+    for k, chunk in enumerate(chunks):
+        if k > 0:
+            text += separator
+        char_bounds.append((len(text), len(text) + len(chunk)))
+        text += chunk
+
+    encoding = tokenizer(
+        text, return_offsets_mapping=True, return_special_tokens_mask=True
+    )
+    special = encoding["special_tokens_mask"]
+    prefix_special = next((t for t, s in enumerate(special) if not s), len(special))
+    suffix_tokens = next(
+        (t for t, s in enumerate(reversed(special)) if not s), len(special)
+    )
+    token_starts = np.array(
+        [start for start, _ in encoding["offset_mapping"]], dtype=np.int64
+    )[prefix_special : len(special) - suffix_tokens]
+    token_bounds = prefix_special + np.searchsorted(
+        token_starts, np.array(char_bounds, dtype=np.int64).reshape(-1, 2)
+    )
+
+    prefix_tokens = len(tokenizer(PASSAGE_PREFIX)["input_ids"])
+    lengths = np.array(
+        [
+            len(ids)
+            for ids in (
+                tokenizer([separator + chunk for chunk in chunks])["input_ids"]
+                if chunks
+                else []
+            )
+        ],
+        dtype=np.int64,
+    )
+    ends = prefix_tokens + np.cumsum(lengths)
+    return EncodedPassage(
+        chunks=list(chunks),
+        input_ids=list(encoding["input_ids"]),
+        spans=np.stack([ends - lengths, ends], axis=1),
+        token_bounds=token_bounds,
+        prefix_tokens=prefix_tokens,
+        suffix_tokens=suffix_tokens,
+    )
+
+
+def _forward_batch(
+    passages: List[EncodedPassage], model: AutoModel, tokenizer: AutoTokenizer
+) -> List[np.ndarray]:
+    """Run one padded forward pass and mean-pool every passage's chunks.
+
+    Pooling repeats the original per-chunk arithmetic (masked sum and mean in
+    the model's output dtype), so an unpadded passage gives the same vectors
+    as before. Padding changes the bf16 attention kernels' rounding, so
+    passages batched with longer ones only match within a small tolerance.
+    """
+    batch = tokenizer.pad(
+        {"input_ids": [p.input_ids for p in passages]},
+        padding=True,
+        return_attention_mask=True,
+        return_tensors="pt",
+    ).to(model.device)
     with torch.no_grad():
         with torch.autocast(device_type=model.device.type, dtype=torch.bfloat16):
             hidden_states = model.get_last_hidden_states(
-                **tokenization, task_label="retrieval"
+                **batch, task_label="retrieval"
             )
 
-    start_idx = len(tokenizer("Passage:")["input_ids"])
-    chunk_embeddings = []
-    for chunk in chunks:
-        end_idx = start_idx + len(tokenizer(f"{separator}" + chunk)["input_ids"])
-        temp = hidden_states[:, start_idx:end_idx, :]
-        attention_mask = tokenization["attention_mask"][:, start_idx:end_idx]
-        pooled_output = torch.sum(
-            temp * attention_mask.unsqueeze(-1), dim=1
-        ) / torch.sum(attention_mask, dim=1, keepdim=True)
-        embedding = (
-            torch.nn.functional.normalize(pooled_output, p=2, dim=1)
+    seq_len = batch["input_ids"].shape[1]
+    attention_mask = batch["attention_mask"]
+    outputs = []
+    for row, passage in enumerate(passages):
+        offset = seq_len - passage.num_tokens if tokenizer.padding_side == "left" else 0
+        pooled = []
+        for start, end in passage.spans + offset:
+            temp = hidden_states[row : row + 1, start:end, :]
+            mask = attention_mask[row : row + 1, start:end]
+            pooled.append(
+                torch.sum(temp * mask.unsqueeze(-1), dim=1)
+                / torch.sum(mask, dim=1, keepdim=True)
+            )
+        if not pooled:
+            outputs.append(np.empty((0, hidden_states.shape[-1]), dtype=np.float32))
+            continue
+        outputs.append(
+            torch.nn.functional.normalize(torch.cat(pooled), p=2, dim=1)
             .cpu()
             .float()
             .numpy()
         )
-        chunk_embeddings.append(embedding[0])
-        start_idx = end_idx
+    return outputs
 
-    return np.array(chunk_embeddings)
 
+def _pack_batches(
+    lengths: List[int], max_batch_tokens: int, max_batch_size: int
+) -> List[List[int]]:
+    """Group inputs of similar length so padded batches stay under the token budget."""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for i in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+        # Sorted ascending, so the newest item sets the padded length
+        if current and (
+            len(current) >= max_batch_size
+            or (len(current) + 1) * lengths[i] > max_batch_tokens
+        ):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
 
-def long_late_chunking(
-    chunks: List[str],
+
+def _split_into_windows(
+    chunks_token_length: List[int],
+    prefix_tokens: int,
+    max_tokens: int,
+    overlap_size: int,
+) -> List[Tuple[int, int, int]]:
+    """Overlapping windows for long late chunking as (first chunk, end chunk,
+    number of leading overlap chunks whose embeddings are discarded)."""
+    num_chunks = len(chunks_token_length)
+    windows = []
+    i = 0
+    while i < num_chunks:
+        num_tokens = prefix_tokens
+        j = 1
+        if i > 0:
+            while j <= i and (num_tokens + chunks_token_length[i - j]) < overlap_size:
+                num_tokens += chunks_token_length[i - j]
+                j += 1
+
+        start = i
+        while (i < num_chunks) and (num_tokens + chunks_token_length[i]) < max_tokens:
+            num_tokens += chunks_token_length[i]
+            i += 1
+        if i == start:
+            # A single chunk larger than the window still has to make progress
+            i += 1
+
+        windows.append((start - j + 1, i, j - 1))
+    return windows
+
+
+def _hidden_size(model: AutoModel) -> int | None:
+    config = getattr(model, "config", None)
+    for cfg in (config, getattr(config, "text_config", None)):
+        size = getattr(cfg, "hidden_size", None)
+        if isinstance(size, int):
+            return size
+    return None
+
+
+def batch_late_chunking(
+    documents: List[List[str]],
     model: AutoModel,
     tokenizer: AutoTokenizer,
     separator: str = "\n\n",
     max_tokens: int = 32768,
     overlap_size: int = 1024,
-) -> np.array:
-    save_res = []
-    text = f"{separator}".join(chunks)
+    max_batch_tokens: int = 32768,
+    max_batch_size: int = 16,
+    output_dtype: np.dtype = np.float32,
+) -> List[np.ndarray]:
+    """Late chunking for many documents at once.
 
-    if len(tokenizer("Passage: " + text)["input_ids"]) < max_tokens:
-        return late_chunking(chunks, model, tokenizer, separator)
+    Each document is tokenized once; documents longer than `max_tokens` are
+    split into overlapping windows sliced from that encoding. Documents and
+    windows are then packed by length into padded batches of at most
+    `max_batch_tokens` tokens, so many short documents share a single forward
+    pass.
 
-    else:
-        final_embeddings = np.empty((0, 2048))
-        chunks_token_length = [len(tokenizer(chunk)["input_ids"]) for chunk in chunks]
-        i = 0
-        j = 1
+    Windows are planned and pooled exactly as `long_late_chunking` used to,
+    but their token ids come from the whole-document encoding, so the tokens
+    at a window's first chunk can differ from tokenizing the window's text on
+    its own. Results therefore match the previous implementation exactly only
+    for short documents embedded one per batch (`max_batch_size=1`); padded
+    batches and windows match within bf16 tolerance.
+    `benchmark_late_chunking.py` checks both against the old code.
+
+    Returns one (num_chunks, hidden_size) array of `output_dtype` per document.
+    Each array is allocated once and every window writes its rows in place;
+    `np.float16` halves the memory held for large documents.
+    """
+    # (document index, number of leading chunks to drop, first output row, passage)
+    segments: List[Tuple[int, int, int, EncodedPassage]] = []
+    for doc_idx, chunks in enumerate(documents):
+        if not chunks:
+            continue
+        passage = encode_passage(chunks, tokenizer, separator)
+        if passage.num_tokens < max_tokens:
+            segments.append((doc_idx, 0, 0, passage))
+            continue
+        chunks_token_length = [len(ids) for ids in tokenizer(chunks)["input_ids"]]
+        for first, end, skip in _split_into_windows(
+            chunks_token_length, passage.prefix_tokens, max_tokens, overlap_size
+        ):
+            segments.append((doc_idx, skip, first + skip, passage.window(first, end)))
 
-        while i < len(chunks):
-            num_tokens = len(tokenizer("Passage:")["input_ids"])
-            j = 1
-            temp_chunks = []
-            if i == 0:
-                temp_chunks = []
-            else:
-                while (num_tokens + chunks_token_length[i - j]) < overlap_size:
-                    num_tokens += chunks_token_length[i - j]
-                    j += 1
-                temp_chunks = chunks[i - j + 1 : i]
-
-            while (i < len(chunks)) and (
-                num_tokens + chunks_token_length[i]
-            ) < max_tokens:
-                temp_chunks.append(chunks[i])
-                num_tokens += chunks_token_length[i]
-                i += 1
-
-            save_res.append(temp_chunks)
-            temp_embeddings = late_chunking(temp_chunks, model, tokenizer, separator)
-            final_embeddings = np.concatenate(
-                (final_embeddings, temp_embeddings[j - 1 :, :]), axis=0
+    hidden_size = _hidden_size(model)
+    outputs: List[np.ndarray | None] = [None] * len(documents)
+
+    def get_output(doc_idx: int, dim: int) -> np.ndarray:
+        if outputs[doc_idx] is None:
+            outputs[doc_idx] = np.empty(
+                (len(documents[doc_idx]), dim), dtype=output_dtype
             )
+        return outputs[doc_idx]
+
+    for batch in _pack_batches(
+        [segment[3].num_tokens for segment in segments],
+        max_batch_tokens,
+        max_batch_size,
+    ):
+        embeddings = _forward_batch([segments[i][3] for i in batch], model, tokenizer)
+        for i, segment_embeddings in zip(batch, embeddings):
+            doc_idx, skip, first_row, _ = segments[i]
+            rows = segment_embeddings[skip:]
+            output = get_output(doc_idx, rows.shape[1])
+            output[first_row : first_row + len(rows)] = rows
+
+    return [
+        output
+        if output is not None
+        else np.empty((0, hidden_size or 0), dtype=output_dtype)
+        for output in outputs
+    ]
 
-    return final_embeddings
+
+# Jina embeddings v4 version
+def late_chunking(
+    chunks: List[str], model: AutoModel, tokenizer: AutoTokenizer, separator: str = " "
+) -> np.array:
+    passage = encode_passage(chunks, tokenizer, separator)
+    return _forward_batch([passage], model, tokenizer)[0]
+
+
+def long_late_chunking(
+    chunks: List[str],
+    model: AutoModel,
+    tokenizer: AutoTokenizer,
+    separator: str = "\n\n",
+    max_tokens: int = 32768,
+    overlap_size: int = 1024,
+    output_dtype: np.dtype = np.float32,
+) -> np.array:
+    return batch_late_chunking(
+        [chunks],
+        model,
+        tokenizer,
+        separator=separator,
+        max_tokens=max_tokens,
+        overlap_size=overlap_size,
+        max_batch_tokens=max_tokens,
+        output_dtype=output_dtype,
+    )[0]
 
 
 # Late chunking algorithm for Jina-embeddings-v3
@@ -0,0 +1,208 @@
+import os
+import time
+import asyncio
+import importlib.util
+from dataclasses import dataclass, field
+from typing import Dict, Set
+import httpx
+
+
+@dataclass
+class HttpClientConfig:
+    base_url: str = ""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0
+    pool_timeout: float = 10.0
+    http2: bool = True
+
+
+def _env_config(prefix: str, base_url: str = "") -> HttpClientConfig:
+    """Pool settings for one upstream, overridable with <PREFIX>_HTTP_* env vars."""
+    return HttpClientConfig(
+        base_url=base_url,
+        max_connections=int(os.getenv(f"{prefix}_HTTP_MAX_CONNECTIONS", 100)),
+        max_keepalive_connections=int(
+            os.getenv(f"{prefix}_HTTP_MAX_KEEPALIVE", 20)
+        ),
+        keepalive_expiry=float(os.getenv(f"{prefix}_HTTP_KEEPALIVE_EXPIRY", 30)),
+        connect_timeout=float(os.getenv(f"{prefix}_HTTP_CONNECT_TIMEOUT", 5)),
+        read_timeout=float(os.getenv(f"{prefix}_HTTP_READ_TIMEOUT", 60)),
+        pool_timeout=float(os.getenv(f"{prefix}_HTTP_POOL_TIMEOUT", 10)),
+        http2=os.getenv(f"{prefix}_HTTP2", "true").lower() == "true",
+    )
+
+
+UPSTREAM_CONFIGS = {
+    "jina": lambda: _env_config("JINA", "https://api.jina.ai"),
+    "searxng": lambda: _env_config("SEARXNG", os.getenv("SEARXNG_API_URL", "")),
+    # Arbitrary web pages, e.g. conditional revalidation of cached pages
+    "web": lambda: _env_config("WEB"),
+}
+
+
+@dataclass
+class HttpClientStats:
+    requests: int = 0
+    in_flight: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    status_counts: Dict[str, int] = field(default_factory=dict)
+
+
+class _MeteredTransport(httpx.AsyncHTTPTransport):
+    """AsyncHTTPTransport that counts requests and exposes its connection pool."""
+
+    def __init__(self, stats: HttpClientStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.requests += 1
+        self.stats.in_flight += 1
+        start = time.perf_counter()
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            self.stats.errors += 1
+            raise
+        finally:
+            self.stats.in_flight -= 1
+            self.stats.total_seconds += time.perf_counter() - start
+        status = f"{response.status_code // 100}xx"
+        self.stats.status_counts[status] = self.stats.status_counts.get(status, 0) + 1
+        return response
+
+    def pool_usage(self) -> Dict[str, int]:
+        connections = list(self._pool.connections)
+        idle = sum(1 for c in connections if c.is_idle())
+        return {
+            "connections": len(connections),
+            "active_connections": len(connections) - idle,
+            "idle_connections": idle,
+        }
+
+
+class HttpClientManager:
+    """One pooled `httpx.AsyncClient` per upstream (Jina, SearXNG, ...).
+
+    Clients are created on first use and reused for every call, so requests
+    share keep-alive connections instead of paying TCP+TLS setup each time.
+    A client belongs to the event loop it was created on; scripts that call
+    `asyncio.run` more than once get a fresh client per loop, and the previous
+    one is closed.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._loops: Dict[str, asyncio.AbstractEventLoop] = {}
+        self._transports: Dict[str, _MeteredTransport] = {}
+        self._stats: Dict[str, HttpClientStats] = {}
+        self._closing: Set[asyncio.Task] = set()
+
+    def _create_client(self, upstream: str) -> httpx.AsyncClient:
+        config_factory = UPSTREAM_CONFIGS.get(upstream)
+        config = config_factory() if config_factory else HttpClientConfig()
+        http2 = config.http2 and importlib.util.find_spec("h2") is not None
+        if config.http2 and not http2:
+            print(f"h2 is not installed, using HTTP/1.1 for {upstream}.")
+        stats = self._stats.setdefault(upstream, HttpClientStats())
+        transport = _MeteredTransport(
+            stats,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+        )
+        self._transports[upstream] = transport
+        return httpx.AsyncClient(
+            base_url=config.base_url,
+            transport=transport,
+            timeout=httpx.Timeout(
+                config.read_timeout,
+                connect=config.connect_timeout,
+                pool=config.pool_timeout,
+            ),
+        )
+
+    def get_client(self, upstream: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(upstream)
+        if client is None or client.is_closed or self._loops[upstream] is not loop:
+            if client is not None and not client.is_closed:
+                self._retire(client, self._loops[upstream], loop)
+            client = self._create_client(upstream)
+            self._clients[upstream] = client
+            self._loops[upstream] = loop
+        return client
+
+    @staticmethod
+    async def _close_quietly(client: httpx.AsyncClient):
+        try:
+            await client.aclose()
+        except Exception:
+            # The connections belong to a finished loop; they can only be dropped
+            pass
+
+    def _retire(
+        self,
+        client: httpx.AsyncClient,
+        old_loop: asyncio.AbstractEventLoop,
+        loop: asyncio.AbstractEventLoop,
+    ):
+        """Best-effort close of a client replaced because the loop changed."""
+        if old_loop.is_running() and not old_loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._close_quietly(client), old_loop)
+            return
+        task = loop.create_task(self._close_quietly(client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def aclose(self):
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._loops.clear()
+        self._transports.clear()
+        await asyncio.gather(
+            *(client.aclose() for client in clients),
+            *self._closing,
+            return_exceptions=True,
+        )
+
+    def stats(self) -> Dict[str, dict]:
+        result = {}
+        for upstream, stats in self._stats.items():
+            transport = self._transports.get(upstream)
+            result[upstream] = {
+                "requests": stats.requests,
+                "in_flight": stats.in_flight,
+                "errors": stats.errors,
+                "avg_latency_ms": (
+                    stats.total_seconds / stats.requests * 1000
+                    if stats.requests
+                    else 0.0
+                ),
+                "status_counts": dict(stats.status_counts),
+                **(transport.pool_usage() if transport else {}),
+            }
+        return result
+
+
+http_client_manager = HttpClientManager()
+
+
+def get_http_client(upstream: str) -> httpx.AsyncClient:
+    """Shared pooled client for `upstream` ("jina" or "searxng")."""
+    return http_client_manager.get_client(upstream)
+
+
+async def close_http_clients():
+    await http_client_manager.aclose()
+
+
+def get_http_client_stats() -> Dict[str, dict]:
+    return http_client_manager.stats()
@@ -0,0 +1,197 @@
+import os
+import time
+import random
+import asyncio
+import bisect
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import httpx
+from src.tools.utils.http import get_http_client
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0
+    failures: int = 0
+    histogram: List[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    )
+
+    def observe(self, seconds: float):
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+
+    def to_dict(self) -> dict:
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [
+            f">{LATENCY_BUCKETS_MS[-1]}ms"
+        ]
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "failures": self.failures,
+            "latency_histogram": dict(zip(labels, self.histogram)),
+        }
+
+
+class RateLimiter:
+    """Token bucket plus a cap on in-flight requests for one endpoint.
+
+    The refill rate adapts: it halves whenever the server answers 429 and
+    creeps back up towards `max_rate` on every success.
+    """
+
+    def __init__(self, max_rate: float, burst: int, max_in_flight: int):
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+
+    async def _take_token(self):
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            await asyncio.sleep(wait)
+
+    async def __aenter__(self):
+        await self._in_flight.acquire()
+        try:
+            await self._take_token()
+        except BaseException:
+            self._in_flight.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self._in_flight.release()
+
+    def on_throttled(self):
+        self.rate = max(self.max_rate / 16, self.rate / 2)
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class JinaApiClient:
+    """Rate-limited, retrying POSTs to the Jina API, with one limiter and one
+    set of latency stats per endpoint ("embeddings", "rerank")."""
+
+    def __init__(
+        self,
+        max_rate: float = 8.0,
+        burst: int = 16,
+        max_in_flight: int = 16,
+        max_retries: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+    ):
+        self.max_rate = max_rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._loops: Dict[str, asyncio.AbstractEventLoop] = {}
+        self._stats: Dict[str, EndpointStats] = {}
+
+    def _limiter(self, endpoint: str) -> RateLimiter:
+        # asyncio primitives belong to one loop, so a new loop gets new limiters
+        loop = asyncio.get_running_loop()
+        if endpoint not in self._limiters or self._loops.get(endpoint) is not loop:
+            self._limiters[endpoint] = RateLimiter(
+                self.max_rate, self.burst, self.max_in_flight
+            )
+            self._loops[endpoint] = loop
+        return self._limiters[endpoint]
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response else None
+        if retry_after:
+            try:
+                return min(self.max_delay, float(retry_after))
+            except ValueError:
+                pass
+        delay = min(self.max_delay, self.base_delay * 2**attempt)
+        # Full jitter so concurrent retries don't arrive together
+        return random.uniform(0, delay)
+
+    async def post(self, endpoint: str, url: str, **kwargs) -> httpx.Response:
+        """POST with backoff on 429/5xx and transport errors.
+
+        Returns the last response (which may still be an error status) or
+        raises the last transport error once `max_retries` is exhausted.
+        """
+        limiter = self._limiter(endpoint)
+        stats = self._stats.setdefault(endpoint, EndpointStats())
+        client = get_http_client("jina")
+        for attempt in range(self.max_retries + 1):
+            response = None
+            error = None
+            async with limiter:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(url, **kwargs)
+                except httpx.TransportError as e:
+                    error = e
+                stats.requests += 1
+                stats.observe(time.perf_counter() - start)
+
+            status_code = response.status_code if response is not None else None
+            if status_code is not None and status_code not in RETRYABLE_STATUS_CODES:
+                limiter.on_success()
+                return response
+            if status_code == 429:
+                stats.throttled += 1
+                limiter.on_throttled()
+            if attempt == self.max_retries:
+                stats.failures += 1
+                if error is not None:
+                    raise error
+                return response
+            stats.retries += 1
+            await asyncio.sleep(self._backoff(attempt, response))
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            endpoint: {**stats.to_dict(), "rate": self._limiters[endpoint].rate}
+            for endpoint, stats in self._stats.items()
+        }
+
+
+_jina_api_client: JinaApiClient | None = None
+
+
+def get_jina_api_client() -> JinaApiClient:
+    """Process-wide Jina API client, configured by JINA_RATE_LIMIT_RPS,
+    JINA_RATE_LIMIT_BURST, JINA_MAX_IN_FLIGHT and JINA_MAX_RETRIES."""
+    global _jina_api_client
+    if _jina_api_client is None:
+        _jina_api_client = JinaApiClient(
+            max_rate=float(os.getenv("JINA_RATE_LIMIT_RPS", 8)),
+            burst=int(os.getenv("JINA_RATE_LIMIT_BURST", 16)),
+            max_in_flight=int(os.getenv("JINA_MAX_IN_FLIGHT", 16)),
+            max_retries=int(os.getenv("JINA_MAX_RETRIES", 4)),
+        )
+    return _jina_api_client
+
+
+def get_jina_endpoint_stats() -> Dict[str, dict]:
+    return get_jina_api_client().stats()
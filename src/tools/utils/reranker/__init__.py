@@ -1,3 +1,47 @@
-from src.tools.utils.reranker.api import rerank_documents
+import os
+from typing import Dict
+from src.tools.utils.reranker.base import Reranker
+from src.tools.utils.reranker.api import rerank_documents, JinaApiReranker
+from src.tools.utils.reranker.local import LocalReranker
 
-__all__ = ["rerank_documents"]
+RERANKER_BACKENDS = ("api", "local")
+
+_rerankers: Dict[str, Reranker] = {}
+
+
+def get_reranker(backend: str | None = None) -> Reranker:
+    """Shared reranker for `backend` ("api" or "local").
+
+    Defaults to RERANKER_BACKEND (api). The local backend reads
+    RERANKER_LOCAL_MODEL, RERANKER_LOCAL_BATCH_SIZE, RERANKER_LOCAL_WORKERS and
+    RERANKER_LOCAL_THREADS.
+    """
+    backend = (backend or os.getenv("RERANKER_BACKEND", "api")).lower()
+    if backend not in RERANKER_BACKENDS:
+        raise ValueError(
+            f"Unknown reranker backend {backend!r}, expected one of {RERANKER_BACKENDS}"
+        )
+    if backend not in _rerankers:
+        if backend == "local":
+            threads = os.getenv("RERANKER_LOCAL_THREADS")
+            _rerankers[backend] = LocalReranker(
+                model_name=os.getenv(
+                    "RERANKER_LOCAL_MODEL", "jinaai/jina-reranker-v2-base-multilingual"
+                ),
+                batch_size=int(os.getenv("RERANKER_LOCAL_BATCH_SIZE", 32)),
+                max_workers=int(os.getenv("RERANKER_LOCAL_WORKERS", 2)),
+                threads=int(threads) if threads else None,
+            )
+        else:
+            _rerankers[backend] = JinaApiReranker()
+    return _rerankers[backend]
+
+
+__all__ = [
+    "Reranker",
+    "JinaApiReranker",
+    "LocalReranker",
+    "RERANKER_BACKENDS",
+    "get_reranker",
+    "rerank_documents",
+]
@@ -1,7 +1,8 @@
 import os
 import asyncio
-import httpx
 from typing import List, Dict
+from src.tools.utils.rate_limit import get_jina_api_client
+from src.tools.utils.reranker.base import Reranker
 
 
 async def rerank_documents(
@@ -21,36 +22,36 @@ async def rerank_documents(
         ]
         all_results = []
 
-        async with httpx.AsyncClient() as client:
-            # Process batches concurrently
-            tasks = []
-            for batch_idx, batch_docs in enumerate(batches):
-                request_data = {
-                    "model": "jina-reranker-v2-base-multilingual",
-                    "query": query,
-                    "top_n": len(batch_docs),
-                    "documents": batch_docs,
-                }
-
-                task = asyncio.create_task(
-                    client.post(base_url, json=request_data, headers=headers)
-                )
-                tasks.append((batch_idx, task))
-
-            # Await all tasks
-            for batch_idx, task in tasks:
-                response = await task
-                if response.status_code == 200:
-                    data = response.json()
-                    start_idx = batch_idx * batch_size
-                    batch_results = [
-                        {
-                            "index": start_idx + result["index"],
-                            "relevance_score": result["relevance_score"],
-                        }
-                        for result in data["results"]
-                    ]
-                    all_results.extend(batch_results)
+        client = get_jina_api_client()
+        # Process batches concurrently
+        tasks = []
+        for batch_idx, batch_docs in enumerate(batches):
+            request_data = {
+                "model": "jina-reranker-v2-base-multilingual",
+                "query": query,
+                "top_n": len(batch_docs),
+                "documents": batch_docs,
+            }
+
+            task = asyncio.create_task(
+                client.post("rerank", base_url, json=request_data, headers=headers)
+            )
+            tasks.append((batch_idx, task))
+
+        # Await all tasks
+        for batch_idx, task in tasks:
+            response = await task
+            if response.status_code == 200:
+                data = response.json()
+                start_idx = batch_idx * batch_size
+                batch_results = [
+                    {
+                        "index": start_idx + result["index"],
+                        "relevance_score": result["relevance_score"],
+                    }
+                    for result in data["results"]
+                ]
+                all_results.extend(batch_results)
 
         all_results.sort(key=lambda x: x["relevance_score"], reverse=True)
         return {"results": all_results}
@@ -58,3 +59,15 @@ async def rerank_documents(
     except Exception as e:
         print(f"Error in reranking documents: {e}")
         return {"results": []}
+
+
+class JinaApiReranker(Reranker):
+    """Remote jina-reranker-v2-base-multilingual through the Jina rerank API."""
+
+    name = "api"
+
+    def __init__(self, batch_size: int = 2000):
+        self.batch_size = batch_size
+
+    async def rerank(self, query: str, documents: List[str]) -> Dict:
+        return await rerank_documents(query, documents, batch_size=self.batch_size)
@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+
+class Reranker(ABC):
+    """Scores documents against a query.
+
+    `rerank` returns `{"results": [{"index": i, "relevance_score": s}, ...]}`
+    sorted by score, the shape of the Jina rerank API, with scores in [0, 1]
+    so every backend can be weighted by the same `jina_rerank_factor`.
+    """
+
+    name: str = "base"
+
+    @abstractmethod
+    async def rerank(self, query: str, documents: List[str]) -> Dict: ...
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+import numpy as np
+from src.tools.utils.reranker.base import Reranker
+
+
+class LocalReranker(Reranker):
+    """In-process cross-encoder on CPU (fastembed/ONNX Runtime).
+
+    The model is loaded on first use. Scoring runs in a small thread pool so the
+    event loop is not blocked; ONNX Runtime releases the GIL while it runs.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        model_name: str = "jinaai/jina-reranker-v2-base-multilingual",
+        batch_size: int = 32,
+        max_workers: int = 2,
+        threads: int | None = None,
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.threads = threads
+        self._model = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="reranker"
+        )
+
+    def _get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from fastembed.rerank.cross_encoder import TextCrossEncoder
+
+                    self._model = TextCrossEncoder(
+                        model_name=self.model_name, threads=self.threads
+                    )
+                    print(f"Initialized local reranker {self.model_name}.")
+        return self._model
+
+    def _score(self, query: str, documents: List[str]) -> np.ndarray:
+        logits = np.fromiter(
+            self._get_model().rerank(query, documents, batch_size=self.batch_size),
+            dtype=np.float32,
+            count=len(documents),
+        )
+        # The API reports sigmoid(logit); match it so boosts stay comparable
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    async def rerank(self, query: str, documents: List[str]) -> Dict:
+        if not documents:
+            return {"results": []}
+        try:
+            loop = asyncio.get_running_loop()
+            scores = await loop.run_in_executor(
+                self._executor, self._score, query, documents
+            )
+        except Exception as e:
+            print(f"Error in local reranking: {e}")
+            return {"results": []}
+        order = np.argsort(-scores, kind="stable")
+        return {
+            "results": [
+                {"index": int(i), "relevance_score": float(scores[i])} for i in order
+            ]
+        }
+
+    def warmup(self):
+        self._get_model()
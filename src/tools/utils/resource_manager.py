@@ -1,15 +1,21 @@
-from qdrant_client import AsyncQdrantClient
-from typing import Optional
-from transformers import AutoModel, AutoTokenizer
-from fastembed import SparseTextEmbedding
-from src.tools.utils.embeddings import (
-    init_dense_model,
-    init_sparse_model,
-)
-from src.tools.web.pipeline import WebSearchPipeline
+import time
+import threading
+from typing import Callable, Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from qdrant_client import AsyncQdrantClient
+    from transformers import AutoModel, AutoTokenizer
+    from fastembed import SparseTextEmbedding
+    from src.tools.web.pipeline import WebSearchPipeline
 
 
 class ResourceManager:
+    """Lazily initialized registry for the heavy resources used by the tools.
+
+    Nothing is loaded at import time. Each resource is created on first access
+    (or by `warmup`) and the time spent loading it is recorded in `load_times`.
+    """
+
     _instance = None
 
     def __new__(cls):
@@ -20,55 +26,149 @@ class ResourceManager:
             cls._instance._sparse_model = None
             cls._instance._qdrant_client = None
             cls._instance._web_search_pipeline = None
+            cls._instance._device = None
+            cls._instance._qdrant_url = "http://localhost:6333"
+            cls._instance._load_times = {}
+            cls._instance._locks = {
+                "dense_model": threading.Lock(),
+                "sparse_model": threading.Lock(),
+                "qdrant_client": threading.Lock(),
+                "web_search_pipeline": threading.Lock(),
+            }
 
         return cls._instance
 
-    def initialize_models(self, device: str = "mps"):
-        """Initialize models if they haven't been initialized yet"""
-        if self._dense_model is None:
-            print("Initializing dense model...")
-            self._dense_model, self._tokenizer = init_dense_model(device=device)
+    def _load(self, name: str, attr: str, loader: Callable[[], None]):
+        """Run `loader` once for `name`, recording how long it took."""
+        if getattr(self, attr) is not None:
+            return
+        with self._locks[name]:
+            if getattr(self, attr) is not None:
+                return
+            print(f"Initializing {name}...")
+            start = time.perf_counter()
+            loader()
+            self._load_times[name] = time.perf_counter() - start
+            print(f"Initialized {name} in {self._load_times[name]:.2f}s")
+
+    def initialize_dense_model(self, device: str | None = None):
+        from src.tools.utils.embeddings import init_dense_model, resolve_device
+
+        if device is not None:
+            self._device = device
 
-        if self._sparse_model is None:
-            print("Initializing sparse model...")
+        def load_dense():
+            self._device = resolve_device(self._device)
+            self._dense_model, self._tokenizer = init_dense_model(device=self._device)
+
+        self._load("dense_model", "_dense_model", load_dense)
+
+    def initialize_sparse_model(self):
+        from src.tools.utils.embeddings import init_sparse_model
+
+        def load_sparse():
             self._sparse_model = init_sparse_model()
 
-    def initialize_client(self, url: str = "http://localhost:6333"):
-        if self._qdrant_client is None:
-            print("Initializing Qdrant client...")
-            self._qdrant_client = AsyncQdrantClient(url)
+        self._load("sparse_model", "_sparse_model", load_sparse)
+
+    def initialize_models(self, device: str | None = None):
+        """Initialize models if they haven't been initialized yet"""
+        self.initialize_dense_model(device=device)
+        self.initialize_sparse_model()
+
+    def initialize_client(self, url: str | None = None):
+        from qdrant_client import AsyncQdrantClient
+
+        if url is not None:
+            self._qdrant_url = url
+
+        def load_client():
+            self._qdrant_client = AsyncQdrantClient(self._qdrant_url)
+
+        self._load("qdrant_client", "_qdrant_client", load_client)
 
     def initialize_web_search_pipeline(self):
-        if self._web_search_pipeline is None:
-            print("Initializing web search pipeline...")
+        from src.tools.web.pipeline import WebSearchPipeline
+
+        def load_pipeline():
             self._web_search_pipeline = WebSearchPipeline()
 
+        self._load("web_search_pipeline", "_web_search_pipeline", load_pipeline)
+
+    def warmup(
+        self,
+        resources: Optional[List[str]] = None,
+        stop_event: Optional[threading.Event] = None,
+    ) -> Dict[str, float]:
+        """Eagerly load the given resources (all of them by default).
+
+        Safe to run in a background thread; concurrent first accesses wait for
+        the in-flight load instead of loading twice. Setting `stop_event` stops
+        the warmup before its next resource. Returns `load_times`.
+        """
+        resources = resources or [
+            "qdrant_client",
+            "web_search_pipeline",
+            "dense_model",
+            "sparse_model",
+        ]
+        for name in resources:
+            if stop_event is not None and stop_event.is_set():
+                print("Warmup stopped before loading all resources")
+                break
+            try:
+                if name == "dense_model":
+                    self.initialize_dense_model()
+                elif name == "sparse_model":
+                    self.initialize_sparse_model()
+                elif name == "qdrant_client":
+                    self.initialize_client()
+                elif name == "web_search_pipeline":
+                    self.initialize_web_search_pipeline()
+                else:
+                    raise ValueError(f"Unknown resource: {name}")
+            except Exception as e:
+                print(f"Error warming up {name}: {e}")
+
+        return self.load_times
+
+    @property
+    def device(self) -> Optional[str]:
+        return self._device
+
+    @property
+    def load_times(self) -> Dict[str, float]:
+        """Seconds spent loading each resource that has been initialized."""
+        return dict(self._load_times)
+
     @property
-    def dense_model(self) -> Optional[AutoModel]:
+    def dense_model(self) -> "AutoModel":
+        self.initialize_dense_model()
         return self._dense_model
 
     @property
-    def tokenizer(self) -> Optional[AutoTokenizer]:
+    def tokenizer(self) -> "AutoTokenizer":
+        self.initialize_dense_model()
         return self._tokenizer
 
     @property
-    def sparse_model(self) -> Optional[SparseTextEmbedding]:
+    def sparse_model(self) -> "SparseTextEmbedding":
+        self.initialize_sparse_model()
         return self._sparse_model
 
     @property
-    def qdrant_client(self) -> Optional[AsyncQdrantClient]:
+    def qdrant_client(self) -> "AsyncQdrantClient":
+        self.initialize_client()
         return self._qdrant_client
 
     @property
-    def web_search_pipeline(self) -> Optional[WebSearchPipeline]:
+    def web_search_pipeline(self) -> "WebSearchPipeline":
+        self.initialize_web_search_pipeline()
         return self._web_search_pipeline
 
 
-# Create a global instance
+# Create a global instance; resources are loaded on first use
 resource_manager = ResourceManager()
-resource_manager.initialize_models()
-resource_manager.initialize_client()
-resource_manager.initialize_web_search_pipeline()
 
 
 def get_resource_manager() -> ResourceManager:
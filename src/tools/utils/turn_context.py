@@ -0,0 +1,194 @@
+import asyncio
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Sequence, Tuple
+
+
+@dataclass
+class DedupeStats:
+    requests: int = 0
+    computed: int = 0
+    shared: int = 0
+
+
+class TurnRetrievalContext:
+    """Retrieval work shared by every subgraph within one chat turn.
+
+    The supervisor can start the harm, factor and suggestion subgraphs at once,
+    and their sub-queries and URLs often overlap. Each unit of work (a RAG
+    query, a web search, a scraped and embedded page, a query embedding) is
+    registered under a `kind` and key; the first caller computes it and every
+    other caller in the turn, concurrent or later, awaits the same future.
+
+    Failed or cancelled work is forgotten, so a later caller retries it. A
+    `None` result is handed to the callers already waiting but not kept.
+    """
+
+    def __init__(self, turn_id: str | None = None):
+        self.turn_id = turn_id
+        self._entries: Dict[str, Dict[Hashable, asyncio.Future]] = defaultdict(dict)
+        self._stats: Dict[str, DedupeStats] = defaultdict(DedupeStats)
+
+    def claim(
+        self, kind: str, keys: Sequence[Hashable]
+    ) -> Tuple[Dict[Hashable, asyncio.Future], Dict[Hashable, asyncio.Future]]:
+        """Split `keys` into futures this caller must resolve (or release) and
+        futures another caller is already computing."""
+        loop = asyncio.get_running_loop()
+        entries = self._entries[kind]
+        stats = self._stats[kind]
+        own, shared = {}, {}
+        for key in dict.fromkeys(keys):
+            stats.requests += 1
+            future = entries.get(key)
+            if future is None:
+                entries[key] = own[key] = loop.create_future()
+                stats.computed += 1
+            else:
+                shared[key] = future
+                stats.shared += 1
+        return own, shared
+
+    def resolve(self, kind: str, key: Hashable, value: Any):
+        future = self._entries[kind].get(key)
+        if future is None or future.done():
+            return
+        future.set_result(value)
+        if value is None:
+            del self._entries[kind][key]
+
+    def release(self, kind: str, keys: Sequence[Hashable], error: BaseException = None):
+        """Forget unresolved `keys`; their waiters get `error` (or are cancelled)."""
+        entries = self._entries[kind]
+        for key in keys:
+            future = entries.get(key)
+            if future is None or future.done():
+                continue
+            del entries[key]
+            if error is None:
+                future.cancel()
+            else:
+                future.set_exception(error)
+                # Waiters get the error; nobody else needs to retrieve it
+                future.exception()
+
+    @staticmethod
+    async def wait(shared: Dict[Hashable, asyncio.Future]) -> Dict[Hashable, Any]:
+        """Results of futures computed elsewhere, skipping failed, cancelled
+        and `None` ones. Cancelling the caller leaves the futures running."""
+        if not shared:
+            return {}
+        await asyncio.wait([asyncio.shield(f) for f in shared.values()])
+        return {
+            key: future.result()
+            for key, future in shared.items()
+            if not future.cancelled()
+            and future.exception() is None
+            and future.result() is not None
+        }
+
+    async def get_or_compute_many(
+        self,
+        kind: str,
+        keys: Sequence[Hashable],
+        compute: Callable[[List[Hashable]], Awaitable[Sequence[Any]]],
+    ) -> List[Any]:
+        """One value per key, calling `compute` once for the keys nobody in
+        this turn has computed yet (it must return values in the same order)."""
+        own, shared = self.claim(kind, keys)
+        if own:
+            try:
+                values = await compute(list(own))
+            except asyncio.CancelledError:
+                self.release(kind, list(own))
+                raise
+            except BaseException as e:
+                self.release(kind, list(own), error=e)
+                raise
+            for key, value in zip(own, values):
+                self.resolve(kind, key, value)
+
+        results = {key: future.result() for key, future in own.items()}
+        for key, future in shared.items():
+            try:
+                # shield: one waiter being cancelled must not cancel the others
+                results[key] = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The computing caller was cancelled, not us: compute ourselves
+                results[key] = (await self.get_or_compute_many(kind, [key], compute))[0]
+        return [results[key] for key in keys]
+
+    async def get_or_compute(
+        self, kind: str, key: Hashable, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        async def compute_one(_keys):
+            return [await compute()]
+
+        return (await self.get_or_compute_many(kind, [key], compute_one))[0]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {kind: asdict(stats) for kind, stats in self._stats.items()}
+
+
+_current_turn_context: ContextVar[TurnRetrievalContext | None] = ContextVar(
+    "turn_retrieval_context", default=None
+)
+
+# Totals over all finished turns, plus the last one, for the metrics endpoint
+_turn_dedupe_totals: Dict[str, DedupeStats] = defaultdict(DedupeStats)
+_last_turn_dedupe: Dict[str, Any] = {}
+
+
+def get_turn_context() -> TurnRetrievalContext | None:
+    """The context of the turn being processed, or None outside of a turn
+    (e.g. scripts and benchmarks), in which case nothing is shared."""
+    return _current_turn_context.get()
+
+
+def _record_turn(context: TurnRetrievalContext):
+    global _last_turn_dedupe
+    stats = context.stats()
+    for kind, values in stats.items():
+        totals = _turn_dedupe_totals[kind]
+        totals.requests += values["requests"]
+        totals.computed += values["computed"]
+        totals.shared += values["shared"]
+    _last_turn_dedupe = {"turn_id": context.turn_id, "stats": stats}
+    if stats:
+        summary = ", ".join(
+            f"{kind} {values['shared']}/{values['requests']}"
+            for kind, values in stats.items()
+        )
+        print(f"Turn {context.turn_id} shared retrieval work: {summary}")
+
+
+@contextmanager
+def turn_retrieval_context(turn_id: str | None = None):
+    """Make a fresh `TurnRetrievalContext` current for the enclosed turn.
+
+    Graph nodes run in tasks that copy the current context, so every subgraph
+    started within the block sees the same object.
+    """
+    context = TurnRetrievalContext(turn_id)
+    token = _current_turn_context.set(context)
+    try:
+        yield context
+    finally:
+        try:
+            _current_turn_context.reset(token)
+        except ValueError:
+            # Closed from another context (e.g. an abandoned streaming
+            # response finalized by the event loop); that context is discarded
+            pass
+        _record_turn(context)
+
+
+def get_turn_dedupe_stats() -> Dict[str, Any]:
+    return {
+        "totals": {kind: asdict(stats) for kind, stats in _turn_dedupe_totals.items()},
+        "last_turn": _last_turn_dedupe,
+    }
@@ -1,17 +1,33 @@
+import os
 import asyncio
+import numpy as np
 from typing import List, Tuple, Dict
+from src.tools.utils.turn_context import get_turn_context
 from src.tools.web.search import SearXNGSearch, URLRanker
+from src.tools.web.search.cache import search_cache_key
 from src.tools.web.scraper import WebScraper, SemanticSnippetSelector
-from src.tools.utils.embeddings.api import get_api_query_embeddings
+from src.tools.utils.embeddings.backend import EmbeddingBackend, get_embedding_backend
 from src.tools.web.search.models import BoostedSearXNGSearchResult
 
 
 class WebSearchPipeline:
-    def __init__(self):
+    def __init__(
+        self,
+        embedding_backend: EmbeddingBackend | None = None,
+        scrape_deadline: float | None = None,
+    ):
+        self.embedding_backend = embedding_backend or get_embedding_backend()
+        self.scrape_deadline = (
+            scrape_deadline
+            if scrape_deadline is not None
+            else float(os.getenv("WEB_SCRAPE_DEADLINE", 20))
+        )
         self.searcher = SearXNGSearch()
         self.ranker = URLRanker()
         self.scraper = WebScraper()
-        self.snippet_selector = SemanticSnippetSelector()
+        self.snippet_selector = SemanticSnippetSelector(
+            embedding_backend=self.embedding_backend
+        )
 
     async def gather_top_ranked_urls_for_query(
         self,
@@ -20,7 +36,36 @@ class WebSearchPipeline:
         max_results: int = 3,
         ranking_options: dict = None,
     ) -> List[BoostedSearXNGSearchResult]:
-        """Search and rank URLs for a single query, returning the top URLs and their metadata."""
+        """Search and rank URLs for a single query, returning the top URLs and their metadata.
+        Within a chat turn, each distinct search is run and ranked once."""
+        turn = get_turn_context()
+        if turn is None:
+            return await self._gather_top_ranked_urls_for_query(
+                query, max_urls, max_results, ranking_options
+            )
+        key = search_cache_key(
+            query,
+            {
+                "max_urls": max_urls,
+                "max_results": max_results,
+                "ranking_options": ranking_options,
+            },
+        )
+        return await turn.get_or_compute(
+            "search",
+            key,
+            lambda: self._gather_top_ranked_urls_for_query(
+                query, max_urls, max_results, ranking_options
+            ),
+        )
+
+    async def _gather_top_ranked_urls_for_query(
+        self,
+        query: str,
+        max_urls: int,
+        max_results: int,
+        ranking_options: dict | None,
+    ) -> List[BoostedSearXNGSearchResult]:
         default_options = {
             "freq_factor": 0.5,
             "hostname_boost_factor": 0.5,
@@ -79,6 +124,17 @@ class WebSearchPipeline:
                     )
         return unique_url_summaries, per_query_top_results
 
+    @staticmethod
+    def _unique_urls(
+        per_query_top_results: List[List[BoostedSearXNGSearchResult]],
+    ) -> List[str]:
+        unique_urls = []
+        for result_list in per_query_top_results:
+            for result in result_list:
+                if result.url not in unique_urls:
+                    unique_urls.append(result.url)
+        return unique_urls
+
     async def scrape_unique_urls(
         self,
         per_query_top_results: List[List[BoostedSearXNGSearchResult]],
@@ -87,11 +143,7 @@ class WebSearchPipeline:
         Scrape all unique URLs from the top results of all queries in parallel.
         Returns a dict mapping url -> scraped content.
         """
-        unique_urls = []
-        for result_list in per_query_top_results:
-            for result in result_list:
-                if result.url not in unique_urls:
-                    unique_urls.append(result.url)
+        unique_urls = self._unique_urls(per_query_top_results)
         url_to_content = await self.scraper.parallel_crawl_urls(unique_urls)
 
         return url_to_content
@@ -103,8 +155,23 @@ class WebSearchPipeline:
         """
         Get embeddings for all queries in parallel.
         Returns a list of embeddings, one per query (same order as queries).
+        Within a chat turn, each query is embedded once.
         """
-        return await get_api_query_embeddings(queries)
+        turn = get_turn_context()
+        if turn is None:
+            return await self.embedding_backend.embed_queries(queries)
+
+        async def compute(keys):
+            return list(
+                await self.embedding_backend.embed_queries([q for _, q in keys])
+            )
+
+        model_id = self.embedding_backend.model_id
+        return np.stack(
+            await turn.get_or_compute_many(
+                "query_embedding", [(model_id, query) for query in queries], compute
+            )
+        )
 
     async def extract_relevant_snippets_for_query(
         self,
@@ -164,16 +231,88 @@ class WebSearchPipeline:
         query_embeddings: None,
     ):
         """
-        For each query and its top ranked results, extract relevant snippets using pre-scraped content and precomputed query embeddings if provided.
+        For each query and its top ranked results, extract relevant snippets using pre-scraped content and precomputed query embeddings.
+        Each unique page is embedded once and scored against every query together.
         Returns a list of lists of snippets, one per query (same order as queries).
         """
-        snippet_tasks = [
-            self.extract_relevant_snippets_for_query(
-                query, top_results, url_to_content, query_embedding
-            )
-            for query, top_results, query_embedding in zip(
-                queries, per_query_top_results, query_embeddings
+        if query_embeddings is None:
+            query_embeddings = await self.get_query_embeddings_for_queries(queries)
+
+        pages_per_query = [
+            [(result.url, result.title, result.content) for result in top_results]
+            for top_results in per_query_top_results
+        ]
+        return await self.snippet_selector.select_snippets_for_queries(
+            query_embeddings, pages_per_query, url_to_content
+        )
+
+    async def scrape_and_extract_snippets_for_queries(
+        self,
+        queries: List[str],
+        per_query_top_results: List[List[BoostedSearXNGSearchResult]],
+        deadline: float | None = None,
+    ):
+        """
+        Scrape all unique URLs as a stream and start chunking/embedding each page as soon as it arrives,
+        while the query embeddings are computed. Pages not scraped within `deadline` seconds
+        (default: the pipeline's scrape_deadline) are dropped. Within a chat turn, pages another
+        call is already scraping are awaited rather than scraped and embedded again.
+        Returns a list of lists of snippets, one per query (same order as queries).
+        """
+        deadline = self.scrape_deadline if deadline is None else deadline
+        unique_urls = self._unique_urls(per_query_top_results)
+
+        turn = get_turn_context()
+        if turn is not None:
+            own_pages, shared_pages = turn.claim("page", unique_urls)
+            to_scrape = list(own_pages)
+        else:
+            own_pages, shared_pages, to_scrape = {}, {}, unique_urls
+
+        query_embedding_task = asyncio.create_task(
+            self.get_query_embeddings_for_queries(queries)
+        )
+        page_tasks: Dict[str, asyncio.Task] = {}
+        try:
+            async for url, content in self.scraper.stream_crawl_urls(
+                to_scrape, deadline=deadline
+            ):
+                if content.strip() and url not in page_tasks:
+                    page_tasks[url] = asyncio.create_task(
+                        self.snippet_selector.embed_page(content)
+                    )
+            query_embeddings = await query_embedding_task
+            results = await asyncio.gather(
+                *page_tasks.values(), return_exceptions=True
             )
+        except BaseException:
+            query_embedding_task.cancel()
+            for task in page_tasks.values():
+                task.cancel()
+            if turn is not None:
+                turn.release("page", list(own_pages))
+            raise
+
+        embedded_pages = {}
+        for url, result in zip(page_tasks, results):
+            if isinstance(result, Exception):
+                print(f"Error selecting snippets for URL {url}: {str(result)}")
+            else:
+                embedded_pages[url] = result
+
+        if turn is not None:
+            # Failed and dropped pages resolve to None, so a later call retries them
+            for url in own_pages:
+                turn.resolve("page", url, embedded_pages.get(url))
+            embedded_pages.update(await turn.wait(shared_pages))
+
+        if query_embeddings is None:
+            raise ValueError("Query embeddings cannot be empty")
+
+        pages_per_query = [
+            [(result.url, result.title, result.content) for result in top_results]
+            for top_results in per_query_top_results
         ]
-        all_snippets = await asyncio.gather(*snippet_tasks)
-        return all_snippets
+        return self.snippet_selector.score_pages(
+            query_embeddings, pages_per_query, embedded_pages
+        )
@@ -0,0 +1,302 @@
+import os
+import time
+import sqlite3
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Dict, List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that never change page content
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "ref_src")
+
+
+def normalize_url(url: str) -> str:
+    """Cache key for a URL: lowercase scheme/host, no default port, fragment,
+    tracking parameters or trailing slash, and sorted query parameters."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not (
+        (scheme == "http" and parts.port == 80)
+        or (scheme == "https" and parts.port == 443)
+    ):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(
+        sorted(
+            (k, v)
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if not k.lower().startswith(TRACKING_PARAMS)
+        )
+    )
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+@dataclass
+class CachedPage:
+    url: str
+    content: str
+    fetched_at: float
+    expires_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+    @property
+    def can_revalidate(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+class PageCache:
+    """On-disk (SQLite) cache of scraped `fit_markdown`, keyed by normalized URL.
+
+    Entries are fresh for `ttl_seconds`. Expired entries that came with an ETag
+    or Last-Modified header are kept so they can be revalidated with a cheap
+    conditional GET instead of a browser crawl. The total stored content is kept
+    under `max_bytes` by evicting the least recently used pages.
+    """
+
+    def __init__(
+        self,
+        path: str = ".cache/web_pages.sqlite3",
+        ttl_seconds: float = 86400,
+        max_bytes: int = 512 * 1024 * 1024,
+        revalidate_timeout: float = 5.0,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.revalidate_timeout = revalidate_timeout
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _get_many(self, urls: List[str]) -> Dict[str, CachedPage]:
+        keys: Dict[str, List[str]] = {}
+        for url in urls:
+            keys.setdefault(normalize_url(url), []).append(url)
+        now = time.time()
+        found: Dict[str, CachedPage] = {}
+        with self._lock:
+            conn = self._connect()
+            placeholders = ",".join("?" * len(keys))
+            rows = conn.execute(
+                "SELECT key, url, content, fetched_at, expires_at, etag, "
+                f"last_modified FROM pages WHERE key IN ({placeholders})",
+                list(keys),
+            ).fetchall()
+            for key, url, content, fetched_at, expires_at, etag, last_modified in rows:
+                page = CachedPage(
+                    url, content, fetched_at, expires_at, etag, last_modified
+                )
+                if not page.is_fresh and not page.can_revalidate:
+                    conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+                    continue
+                for requested_url in keys[key]:
+                    found[requested_url] = page
+            conn.executemany(
+                "UPDATE pages SET last_access = ? WHERE key = ?",
+                [(now, normalize_url(url)) for url in found],
+            )
+            conn.commit()
+        return found
+
+    def _set_many(self, pages: List[CachedPage]):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO pages (key, url, content, size, fetched_at, "
+                "expires_at, last_access, etag, last_modified) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        normalize_url(page.url),
+                        page.url,
+                        page.content,
+                        len(page.content.encode("utf-8")),
+                        page.fetched_at,
+                        page.expires_at,
+                        now,
+                        page.etag,
+                        page.last_modified,
+                    )
+                    for page in pages
+                ],
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute(
+            "SELECT key, size FROM pages ORDER BY last_access"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self.evictions += evicted
+
+    def _touch(self, urls: List[str]):
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "UPDATE pages SET expires_at = ? WHERE key = ?",
+                [(expires_at, normalize_url(url)) for url in urls],
+            )
+            conn.commit()
+
+    async def _revalidate(self, page: CachedPage) -> bool:
+        """Conditional GET; True if the server answers 304 Not Modified."""
+        from src.tools.utils.http import get_http_client
+
+        headers = {}
+        if page.etag:
+            headers["If-None-Match"] = page.etag
+        if page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+        try:
+            async with get_http_client("web").stream(
+                "GET",
+                page.url,
+                headers=headers,
+                follow_redirects=True,
+                timeout=self.revalidate_timeout,
+            ) as response:
+                return response.status_code == 304
+        except Exception as e:
+            print(f"Error revalidating {page.url}: {e}")
+            return False
+
+    async def get_many(self, urls: List[str]) -> Dict[str, str]:
+        """Cached content for each URL that is fresh or revalidates as unchanged."""
+        if not urls:
+            return {}
+        found = await asyncio.to_thread(self._get_many, urls)
+        stale = [url for url, page in found.items() if not page.is_fresh]
+        if stale:
+            unchanged = await asyncio.gather(
+                *(self._revalidate(found[url]) for url in stale)
+            )
+            revalidated = [url for url, ok in zip(stale, unchanged) if ok]
+            if revalidated:
+                await asyncio.to_thread(self._touch, revalidated)
+            self.revalidated += len(revalidated)
+            for url, ok in zip(stale, unchanged):
+                if not ok:
+                    del found[url]
+
+        self.hits += len(found)
+        self.misses += len(urls) - len(found)
+        return {url: page.content for url, page in found.items()}
+
+    async def set_many(
+        self, contents: Dict[str, str], headers: Dict[str, dict] | None = None
+    ):
+        """Store non-empty scraped content, keeping ETag/Last-Modified from
+        `headers` (url -> response headers) for later revalidation."""
+        headers = headers or {}
+        now = time.time()
+        pages = []
+        for url, content in contents.items():
+            if not content or not content.strip():
+                continue
+            response_headers = {
+                k.lower(): v for k, v in (headers.get(url) or {}).items()
+            }
+            pages.append(
+                CachedPage(
+                    url=url,
+                    content=content,
+                    fetched_at=now,
+                    expires_at=now + self.ttl_seconds,
+                    etag=response_headers.get("etag"),
+                    last_modified=response_headers.get("last-modified"),
+                )
+            )
+        if pages:
+            await asyncio.to_thread(self._set_many, pages)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()
+        return {
+            "pages": row[0],
+            "bytes": row[1],
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_page_cache: PageCache | None = None
+
+
+def get_page_cache() -> PageCache | None:
+    """Process-wide scraped-page cache, or None when WEB_PAGE_CACHE=false.
+
+    Configured by WEB_PAGE_CACHE_PATH, WEB_PAGE_CACHE_TTL (seconds) and
+    WEB_PAGE_CACHE_MAX_MB.
+    """
+    global _page_cache
+    if os.getenv("WEB_PAGE_CACHE", "true").lower() != "true":
+        return None
+    if _page_cache is None:
+        _page_cache = PageCache(
+            path=os.getenv("WEB_PAGE_CACHE_PATH", ".cache/web_pages.sqlite3"),
+            ttl_seconds=float(os.getenv("WEB_PAGE_CACHE_TTL", 86400)),
+            max_bytes=int(os.getenv("WEB_PAGE_CACHE_MAX_MB", 512)) * 1024 * 1024,
+        )
+    return _page_cache
@@ -45,6 +45,18 @@ class ScraperSettings(BaseSettings):
     # Dispatcher settings
     max_session_permit: int = 50
 
+    # Content normalization (once per scraped page)
+    content_max_tokens: int = 64000
+    content_dedupe_min_chars: int = 40
+    content_drop_boilerplate: bool = True
+
+    # Browser pool settings (0 browsers: launch one per crawl call)
+    crawler_pool_size: int = 2
+    crawler_max_pages: int = 200
+    crawler_health_check_interval: float = 60
+    # Concurrent crawls (e.g. one per subgraph) sharing one pooled browser
+    crawler_max_crawls_per_browser: int = 4
+
     @property
     def get_markdown_options(self) -> dict:
         return {
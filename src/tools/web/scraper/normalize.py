@@ -0,0 +1,152 @@
+import re
+from dataclasses import dataclass
+from typing import List
+from src.tools.utils.chunking import batch_lengths, jina_length_function
+
+# C0 control characters except \t, \n and \r, removed by one str.translate
+CONTROL_CHARS = dict.fromkeys(
+    [c for c in range(0x20) if chr(c) not in "\t\n\r"] + [0x7F], None
+)
+
+# Short lines that are site chrome rather than page content
+BOILERPLATE_PATTERN = re.compile(
+    r"^\W*("
+    r"skip to (main )?content|back to top|advertisement|"
+    r"(accept|manage|allow)( all)? cookies|(this site|we) uses? cookies.*|"
+    r"cookie (policy|settings)|"
+    r"share (on|this|via).*|(sign|log) ?(in|up)( now)?|subscribe( now| to our newsletter)?|"
+    r"(all rights reserved|copyright ©?).*|© .*|"
+    r"print this page|"
+    r"follow us( on .*)?|related (articles|posts)|read more|click here.*"
+    r")\W*$",
+    re.IGNORECASE,
+)
+BOILERPLATE_MAX_CHARS = 120
+
+_BLANK_LINES = re.compile(r"\n{3,}")
+_INNER_SPACES = re.compile(r"(?<=\S)[ \t]{2,}")
+
+
+def strip_control_chars(text: str) -> str:
+    return text.translate(CONTROL_CHARS)
+
+
+@dataclass
+class NormalizationStats:
+    pages: int = 0
+    chars_in: int = 0
+    chars_out: int = 0
+    boilerplate_lines: int = 0
+    duplicate_blocks: int = 0
+    truncated: int = 0
+
+
+class ContentNormalizer:
+    """Cleans scraped markdown once per page, before it is cached or chunked.
+
+    Strips control characters in a single `str.translate`, normalizes
+    whitespace, drops short boilerplate lines, removes repeated blocks (menus
+    and banners rendered more than once) and truncates at a block boundary once
+    the page exceeds `max_tokens` tokens.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 64000,
+        dedupe_min_chars: int = 40,
+        drop_boilerplate: bool = True,
+        length_function=jina_length_function,
+    ):
+        self.max_tokens = max_tokens
+        self.dedupe_min_chars = dedupe_min_chars
+        self.drop_boilerplate = drop_boilerplate
+        self.length_function = length_function
+        self.stats = NormalizationStats()
+
+    def _clean_lines(self, text: str) -> str:
+        lines = []
+        for line in text.split("\n"):
+            line = _INNER_SPACES.sub(" ", line.replace("\xa0", " ")).rstrip()
+            if (
+                self.drop_boilerplate
+                and line
+                and len(line) <= BOILERPLATE_MAX_CHARS
+                and BOILERPLATE_PATTERN.match(line)
+            ):
+                self.stats.boilerplate_lines += 1
+                continue
+            lines.append(line)
+        return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+    def _dedupe_blocks(self, blocks: List[str]) -> List[str]:
+        seen = set()
+        kept = []
+        for block in blocks:
+            # Headers are kept even when repeated: the chunker splits on them
+            if len(block) >= self.dedupe_min_chars and not block.startswith("#"):
+                key = " ".join(block.lower().split())
+                if key in seen:
+                    self.stats.duplicate_blocks += 1
+                    continue
+                seen.add(key)
+            kept.append(block)
+        return kept
+
+    def _cut(self, block: str, budget: int) -> str:
+        """Longest prefix of `block` within `budget` tokens, ending at a word
+        boundary when it has one."""
+        lo, hi = 0, len(block)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.length_function(block[:mid]) <= budget:
+                lo = mid
+            else:
+                hi = mid - 1
+        cut = block[:lo]
+        boundary = max(cut.rfind(" "), cut.rfind("\n"))
+        return cut[:boundary].rstrip() if boundary > 0 else cut
+
+    def _truncate(self, blocks: List[str]) -> List[str]:
+        # A token covers at least one character, so short pages need no counting
+        if self.max_tokens <= 0 or sum(map(len, blocks)) <= self.max_tokens:
+            return blocks
+        total = 0
+        for i, length in enumerate(batch_lengths(blocks, self.length_function)):
+            if total + length > self.max_tokens:
+                self.stats.truncated += 1
+                # Keep what fits of the overflowing block, so a page that is
+                # one huge block is cut rather than emptied
+                cut = self._cut(blocks[i], self.max_tokens - total)
+                return blocks[:i] + [cut] if cut else blocks[:i]
+            total += length
+        return blocks
+
+    def normalize(self, text: str) -> str:
+        self.stats.pages += 1
+        self.stats.chars_in += len(text)
+        text = strip_control_chars(text.replace("\r\n", "\n").replace("\r", "\n"))
+        text = self._clean_lines(text)
+        blocks = self._truncate(self._dedupe_blocks(text.split("\n\n")))
+        text = "\n\n".join(blocks)
+        self.stats.chars_out += len(text)
+        return text
+
+    __call__ = normalize
+
+
+_content_normalizer: ContentNormalizer | None = None
+
+
+def get_content_normalizer() -> ContentNormalizer:
+    """Process-wide normalizer configured by the scraper settings
+    (CONTENT_MAX_TOKENS, CONTENT_DEDUPE_MIN_CHARS, CONTENT_DROP_BOILERPLATE)."""
+    global _content_normalizer
+    if _content_normalizer is None:
+        from src.tools.web.scraper.config import settings
+
+        _content_normalizer = ContentNormalizer(
+            max_tokens=settings.content_max_tokens,
+            dedupe_min_chars=settings.content_dedupe_min_chars,
+            drop_boilerplate=settings.content_drop_boilerplate,
+        )
+    return _content_normalizer
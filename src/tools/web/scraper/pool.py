@@ -0,0 +1,265 @@
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+from crawl4ai import AsyncWebCrawler, BrowserConfig, CacheMode, CrawlerRunConfig
+from src.tools.web.scraper.config import browser_config, settings
+
+# Rendered without any network access, so it only checks the browser itself
+HEALTH_CHECK_URL = "raw:<html><body>ok</body></html>"
+
+
+@dataclass
+class PooledCrawler:
+    crawler: AsyncWebCrawler
+    started_at: float = field(default_factory=time.monotonic)
+    pages: int = 0
+    healthy: bool = True
+    # Crawls currently running on this browser
+    leases: int = 0
+    # Takes no new crawls; relaunched once its last crawl ends
+    retiring: bool = False
+
+
+@dataclass
+class ScrapeStats:
+    streams: int = 0
+    pages: int = 0
+    deadline_hits: int = 0
+    stragglers_dropped: int = 0
+
+
+class CrawlerPool:
+    """A fixed number of long-lived headless browsers shared by all requests.
+
+    `acquire()` lends the least busy browser. One browser runs up to
+    `max_crawls_per_browser` crawls at once (each `arun_many` opens its own
+    pages, bounded by the dispatcher), so concurrent subgraphs share browsers
+    instead of queueing behind each other; callers only wait when every
+    browser is at that limit. A browser is recycled, i.e. closed and
+    relaunched, after `max_pages` pages or when a crawl or the periodic health
+    check fails, so leaks in long-running Chromium processes don't accumulate.
+    Relaunches run in background tasks owned by the pool, not in the request
+    that released the browser; the other browsers keep serving meanwhile.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_pages: int = 200,
+        health_check_interval: float = 60.0,
+        max_crawls_per_browser: int = 4,
+        browser_config: BrowserConfig = browser_config,
+    ):
+        self.size = size
+        self.max_pages = max_pages
+        self.health_check_interval = health_check_interval
+        self.max_crawls_per_browser = max_crawls_per_browser
+        self.browser_config = browser_config
+        self._crawlers: List[PooledCrawler] | None = None
+        self._available: asyncio.Condition | None = None
+        self._health_task: asyncio.Task | None = None
+        self._recycle_tasks: Set[asyncio.Task] = set()
+        # Counted by every WebScraper crawling through this pool
+        self.scrape_stats = ScrapeStats()
+        self.recycled = 0
+        self.failed_health_checks = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    @property
+    def started(self) -> bool:
+        return self._crawlers is not None
+
+    async def _launch(self) -> PooledCrawler:
+        crawler = AsyncWebCrawler(config=self.browser_config)
+        await crawler.start()
+        return PooledCrawler(crawler)
+
+    async def _close(self, pooled: PooledCrawler):
+        try:
+            await pooled.crawler.close()
+        except Exception as e:
+            print(f"Error closing crawler: {e}")
+
+    async def _recycle(self, pooled: PooledCrawler) -> PooledCrawler:
+        await self._close(pooled)
+        self.recycled += 1
+        return await self._launch()
+
+    async def _recycle_safely(self, pooled: PooledCrawler) -> PooledCrawler | None:
+        try:
+            return await self._recycle(pooled)
+        except Exception as e:
+            print(f"Error relaunching crawler: {e}")
+            return None
+
+    async def start(self):
+        if self.started:
+            return
+        start = time.perf_counter()
+        crawlers = await asyncio.gather(
+            *(self._launch() for _ in range(self.size)), return_exceptions=True
+        )
+        errors = [c for c in crawlers if isinstance(c, BaseException)]
+        if errors:
+            # Don't leak the browsers that did launch; the pool stays unstarted
+            await asyncio.gather(
+                *(self._close(c) for c in crawlers if isinstance(c, PooledCrawler))
+            )
+            raise errors[0]
+        self._crawlers = list(crawlers)
+        self._available = asyncio.Condition()
+        if self.health_check_interval > 0:
+            self._health_task = asyncio.create_task(self._health_check_loop())
+        print(
+            f"Started crawler pool with {self.size} browsers in "
+            f"{time.perf_counter() - start:.2f}s"
+        )
+
+    async def close(self):
+        if not self.started:
+            return
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        crawlers, self._crawlers = self._crawlers, None
+        available = self._available
+        async with available:
+            # Waiting callers see the pool is gone and give up
+            available.notify_all()
+        # Relaunches in progress close their new browser once they see the
+        # pool is gone, and browsers still crawling when their last crawl ends
+        await asyncio.gather(*self._recycle_tasks, return_exceptions=True)
+        await asyncio.gather(
+            *(
+                self._close(pooled)
+                for pooled in crawlers
+                if not pooled.leases and not pooled.retiring
+            )
+        )
+
+    async def _is_healthy(self, pooled: PooledCrawler) -> bool:
+        try:
+            result = await asyncio.wait_for(
+                pooled.crawler.arun(
+                    url=HEALTH_CHECK_URL,
+                    config=CrawlerRunConfig(cache_mode=CacheMode.BYPASS),
+                ),
+                timeout=30,
+            )
+            return bool(result.success)
+        except Exception:
+            return False
+
+    async def _health_check_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            crawlers = self._crawlers
+            if crawlers is None:
+                return
+            for pooled in list(crawlers):
+                # Busy browsers prove themselves by crawling
+                if pooled.leases or pooled.retiring:
+                    continue
+                pooled.leases += 1
+                try:
+                    if not await self._is_healthy(pooled):
+                        self.failed_health_checks += 1
+                        print("Crawler failed health check, relaunching...")
+                        pooled.healthy = False
+                finally:
+                    await self._release(crawlers, pooled)
+
+    def _pick(self) -> PooledCrawler | None:
+        candidates = [
+            pooled
+            for pooled in self._crawlers
+            if not pooled.retiring and pooled.leases < self.max_crawls_per_browser
+        ]
+        return min(candidates, key=lambda pooled: pooled.leases, default=None)
+
+    async def _release(self, crawlers: List[PooledCrawler], pooled: PooledCrawler):
+        pooled.leases -= 1
+        if self._crawlers is not crawlers:
+            # The pool was closed while this browser was in use
+            if not pooled.leases:
+                await self._close(pooled)
+            return
+        if not pooled.healthy or pooled.pages >= self.max_pages:
+            pooled.retiring = True
+        if pooled.retiring and not pooled.leases:
+            task = asyncio.create_task(self._replace(crawlers, pooled))
+            self._recycle_tasks.add(task)
+            task.add_done_callback(self._recycle_tasks.discard)
+        async with self._available:
+            self._available.notify_all()
+
+    async def _replace(self, crawlers: List[PooledCrawler], pooled: PooledCrawler):
+        """Relaunch a retired browser and put the new one in its place."""
+        replacement = await self._recycle_safely(pooled)
+        if replacement is None:
+            # Keep the pool at full size; the next health check retries
+            pooled.healthy = True
+            pooled.retiring = False
+        elif self._crawlers is crawlers:
+            crawlers[crawlers.index(pooled)] = replacement
+        else:
+            await self._close(replacement)
+        async with self._available:
+            self._available.notify_all()
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Borrow a browser; mark `pooled.healthy = False` to have it recycled."""
+        if not self.started:
+            raise RuntimeError("Crawler pool is not started")
+        crawlers, available = self._crawlers, self._available
+        async with available:
+            pooled = self._pick()
+            if pooled is None:
+                self.waits += 1
+                wait_start = time.perf_counter()
+                while pooled is None:
+                    await available.wait()
+                    if self._crawlers is not crawlers:
+                        raise RuntimeError("Crawler pool was closed")
+                    pooled = self._pick()
+                self.wait_seconds += time.perf_counter() - wait_start
+            pooled.leases += 1
+        try:
+            yield pooled
+        finally:
+            await self._release(crawlers, pooled)
+
+    def stats(self) -> Dict[str, int]:
+        crawlers = self._crawlers or []
+        return {
+            "size": self.size,
+            "idle": sum(1 for pooled in crawlers if not pooled.leases),
+            "active_crawls": sum(pooled.leases for pooled in crawlers),
+            "recycled": self.recycled,
+            "recycling": len(self._recycle_tasks),
+            "failed_health_checks": self.failed_health_checks,
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+
+_crawler_pool: CrawlerPool | None = None
+
+
+def get_crawler_pool() -> CrawlerPool:
+    """Process-wide crawler pool, sized by the scraper settings
+    (CRAWLER_POOL_SIZE, CRAWLER_MAX_PAGES, CRAWLER_HEALTH_CHECK_INTERVAL,
+    CRAWLER_MAX_CRAWLS_PER_BROWSER)."""
+    global _crawler_pool
+    if _crawler_pool is None:
+        _crawler_pool = CrawlerPool(
+            size=settings.crawler_pool_size,
+            max_pages=settings.crawler_max_pages,
+            health_check_interval=settings.crawler_health_check_interval,
+            max_crawls_per_browser=settings.crawler_max_crawls_per_browser,
+        )
+    return _crawler_pool
@@ -1,6 +1,22 @@
-from typing import List
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from typing import AsyncIterator, Dict, List, Tuple
 from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, BrowserConfig
 from src.tools.web.scraper.config import browser_config, run_config, dispatcher
+from src.tools.web.scraper.cache import PageCache, get_page_cache
+from src.tools.web.scraper.pool import (
+    CrawlerPool,
+    PooledCrawler,
+    get_crawler_pool,
+)
+from src.tools.web.scraper.normalize import ContentNormalizer, get_content_normalizer
+
+
+def get_scrape_stats() -> Dict[str, int]:
+    """Scrape counters of the shared crawler pool's scrapers."""
+    return asdict(get_crawler_pool().scrape_stats)
 
 
 class WebScraper:
@@ -8,27 +24,166 @@ class WebScraper:
         self,
         run_config: CrawlerRunConfig = run_config,
         browser_config: BrowserConfig = browser_config,
+        page_cache: PageCache | None = None,
+        crawler_pool: CrawlerPool | None = None,
+        normalizer: ContentNormalizer | None = None,
     ):
         self.browser_config = browser_config
         self.run_config = run_config
+        self.page_cache = page_cache or get_page_cache()
+        self.crawler_pool = crawler_pool or get_crawler_pool()
+        self.normalizer = normalizer or get_content_normalizer()
+        self.stats = self.crawler_pool.scrape_stats
+
+    @asynccontextmanager
+    async def _crawler(self, num_urls: int):
+        """A pooled browser when the pool is running (the API server starts
+        it), otherwise a browser launched just for this call. Set
+        `healthy = False` on the yielded browser to have the pool recycle it."""
+        if self.crawler_pool.started:
+            async with self.crawler_pool.acquire() as pooled:
+                pooled.pages += num_urls
+                try:
+                    yield pooled
+                except Exception:
+                    pooled.healthy = False
+                    raise
+        else:
+            async with AsyncWebCrawler(config=self.browser_config) as crawler:
+                yield PooledCrawler(crawler)
+
+    async def _crawl(self, urls: List[str]):
+        async with self._crawler(len(urls)) as pooled:
+            return await pooled.crawler.arun_many(
+                urls=urls, config=self.run_config, dispatcher=dispatcher
+            )
+
+    async def _get_cached(self, urls: List[str]) -> Dict[str, str]:
+        if self.page_cache is None:
+            return {}
+        try:
+            cached = await self.page_cache.get_many(urls)
+        except Exception as e:
+            print(f"Error reading page cache: {e}")
+            return {}
+        print(f"Page cache: {len(cached)}/{len(urls)} URLs served from cache")
+        return cached
+
+    async def _normalize(self, results) -> Dict[str, str]:
+        """Normalized content per crawled URL (empty for failed crawls); runs
+        once per page, before caching, so cached pages are already clean."""
+
+        def normalize_all():
+            return {
+                result.url: (
+                    self.normalizer(result.markdown.fit_markdown or "")
+                    if result.success
+                    else ""
+                )
+                for result in results
+            }
+
+        return await asyncio.to_thread(normalize_all)
+
+    async def _set_cached(self, results, contents: Dict[str, str]):
+        if self.page_cache is None:
+            return
+        try:
+            await self.page_cache.set_many(
+                {
+                    result.url: contents[result.url]
+                    for result in results
+                    if result.success
+                },
+                headers={
+                    result.url: result.response_headers
+                    for result in results
+                    if result.success
+                },
+            )
+        except Exception as e:
+            print(f"Error writing page cache: {e}")
 
     async def parallel_crawl_urls(
         self,
         urls: List[str],
-    ):
+    ) -> Dict[str, str]:
+        url_to_content = await self._get_cached(urls)
+
+        to_crawl = [url for url in urls if url not in url_to_content]
+        if not to_crawl:
+            return url_to_content
+
         try:
-            async with AsyncWebCrawler(config=self.browser_config) as crawler:
-                results = await crawler.arun_many(
-                    urls=urls, config=self.run_config, dispatcher=dispatcher
-                )
+            results = await self._crawl(to_crawl)
 
-            url_to_content = {
-                result.url: result.markdown.fit_markdown if result.success else ""
-                for result in results
-            }
+            contents = await self._normalize(results)
+            url_to_content.update(contents)
+            await self._set_cached(results, contents)
 
             return url_to_content
 
         except Exception as e:
             print(f"Error crawling URLs: {e}")
-            return []
+            return url_to_content
+
+    async def stream_crawl_urls(
+        self,
+        urls: List[str],
+        deadline: float | None = None,
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Yield (url, content) as each page becomes available: cached pages first,
+        then crawled pages in completion order. Pages still loading `deadline`
+        seconds after the call are dropped. Failed pages yield empty content.
+        """
+        self.stats.streams += 1
+        expires_at = time.monotonic() + deadline if deadline else None
+        cached = await self._get_cached(urls)
+        for url, content in cached.items():
+            self.stats.pages += 1
+            yield url, content
+
+        to_crawl = [url for url in urls if url not in cached]
+        if not to_crawl:
+            return
+
+        pending = set(to_crawl)
+        try:
+            async with self._crawler(len(to_crawl)) as pooled:
+                results = await pooled.crawler.arun_many(
+                    urls=to_crawl,
+                    config=self.run_config.clone(stream=True),
+                    dispatcher=dispatcher,
+                )
+                try:
+                    while True:
+                        remaining = (
+                            expires_at - time.monotonic() if expires_at else None
+                        )
+                        if remaining is not None and remaining <= 0:
+                            raise TimeoutError
+                        try:
+                            # Bound each wait, not the consumer's work between pages
+                            result = await asyncio.wait_for(anext(results), remaining)
+                        except StopAsyncIteration:
+                            break
+                        pending.discard(result.url)
+                        self.stats.pages += 1
+                        contents = await self._normalize([result])
+                        await self._set_cached([result], contents)
+                        yield result.url, contents[result.url]
+                except TimeoutError:
+                    # Closing the stream does not cancel crawl4ai's in-flight
+                    # page tasks; recycling the browser ends them
+                    pooled.healthy = False
+                    self.stats.deadline_hits += 1
+                    self.stats.stragglers_dropped += len(pending)
+                    print(
+                        f"Scrape deadline of {deadline}s reached, dropping "
+                        f"{len(pending)} unfinished URLs: {sorted(pending)}"
+                    )
+                finally:
+                    await results.aclose()
+        except Exception as e:
+            print(f"Error crawling URLs: {e}")
@@ -1,11 +1,17 @@
 import asyncio
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from langchain_core.documents import Document
-from src.tools.utils.chunking import split_document_by_headers, jina_length_function
-from src.tools.utils.embeddings.api import (
-    get_api_passage_embeddings,
+from src.tools.utils.chunking import (
+    split_document_by_headers,
+    jina_length_function,
+    batch_lengths,
+)
+from src.tools.web.scraper.normalize import strip_control_chars
+from src.tools.utils.embeddings.backend import (
+    EmbeddingBackend,
+    get_embedding_backend,
 )
 
 
@@ -33,23 +39,43 @@ class WebPageSnippets:
     snippets: List[SelectedSnippet]
 
 
+@dataclass
+class EmbeddedPage:
+    chunks: List[Document]
+    embeddings: np.ndarray  # L2-normalized, one row per chunk
+    missing: np.ndarray  # chunks whose embedding batch failed
+
+
 class SemanticSnippetSelector:
-    def __init__(self, config: Optional[SnippetConfig] = None):
+    def __init__(
+        self,
+        config: Optional[SnippetConfig] = None,
+        embedding_backend: Optional[EmbeddingBackend] = None,
+    ):
         self.config = config or SnippetConfig()
+        self.embedding_backend = embedding_backend or get_embedding_backend()
 
     @staticmethod
-    def _cosine_similarity(vec_a: np.ndarray, vec_b: np.ndarray) -> np.array:
-        """Calculate cosine similarity between two vectors."""
-        dot_product = np.dot(vec_a, vec_b.T)
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """L2-normalize rows; all-zero rows (failed batches) stay zero."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
 
-        return dot_product
+    @staticmethod
+    def _cosine_similarity(vec_a: np.ndarray, vec_b: np.ndarray) -> np.array:
+        """Cosine similarity of every row of `vec_a` with every row of `vec_b`."""
+        return SemanticSnippetSelector._normalize(
+            vec_a
+        ) @ SemanticSnippetSelector._normalize(vec_b).T
 
     @staticmethod
     def _enrich_chunks(
         chunks: List[Document], length_function=jina_length_function
     ) -> List[Document]:
         headers = []
-        enriched_chunks = []
+        contents = []
+        unused_headers_list = []
         for i, chunk in enumerate(chunks):
             metadata = ""
             unused_headers = []
@@ -66,17 +92,27 @@ class SemanticSnippetSelector:
             else:
                 unused_headers = ""
 
-            enriched_chunks.append(
-                Document(
-                    page_content=chunk_content.strip(),
-                    metadata={
-                        "num_tokens": length_function(chunk_content.strip()),
-                        "unused_headers": unused_headers,
-                        "num_unused_tokens": length_function(unused_headers),
-                    },
-                )
+            contents.append(chunk_content.strip())
+            unused_headers_list.append(unused_headers)
+
+        # One batched tokenizer call for all chunks and their unused headers
+        lengths = batch_lengths(contents + unused_headers_list, length_function)
+        num_tokens = lengths[: len(contents)]
+        num_unused_tokens = lengths[len(contents) :]
+
+        return [
+            Document(
+                page_content=content,
+                metadata={
+                    "num_tokens": n_tokens,
+                    "unused_headers": unused_headers,
+                    "num_unused_tokens": n_unused_tokens,
+                },
             )
-        return enriched_chunks
+            for content, unused_headers, n_tokens, n_unused_tokens in zip(
+                contents, unused_headers_list, num_tokens, num_unused_tokens
+            )
+        ]
 
     def _create_chunks(
         self, context: str, chunk_size: int = 512, chunk_overlap: int = 0
@@ -124,31 +160,29 @@ class SemanticSnippetSelector:
         window_size: int = 1,
         top_k: int = 3,
     ) -> List[tuple[int, int]]:
-        sorted_indexes = np.argsort(similarities)[::-1]
-
-        length = len(sorted_indexes)
-        top_k_sorted_indexes = sorted_indexes[:top_k]
-        selected_chunks = set()
-        for center_idx in top_k_sorted_indexes:
-            start_idx = max(0, center_idx - window_size)
-            end_idx = min(center_idx + window_size + 1, length)
-            selected_chunks.update(range(start_idx, end_idx))
-
-        selected_chunks = sorted(list(selected_chunks))
-        windows = []
-
-        start = selected_chunks[0]
-        prev = start
-
-        for curr in selected_chunks[1:]:
-            if curr != prev + 1:
-                windows.append((start, prev + 1))
-                start = curr
-            prev = curr
-
-        windows.append((start, prev + 1))
-
-        return windows
+        """Merged [start, end) windows of `window_size` chunks around each of
+        the `top_k` most similar chunks."""
+        length = len(similarities)
+        k = min(top_k, length)
+        if k <= 0:
+            return []
+        if k < length:
+            top = np.argpartition(-similarities, k - 1)[:k]
+        else:
+            top = np.arange(length)
+        # Chunks without an embedding are scored -inf and never selected
+        top = top[np.isfinite(similarities[top])]
+        if top.size == 0:
+            return []
+
+        starts = np.sort(np.maximum(top - window_size, 0))
+        ends = np.minimum(np.sort(top) + window_size + 1, length)
+        # Windows have equal width, so sorting starts also sorts ends; a new
+        # window begins wherever there is a gap after everything before it
+        breaks = np.flatnonzero(starts[1:] > ends[:-1]) + 1
+        window_starts = starts[np.concatenate(([0], breaks))]
+        window_ends = ends[np.concatenate((breaks - 1, [len(ends) - 1]))]
+        return list(zip(window_starts.tolist(), window_ends.tolist()))
 
     def _get_combined_content(self, snippets: List[SelectedSnippet]) -> str:
         return "\n\n".join(
@@ -167,7 +201,11 @@ class SemanticSnippetSelector:
 
     @staticmethod
     def _validate_content(context: str) -> str:
-        """Validate and clean content before processing."""
+        """Validate and clean content before processing.
+
+        Scraped pages are already normalized by the scraper; this only guards
+        content from other sources, in a single pass.
+        """
         if not context or not context.strip():
             raise ValueError("Context is empty or contains only whitespace")
 
@@ -178,45 +216,125 @@ class SemanticSnippetSelector:
             )
             context = context[:1000000]
 
-        # Check for problematic characters
-        problematic_chars = [
-            "\x00",
-            "\x01",
-            "\x02",
-            "\x03",
-            "\x04",
-            "\x05",
-            "\x06",
-            "\x07",
-            "\x08",
-            "\x0b",
-            "\x0c",
-            "\x0e",
-            "\x0f",
-            "\x10",
-            "\x11",
-            "\x12",
-            "\x13",
-            "\x14",
-            "\x15",
-            "\x16",
-            "\x17",
-            "\x18",
-            "\x19",
-            "\x1a",
-            "\x1b",
-            "\x1c",
-            "\x1d",
-            "\x1e",
-            "\x1f",
+        return strip_control_chars(context)
+
+    def _resolve_config(self, options: Optional[Dict] = None) -> SnippetConfig:
+        if options:
+            return SnippetConfig(**{**self.config.__dict__, **options})
+        return self.config
+
+    async def embed_page(
+        self, context: str, config: Optional[SnippetConfig] = None
+    ) -> EmbeddedPage:
+        """Chunk a page and embed every chunk once, independent of any query."""
+        if not context.strip():
+            raise ValueError("Context cannot be empty")
+
+        config = config or self.config
+        # Validate and clean content
+        context = self._validate_content(context)
+
+        # Create and process chunks
+        chunks = self._create_chunks(context, config.chunk_size, config.chunk_overlap)
+
+        if not chunks:
+            raise ValueError("No chunks created from context")
+
+        print(f"Created {len(chunks)} chunks from context (length: {len(context)})")
+
+        enriched_chunks = self._enrich_chunks(chunks)
+        chunk_batches = self._create_batches(enriched_chunks, config.max_tokens)
+
+        if not chunk_batches:
+            raise ValueError("No chunk batches created")
+
+        print(f"Created {len(chunk_batches)} batches for embedding")
+
+        # Get embeddings for all chunks - create and start tasks immediately
+        embedding_tasks = [
+            asyncio.create_task(self.embedding_backend.embed_passages(batch))
+            for batch in chunk_batches
+        ]
+
+        # Await all embedding tasks
+        batch_embeddings_list = await asyncio.gather(
+            *embedding_tasks, return_exceptions=True
+        )
+
+        # A failed batch only loses its own chunks; the page still yields
+        # snippets from the batches that were embedded
+        failed_batches = []
+        for i, result in enumerate(batch_embeddings_list):
+            if isinstance(result, Exception):
+                error_details = str(result)
+                if not error_details.strip():
+                    error_details = f"Unknown error in embedding task {i}"
+                print(f"Batch {i} failed: {error_details}")
+                failed_batches.append(i)
+
+        if len(failed_batches) == len(chunk_batches):
+            raise Exception(
+                f"All {len(chunk_batches)} embedding batches failed for this page"
+            )
+
+        embedding_dim = next(
+            result.shape[1]
+            for result in batch_embeddings_list
+            if not isinstance(result, Exception)
+        )
+        batch_embeddings_list = [
+            np.zeros((len(batch), embedding_dim))
+            if isinstance(result, Exception)
+            else result
+            for batch, result in zip(chunk_batches, batch_embeddings_list)
         ]
 
-        for char in problematic_chars:
-            if char in context:
-                print(f"Warning: Found problematic character in content, removing...")
-                context = context.replace(char, "")
+        # Efficiently combine all embeddings at once
+        all_chunk_embeddings = np.vstack(batch_embeddings_list)
+
+        if all_chunk_embeddings.size == 0:
+            raise ValueError("No embeddings generated")
+
+        print(
+            f"Successfully generated embeddings with shape: {all_chunk_embeddings.shape}"
+        )
+
+        missing = np.zeros(len(enriched_chunks), dtype=bool)
+        offset = 0
+        for i, batch in enumerate(chunk_batches):
+            if i in failed_batches:
+                missing[offset : offset + len(batch)] = True
+            offset += len(batch)
+
+        return EmbeddedPage(
+            chunks=enriched_chunks,
+            embeddings=self._normalize(all_chunk_embeddings),
+            missing=missing,
+        )
 
-        return context
+    def _select_from_similarities(
+        self, page: EmbeddedPage, similarities: np.ndarray, config: SnippetConfig
+    ) -> List[SelectedSnippet]:
+        similarities = similarities.astype(float)
+        # Never pick chunks whose embeddings are missing
+        similarities[page.missing] = -np.inf
+
+        windows = self._get_windowed_indexes(
+            similarities, window_size=config.window_size, top_k=config.top_k
+        )
+
+        snippets = []
+        for window in windows:
+            snippet = SelectedSnippet(
+                content="\n".join(
+                    [chunk.page_content for chunk in page.chunks[window[0] : window[1]]]
+                ),
+                start_index=window[0],
+                end_index=window[1],
+            )
+            snippets.append(snippet)
+
+        return snippets
 
     async def select_snippets(
         self,
@@ -248,103 +366,131 @@ class SemanticSnippetSelector:
         if query_embedding is None or query_embedding.size == 0:
             raise ValueError("Query embedding cannot be empty")
 
-        # Validate and clean content
-        context = self._validate_content(context)
-
-        # Apply any option overrides
-        if options:
-            config = SnippetConfig(**{**self.config.__dict__, **options})
-        else:
-            config = self.config
+        config = self._resolve_config(options)
 
         try:
-            # Create and process chunks
-            chunks = self._create_chunks(
-                context, config.chunk_size, config.chunk_overlap
-            )
+            page = await self.embed_page(context, config)
 
-            if not chunks:
-                raise ValueError("No chunks created from context")
+            # Calculate similarities
+            # Page embeddings are normalized once in embed_page
+            similarities = self._normalize(query_embedding) @ page.embeddings.T
+            snippets = self._select_from_similarities(page, similarities, config)
 
-            print(f"Created {len(chunks)} chunks from context (length: {len(context)})")
+            print(f"Created {len(snippets)} snippets")
 
-            enriched_chunks = self._enrich_chunks(chunks)
-            chunk_batches = self._create_batches(enriched_chunks, config.max_tokens)
+            web_page_snippets = WebPageSnippets(
+                url=url, title=title, description=description, snippets=snippets
+            )
 
-            if not chunk_batches:
-                raise ValueError("No chunk batches created")
+            return web_page_snippets
 
-            print(f"Created {len(chunk_batches)} batches for embedding")
+        except Exception as e:
+            error_msg = f"Error selecting snippets for URL {url}: {str(e)}"
+            print(error_msg)
+            raise Exception(error_msg)
 
-            # Get embeddings for all chunks - create and start tasks immediately
-            embedding_tasks = [
-                asyncio.create_task(get_api_passage_embeddings(batch))
-                for batch in chunk_batches
-            ]
+    async def select_snippets_for_queries(
+        self,
+        query_embeddings: np.ndarray,
+        pages_per_query: List[List[Tuple[str, str, str]]],
+        url_to_content: Dict[str, str],
+        options: Optional[Dict] = None,
+    ) -> List[List[WebPageSnippets]]:
+        """
+        Select snippets for several queries over a shared set of pages.
 
-            # Await all embedding tasks
-            batch_embeddings_list = await asyncio.gather(
-                *embedding_tasks, return_exceptions=True
-            )
+        Every unique URL is chunked and embedded exactly once, however many
+        queries picked it; then all queries are scored against all chunks in a
+        single matrix multiply.
 
-            # Check for exceptions in embedding tasks
-            for i, result in enumerate(batch_embeddings_list):
-                if isinstance(result, Exception):
-                    error_details = str(result)
-                    if not error_details.strip():
-                        error_details = f"Unknown error in embedding task {i}"
-                    print(f"Batch {i} failed: {error_details}")
-                    print(
-                        f"Batch {i} content preview: {chunk_batches[i][:100] if chunk_batches[i] else 'Empty batch'}..."
-                    )
-                    raise Exception(f"Embedding task {i} failed: {error_details}")
+        Args:
+            query_embeddings: One row per query
+            pages_per_query: For each query, its (url, title, description) list
+            url_to_content: Scraped content per URL
+            options: Optional configuration overrides
 
-            # Efficiently combine all embeddings at once
-            all_chunk_embeddings = (
-                np.vstack(batch_embeddings_list)
-                if batch_embeddings_list
-                else np.empty((0, 1024))
-            )
+        Returns:
+            For each query, WebPageSnippets for its pages that have content
+        """
+        if query_embeddings is None or len(query_embeddings) == 0:
+            raise ValueError("Query embeddings cannot be empty")
 
-            if all_chunk_embeddings.size == 0:
-                raise ValueError("No embeddings generated")
+        config = self._resolve_config(options)
 
-            print(
-                f"Successfully generated embeddings with shape: {all_chunk_embeddings.shape}"
-            )
-
-            # Calculate similarities
-            similarities = self._cosine_similarity(
-                query_embedding, all_chunk_embeddings
+        unique_urls = list(
+            dict.fromkeys(
+                url
+                for pages in pages_per_query
+                for url, _, _ in pages
+                if url_to_content.get(url, "").strip()
             )
+        )
+        results = await asyncio.gather(
+            *(self.embed_page(url_to_content[url], config) for url in unique_urls),
+            return_exceptions=True,
+        )
 
-            windows = self._get_windowed_indexes(
-                similarities, window_size=config.window_size, top_k=config.top_k
-            )
+        embedded_pages: Dict[str, EmbeddedPage] = {}
+        for url, result in zip(unique_urls, results):
+            if isinstance(result, Exception):
+                print(f"Error selecting snippets for URL {url}: {str(result)}")
+            else:
+                embedded_pages[url] = result
 
-            snippets = []
-            for window in windows:
-                snippet = SelectedSnippet(
-                    content="\n".join(
-                        [
-                            chunk.page_content
-                            for chunk in enriched_chunks[window[0] : window[1]]
-                        ]
-                    ),
-                    start_index=window[0],
-                    end_index=window[1],
-                )
-                snippets.append(snippet)
+        return self.score_pages(
+            query_embeddings, pages_per_query, embedded_pages, config
+        )
 
-            print(f"Created {len(snippets)} snippets")
+    def score_pages(
+        self,
+        query_embeddings: np.ndarray,
+        pages_per_query: List[List[Tuple[str, str, str]]],
+        embedded_pages: Dict[str, EmbeddedPage],
+        config: Optional[SnippetConfig] = None,
+    ) -> List[List[WebPageSnippets]]:
+        """
+        Score all queries against all embedded pages in one matrix multiply.
+        Pages missing from `embedded_pages` are left out of the results.
+        """
+        config = config or self.config
+        if not embedded_pages:
+            return [[] for _ in pages_per_query]
+
+        offsets: Dict[str, int] = {}
+        offset = 0
+        for url, page in embedded_pages.items():
+            offsets[url] = offset
+            offset += len(page.chunks)
+
+        all_chunk_embeddings = np.vstack(
+            [page.embeddings for page in embedded_pages.values()]
+        )
+        # (num_queries, total_chunks) in one multiply
+        similarities = self._normalize(query_embeddings) @ all_chunk_embeddings.T
 
-            web_page_snippets = WebPageSnippets(
-                url=url, title=title, description=description, snippets=snippets
-            )
+        print(
+            f"Scored {similarities.shape[0]} queries against {similarities.shape[1]} "
+            f"chunks from {len(embedded_pages)} pages"
+        )
 
-            return web_page_snippets
+        all_snippets = []
+        for query_idx, pages in enumerate(pages_per_query):
+            query_snippets = []
+            for url, title, description in pages:
+                page = embedded_pages.get(url)
+                if page is None:
+                    continue
+                start = offsets[url]
+                snippets = self._select_from_similarities(
+                    page,
+                    similarities[query_idx, start : start + len(page.chunks)],
+                    config,
+                )
+                query_snippets.append(
+                    WebPageSnippets(
+                        url=url, title=title, description=description, snippets=snippets
+                    )
+                )
+            all_snippets.append(query_snippets)
 
-        except Exception as e:
-            error_msg = f"Error selecting snippets for URL {url}: {str(e)}"
-            print(error_msg)
-            raise Exception(error_msg)
+        return all_snippets
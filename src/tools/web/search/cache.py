@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+SearchResults = List[dict]
+
+
+@dataclass
+class FetchedResults:
+    results: SearchResults
+    # False when SearXNG answered but some engines were unresponsive or nothing
+    # came back, which is often a transient upstream problem
+    complete: bool = True
+
+
+def search_cache_key(
+    query: str,
+    params: Optional[dict] = None,
+    include_domains: Optional[List[str]] = None,
+    exclude_domains: Optional[List[str]] = None,
+) -> str:
+    """Stable key for one search: normalized query, params and domain filters."""
+    return json.dumps(
+        [
+            " ".join(query.lower().split()),
+            sorted((params or {}).items()),
+            sorted(include_domains or []),
+            sorted(exclude_domains or []),
+        ],
+        default=str,
+    )
+
+
+class SearchResultCache:
+    """LRU + TTL cache of SearXNG results that also coalesces duplicate
+    in-flight searches.
+
+    Concurrent callers with the same key (e.g. the harm, factor and suggestion
+    subgraphs issuing the same sub-query) await one shared upstream request.
+    An optional async Redis client is used as a shared second level, as in
+    `QueryEmbeddingCache`. Failed searches are never cached, and incomplete
+    ones only for `negative_ttl_seconds` (0 disables that).
+    """
+
+    def __init__(
+        self,
+        max_size: int = 2048,
+        ttl_seconds: float = 1800,
+        negative_ttl_seconds: float = 30,
+        redis_client=None,
+        redis_prefix: str = "searxng:",
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.redis_client = redis_client
+        self.redis_prefix = redis_prefix
+        self._entries: OrderedDict[str, Tuple[float, SearchResults]] = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+        self.coalesced = 0
+        self.incomplete = 0
+
+    def _get_local(self, key: str) -> Optional[SearchResults]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: SearchResults, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def _get_redis(self, key: str) -> Optional[FetchedResults]:
+        if self.redis_client is None:
+            return None
+        try:
+            raw = await self.redis_client.get(self.redis_prefix + key)
+        except Exception as e:
+            print(f"Error reading search results from Redis: {e}")
+            return None
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        if isinstance(data, list):
+            # Entry written before completeness was recorded
+            return FetchedResults(data)
+        return FetchedResults(data["results"], complete=data["complete"])
+
+    async def _set_redis(self, key: str, fetched: FetchedResults, ttl: float):
+        if self.redis_client is None:
+            return
+        try:
+            await self.redis_client.set(
+                self.redis_prefix + key,
+                json.dumps({"results": fetched.results, "complete": fetched.complete}),
+                ex=max(int(ttl), 1),
+            )
+        except Exception as e:
+            print(f"Error writing search results to Redis: {e}")
+
+    async def get_or_fetch(
+        self, key: str, fetch: Callable[[], Awaitable[FetchedResults]]
+    ) -> SearchResults:
+        """Cached results for `key`, or the result of one shared `fetch()`."""
+        value = self._get_local(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            try:
+                # shield: one waiter being cancelled must not cancel the others
+                return await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                if not in_flight.cancelled():
+                    raise
+                # The leading caller was cancelled, not us: search ourselves
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            fetched = await self._get_redis(key)
+            from_redis = fetched is not None
+            if from_redis:
+                self.redis_hits += 1
+                self.hits += 1
+            else:
+                self.misses += 1
+                fetched = await fetch()
+                if not fetched.complete:
+                    self.incomplete += 1
+            ttl = self.ttl_seconds if fetched.complete else self.negative_ttl_seconds
+            if ttl > 0:
+                if not from_redis:
+                    await self._set_redis(key, fetched, ttl)
+                self._set_local(key, fetched.results, ttl)
+            value = fetched.results
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters get the error; nobody else needs to retrieve it
+            future.exception()
+            raise
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "redis_hits": self.redis_hits,
+            "coalesced": self.coalesced,
+            "incomplete": self.incomplete,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+_search_result_cache: SearchResultCache | None = None
+
+
+def get_search_result_cache() -> SearchResultCache:
+    """Process-wide SearXNG result cache, sized by SEARCH_CACHE_SIZE,
+    SEARCH_CACHE_TTL and SEARCH_CACHE_NEGATIVE_TTL (for incomplete results);
+    SEARCH_CACHE_REDIS=true backs it with `backend.redis.redis_client`."""
+    global _search_result_cache
+    if _search_result_cache is None:
+        redis_client = None
+        if os.getenv("SEARCH_CACHE_REDIS", "false").lower() == "true":
+            from backend.redis import redis_client
+
+        _search_result_cache = SearchResultCache(
+            max_size=int(os.getenv("SEARCH_CACHE_SIZE", 2048)),
+            ttl_seconds=float(os.getenv("SEARCH_CACHE_TTL", 1800)),
+            negative_ttl_seconds=float(os.getenv("SEARCH_CACHE_NEGATIVE_TTL", 30)),
+            redis_client=redis_client,
+        )
+    return _search_result_cache
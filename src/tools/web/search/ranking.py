@@ -2,14 +2,17 @@ import os
 from typing import List, Dict, Any
 from urllib.parse import urlparse
 from collections import defaultdict
-from src.tools.utils.reranker.api import rerank_documents
+from src.tools.utils.reranker import Reranker, get_reranker
 from src.tools.web.search.models import SearXNGSearchResult, BoostedSearXNGSearchResult
 
 
 class URLRanker:
-    def __init__(self, jina_api_key: str | None = None):
+    def __init__(
+        self, jina_api_key: str | None = None, reranker: Reranker | None = None
+    ):
+        self.reranker = reranker or get_reranker()
         self.api_key = jina_api_key or os.getenv("JINA_API_KEY")
-        if not self.api_key:
+        if self.reranker.name == "api" and not self.api_key:
             raise ValueError("JINA_API_KEY not provided or found in environment")
 
     @staticmethod
@@ -81,7 +84,7 @@ class URLRanker:
                 # logger.info(
                 #     f"Reranking query='{query}' | total_urls={len(url_items)} | unique_contents={len(unique_contents)}"
                 # )
-                rerank_results = await rerank_documents(query, unique_contents)
+                rerank_results = await self.reranker.rerank(query, unique_contents)
 
                 for result in rerank_results["results"]:
                     boost = result["relevance_score"] * jina_rerank_factor
@@ -1,8 +1,14 @@
 import os
-import httpx
 from typing import List, Optional
 from urllib.parse import urljoin, urlparse
 
+from src.tools.utils.http import get_http_client
+from src.tools.web.search.cache import (
+    FetchedResults,
+    SearchResultCache,
+    get_search_result_cache,
+    search_cache_key,
+)
 from src.tools.web.search.models import (
     SearXNGSearchResult,
     SearXNGSearchResponse,
@@ -11,7 +17,10 @@ from src.tools.web.search.models import (
 
 
 class SearXNGSearch:
-    def __init__(self, base_url: str | None = None):
+    def __init__(
+        self, base_url: str | None = None, cache: SearchResultCache | None = None
+    ):
+        self.cache = cache or get_search_result_cache()
         if not base_url:
             self.base_url = os.getenv("SEARXNG_API_URL")
             if not self.base_url:
@@ -19,42 +28,69 @@ class SearXNGSearch:
         else:
             self.base_url = base_url
 
-    async def search(
+    async def _fetch(
         self,
         query: str,
-        max_results: int = 5,
-        include_domains: List[str] = [],
-        exclude_domains: List[str] = [],
-        opts: Optional[SearXNGSearchParams] = None,
-    ) -> SearXNGSearchResponse:
+        include_domains: List[str],
+        exclude_domains: List[str],
+        opts: Optional[SearXNGSearchParams],
+    ) -> FetchedResults:
+        """One upstream search; raw results after image and domain filtering.
+
+        SearXNG answers 200 even when its engines are rate-limited or suspended,
+        so empty responses and ones listing unresponsive engines are marked
+        incomplete and cached only briefly.
+        """
         url = urljoin(self.base_url, "/search")
         params = {"q": query, "format": "json"}
 
         if opts:
             params.update(opts)
 
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params)
-                data = response.json()
+        client = get_http_client("searxng")
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        data = response.json()
+
+        if not isinstance(data, dict) or "results" not in data:
+            raise Exception("Invalid response structure from SearXNG")
 
-            if not isinstance(data, dict) or "results" not in data:
-                raise Exception("Invalid response structure from SearXNG")
+        # Filter out image results
+        general_results = [
+            result for result in data["results"] if not result.get("img_src")
+        ]
 
-            # Filter out image results
+        # Apply domain filters
+        if include_domains or exclude_domains:
             general_results = [
-                result for result in data["results"] if not result.get("img_src")
+                result
+                for result in general_results
+                if self._check_domain_filters(
+                    result["url"], include_domains, exclude_domains
+                )
             ]
 
-            # Apply domain filters
-            if include_domains or exclude_domains:
-                general_results = [
-                    result
-                    for result in general_results
-                    if self._check_domain_filters(
-                        result["url"], include_domains, exclude_domains
-                    )
-                ]
+        unresponsive = data.get("unresponsive_engines") or []
+        if unresponsive:
+            print(f"SearXNG engines unresponsive for {query!r}: {unresponsive}")
+        return FetchedResults(
+            general_results, complete=bool(data["results"]) and not unresponsive
+        )
+
+    async def search(
+        self,
+        query: str,
+        max_results: int = 5,
+        include_domains: List[str] = [],
+        exclude_domains: List[str] = [],
+        opts: Optional[SearXNGSearchParams] = None,
+    ) -> SearXNGSearchResponse:
+        try:
+            # Cached before truncation so any max_results can share an entry
+            general_results = await self.cache.get_or_fetch(
+                search_cache_key(query, opts, include_domains, exclude_domains),
+                lambda: self._fetch(query, include_domains, exclude_domains, opts),
+            )
 
             general_results: List[SearXNGSearchResult] = [
                 SearXNGSearchResult(**result)